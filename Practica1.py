@@ -2,32 +2,55 @@
 # IMPORTACIONES PARA AMBOS METODOS
 # -------------------------------------------------------------
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
+import functools
+import os
+import sys
 import time
 
+import ajuste_aer
+import backends
+import codificacion
+import instrumentacion
+import memoria
+import optimizador
+import permutaciones
+import preparacion
+import preprocesado
+
+# PIL, matplotlib, qiskit y qiskit_aer tardan en importarse: se cargan la
+# primera vez que se usan (matplotlib solo en el main con gráficos)
+
 # -------------------------------------------------------------
-# IMPORTACIONES PARA METODO CUANTICO
+# IMPORTACIONES PARA METODO CUANTICO (diferidas)
 # -------------------------------------------------------------
-from qiskit import QuantumCircuit
-try:
-    from qiskit_aer import AerSimulator
-except Exception:
+@functools.lru_cache(maxsize=None)
+def importar_aer():
+    # Se prueban las rutas de importación una sola vez
+    try:
+        from qiskit_aer import AerSimulator
+    except Exception:
+        try:
+            # Older import location
+            from qiskit.providers.aer import AerSimulator
+        except Exception:
+            AerSimulator = None
     try:
-        # Older import location
-        from qiskit.providers.aer import AerSimulator
+        from qiskit_aer.library import SetStatevector
     except Exception:
-        AerSimulator = None
+        SetStatevector = None
+    return AerSimulator, SetStatevector
 
 
 # -------------------------------------------------------------
-# 0) Cargar imagen, convertir a escala de grises y reducir a 8x8 (PARA AMBOS METODOS)
+# 0) Cargar imagen, convertir a escala de grises y reducir a resolucion x resolucion
+#    (PARA AMBOS METODOS). La resolución debe ser potencia de 2: 8x8 → 6 qubits,
+#    1024x1024 → 20 qubits
 # -------------------------------------------------------------
-def preprocesar_image(path):
-    img = Image.open(path).convert("L")      # Escala de grises
-    img = img.resize((8, 8))                # Reducir tamaño a 8x8
-    img_arr = np.array(img) / 255.0             # Normalizar entre 0 y 1
-    return img_arr
+@instrumentacion.medir('preprocesado')
+def preprocesar_image(path, resolucion=8, cache=None):
+    # Escala de grises, decodificación JPEG reducida, float32 en [0, 1] y caché
+    # opcional en disco (directorio cache o variable COMPCUANTICA_CACHE)
+    return preprocesado.preprocesar(path, resolucion, cache)
 
 
 # -----------------------METODO CLASICO------------------------
@@ -41,39 +64,121 @@ def inversion_tradiconal(img_arr):
 # -----------------------METODO CUANTICO-----------------------
 # 1) Codificar la imagen en un circuito cuántico (amplitude encoding)
 # -------------------------------------------------------------
-def codificar_a_qubits(img_arr):
-    flat = img_arr.flatten()                            #Convierte la imagen en un vector unidimensional
-    normalizacion = np.sqrt(np.sum(flat**2))        # Normalización para amplitudes (Calcula la norma Euclidiana)
-    flat = flat / normalizacion                     # Qiskit requiere esto
+@instrumentacion.medir('codificacion')
+def codificar_a_qubits(img_arr, fidelidad_minima=None):
+    # Con fidelidad_minima (p. ej. 0.99) la preparación es aproximada y de menor
+    # profundidad, y se devuelve además un informe con la fidelidad y el ahorro de puertas
+    from qiskit import QuantumCircuit
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    # Color (R, R, 3): R, G y B en un solo registro con QUBITS_CANAL qubits más (bits altos),
+    # y la normalización es un array con una norma por canal
+
+    # Amplitudes normalizadas (Qiskit requiere esto) en un buffer float32 de la reserva:
+    # el circuito copia las amplitudes, así que el buffer se devuelve enseguida
+    flat = codificacion.RESERVA.tomar((codificacion.amplitudes(img_arr.shape),))
+    flat, normalizacion = codificacion.codificar_imagen(img_arr, out=flat)
+
+    num_qubits = int(np.log2(img_arr.shape[0] * img_arr.shape[1]))   # Qubits de píxel: 8x8 = 64 → 6 qubits
 
-    num_pixeles = len(flat) 
-    num_qubits = int(np.log2(num_pixeles))           # 8x8 = 64 → 6 qubits
+    cq = QuantumCircuit(int(np.log2(len(flat))))    #Crea un circuito cuántico
 
-    cq = QuantumCircuit(num_qubits)                 #Crea un circuito cuántico
+    if fidelidad_minima is not None:
+        # En color se aproxima el registro completo (píxel + canal): la fidelidad es la del estado entero
+        informe = preparacion.preparar_aproximado(cq, flat, fidelidad_minima)
+        codificacion.RESERVA.soltar(flat)
+        return cq, num_qubits, normalizacion, informe
 
     # Iniciamos el estado cuántico con esas amplitudes
-    cq.initialize(flat, cq.qubits)
+    # (normalize=True absorbe el redondeo de float32 en la comprobación de norma)
+    cq.initialize(flat, cq.qubits, normalize=True)
+    codificacion.RESERVA.soltar(flat)
 
     return cq, num_qubits, normalizacion
 
 # -----------------------METODO CUANTICO-----------------------
 # 2) Aplicar filtro cuántico negativo (Puerta X a todos los qubits)
 # -------------------------------------------------------------
+@instrumentacion.medir('filtro')
 def aplicar_quantum_negativo(cq, num_qubits):
     for q in range(num_qubits):
         cq.x(q)   # Puerta NOT cuántica
 
+# -----------------------METODO CUANTICO-----------------------
+# 2b) Plantillas reutilizables: preparación de estado + filtro
+# -------------------------------------------------------------
+# La estructura del circuito solo depende del número de qubits y del filtro,
+# así que se construye y transpila una vez (LRU) y para cada imagen solo se
+# cambia el statevector inicial, sin volver a descomponer initialize.
+# En color el registro tiene qubits_canal qubits más, que el filtro no toca
+@functools.lru_cache(maxsize=32)
+def plantilla_circuito(num_qubits, filtro=aplicar_quantum_negativo, qubits_canal=0):
+    from qiskit import QuantumCircuit, transpile
+    _, SetStatevector = importar_aer()
+    provisional = np.zeros(2 ** (num_qubits + qubits_canal), dtype=complex)
+    provisional[0] = 1                                   # |0...0> hasta que se asigne la imagen
+    cq = QuantumCircuit(num_qubits + qubits_canal)
+    cq.append(SetStatevector(provisional), cq.qubits)
+    if filtro is not None:
+        filtro(cq, num_qubits)
+    # Nivel 0: con optimización, transpile quita los SWAP y deja la permutación en el
+    # layout final, que Aer no aplica al statevector
+    return transpile(cq, obtener_simulador(), optimization_level=0)
+
+
+def codificar_con_plantilla(img_arr, filtro=aplicar_quantum_negativo):
+    # Igual que codificar_a_qubits + filtro, pero partiendo de la plantilla en caché
+    if importar_aer()[1] is None:
+        cq, num_qubits, normalizacion = codificar_a_qubits(img_arr)
+        if filtro is not None:
+            filtro(cq, num_qubits)
+        return cq, num_qubits, normalizacion
+
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    # SetStatevector copia las amplitudes: el buffer vuelve a la reserva al crear el circuito
+    flat = codificacion.RESERVA.tomar((codificacion.amplitudes(img_arr.shape),))
+    flat, normalizacion = codificacion.codificar_imagen(img_arr, out=flat)      # Grises o color
+    num_qubits = int(np.log2(img_arr.shape[0] * img_arr.shape[1]))
+    qubits_canal = int(np.log2(len(flat))) - num_qubits
+
+    cq = circuito_con_plantilla(flat, num_qubits, filtro, qubits_canal)
+    codificacion.RESERVA.soltar(flat)
+    return cq, num_qubits, normalizacion
+
+
+def circuito_con_plantilla(flat, num_qubits, filtro=aplicar_quantum_negativo, qubits_canal=0):
+    # Copia la plantilla y asigna las amplitudes (ya normalizadas) como estado inicial
+    _, SetStatevector = importar_aer()
+    cq = plantilla_circuito(num_qubits, filtro, qubits_canal).copy()
+    cq.data[0] = cq.data[0].replace(operation=SetStatevector(flat))
+    return cq
+
+
+def estadisticas_plantillas():
+    info = plantilla_circuito.cache_info()
+    return {'aciertos': info.hits, 'fallos': info.misses,
+            'en_cache': info.currsize, 'capacidad': info.maxsize}
+
 # -----------------------METODO CUANTICO-----------------------
 # 3) Medir y reconstruir la imagen procesada
 # -------------------------------------------------------------
-def reconstruir_imagen(cq, normalizacion):
+_simulador = None
+
+def obtener_simulador():
+    # Un único simulador de larga duración para todos los trabajos
+    global _simulador
+    AerSimulator, _ = importar_aer()
     if AerSimulator is None:
         raise ImportError(
             "No se encontró AerSimulator. Instala 'qiskit-aer' (por ejemplo: pip install qiskit-aer) "
             "o instala qiskit con extras: pip install 'qiskit[visualization]'."
         )
+    if _simulador is None:
+        # Simulador que devuelve vectores de estado completos en complex64
+        _simulador = AerSimulator(method='statevector', precision='single')
+    return _simulador
 
-    sim = AerSimulator(method='statevector')    #Crea un simulador para que devuelva vectores de estado completos
+
+def preparar_circuito_statevector(cq):
     correr_cq = cq.copy()                       # Hacemos una copia y eliminamos medidas finales si existen 
                                                 #(las medidas impiden obtener statevector)
     try:
@@ -81,7 +186,7 @@ def reconstruir_imagen(cq, normalizacion):
     except Exception:
         # Fallback: construir nuevo circuito sin instrucciones de medida
         try:
-            from qiskit.circuit.instruction import Instruction
+            from qiskit import QuantumCircuit
             cq_nuevo = QuantumCircuit(correr_cq.num_qubits)
             for instr, qargs, cargs in correr_cq.data:
                 # Omitir instrucciones de medida
@@ -90,46 +195,200 @@ def reconstruir_imagen(cq, normalizacion):
                 cq_nuevo.append(instr, qargs, cargs)
             correr_cq = cq_nuevo
         except Exception:
-            # Si falla, dejamos cq_nuevo como estaba y seguiremos intentando
+            # Si falla, dejamos el circuito como estaba y seguiremos intentando
             pass
 
-    statevector = None
-    # Intentar guardar explícitamente el estado del vector (más robusto entre versiones de Aer)
+    # Guardar explícitamente el estado del vector (más robusto entre versiones de Aer)
     try:
-        cq_sv = correr_cq.copy()
+        correr_cq.save_statevector()
+    except Exception:
+        # Algunos backends requieren etiqueta
         try:
-            cq_sv.save_statevector()
+            correr_cq.save_statevector(label='statevector')
         except Exception:
-            # Algunos backends requieren etiqueta
-            try:
-                cq_sv.save_statevector(label='statevector')
-            except Exception:
-                pass
-        job = sim.run(cq_sv)
-        result = job.result()
-        # Intentar obtener por índice de experimento (0)
+            pass
+    return correr_cq
+
+
+def extraer_statevector(result, indice=0):
+    # Intentar obtener por índice de experimento
+    try:
+        return result.get_statevector(indice)
+    except Exception:
+        pass
+    if indice == 0:
         try:
-            statevector = result.get_statevector(0)
+            return result.get_statevector()
         except Exception:
-            try:
-                statevector = result.get_statevector()
-            except Exception:
-                # Fallback a result.data()
-                try:
-                    data = result.data()
-                    statevector = data.get('statevector', None)
-                except Exception:
-                    statevector = None
+            pass
+    # Fallback a result.data()
+    try:
+        return result.data(indice).get('statevector', None)
     except Exception:
-        statevector = None
+        return None
 
-    if statevector is None:
+
+@instrumentacion.medir('simulacion')
+def simular_statevectors(circuitos):
+    # Ejecuta todos los circuitos en un único trabajo multi-experimento de Aer, con
+    # las opciones ajustadas por ajuste_aer.py para esta forma de lote (si las hay)
+    sim = obtener_simulador()
+    opciones = ajuste_aer.opciones(circuitos[0].num_qubits, len(circuitos)) if circuitos else {}
+    result = sim.run([preparar_circuito_statevector(cq) for cq in circuitos], **opciones).result()
+    statevectors = [extraer_statevector(result, i) for i in range(len(circuitos))]
+    if any(sv is None for sv in statevectors):
         raise RuntimeError("No se pudo obtener el statevector del resultado del simulador. Asegúrate de que el circuito no tenga medidas y que 'qiskit-aer' esté instalado y actualizado.")
+    return statevectors
+
+
+@instrumentacion.medir('reconstruccion')
+def reconstruir_imagenes(entrada, normalizaciones=None, filtro=None, motor='auto', optimizar=True):
+    # Acepta una lista de circuitos (con sus normalizaciones) o un array (N, R, R)
+    # de preprocesar_image (o (N, R, R, 3) en color); en ese caso se codifica y se aplica
+    # el filtro a cada imagen.
+    # Con motor='auto' los circuitos que son permutaciones (x, cx, swap, ccx, cswap)
+    # se resuelven sin simulador; motor='aer' fuerza el simulador para todos.
+    # Con optimizar=True los circuitos pasan por el optimizador peephole antes de Aer
+    if isinstance(entrada, np.ndarray):
+        if len(entrada):
+            # Rechazar el trabajo antes de codificar si no cabe en memoria
+            memoria.comprobar_memoria(int(np.ceil(np.log2(entrada[0].size))), len(entrada))
+        if filtro is None:
+            filtro = aplicar_quantum_negativo
+        circuitos, normalizaciones = [], []
+        for img_arr in entrada:
+            cq, num_qubits, normalizacion = codificar_con_plantilla(img_arr, filtro)
+            circuitos.append(cq)
+            normalizaciones.append(normalizacion)
+    else:
+        circuitos = list(entrada)
+        if normalizaciones is None or len(normalizaciones) != len(circuitos):
+            raise ValueError("Hace falta una normalización por cada circuito.")
+        if circuitos:
+            memoria.comprobar_memoria(circuitos[0].num_qubits, len(circuitos))
+
+    if not circuitos:
+        # Sin circuitos no hay resolución de la que partir: un array vacío conserva
+        # su forma (N=0, R, R[, 3]); una lista vacía da un array de forma (0,)
+        return np.empty(entrada.shape if isinstance(entrada, np.ndarray) else (0,), dtype=np.float32)
+
+    if motor == 'auto':
+        statevectors, pendientes = permutaciones.ejecutar_qiskit(circuitos)
+    elif motor == 'aer':
+        statevectors, pendientes = [None] * len(circuitos), list(range(len(circuitos)))
+    else:
+        raise ValueError(f"Motor desconocido: {motor}")
+
+    if pendientes:
+        # Un único trabajo multi-experimento para todo lo que no es permutación
+        enviados = [circuitos[i] for i in pendientes]
+        if optimizar:
+            enviados, _ = optimizador.optimizar_circuitos(enviados)
+        simulados = simular_statevectors(enviados)
+        for i, statevector in zip(pendientes, simulados):
+            statevectors[i] = statevector
+
+    # Amplitudes → intensidades 0..1 (abs de complex64 → float32); en color, un plano por canal.
+    # Los statevectors se copian una vez, en un buffer complex64 de la reserva
+    estados = codificacion.RESERVA.tomar((len(statevectors), len(statevectors[0])), np.complex64)
+    for i, sv in enumerate(statevectors):
+        estados[i] = sv
+    imagenes = codificacion.decodificar(estados, normalizaciones)
+    codificacion.RESERVA.soltar(estados)
+    return imagenes
+
+
+@instrumentacion.medir('reconstruccion')
+def reconstruir_imagen(cq, normalizacion):
+    return reconstruir_imagenes([cq], [normalizacion])[0]
+
+# -----------------------METODO CUANTICO-----------------------
+# 3b) Reconstrucción por medidas (shots) con presupuesto adaptativo
+# -------------------------------------------------------------
+# p(k) = (pixel_k / normalizacion)^2, así que pixel_k ≈ sqrt(conteos_k / shots) * normalizacion.
+# Por el método delta, el error típico de cada píxel es normalizacion * sqrt((1 - p) / (4 * shots)):
+# baja como 1/sqrt(shots), lo que permite estimar cuántos shots faltan para el objetivo
+SHOTS_INICIALES = 1024
+MAX_SHOTS = 2 ** 20
+
+def preparar_circuito_medidas(cq):
+    # Copia del circuito de codificar_a_qubits (+ filtro) con medidas en todos los qubits
+    correr_cq = cq.copy()
+    correr_cq.remove_final_measurements()
+    correr_cq.measure_all()
+    return correr_cq
+
 
-    # Obtener amplitudes en valores de intensidad 0..1
-    amplitudes = np.abs(statevector) * normalizacion
-    image = amplitudes.reshape((8, 8))
-    return image
+def decodificar_conteos(conteos, num_qubits):
+    # Histograma {'0x1a': n, ...} de Aer → vector de conteos por índice de píxel (np.bincount)
+    indices = np.fromiter((int(k, 16) for k in conteos), dtype=np.int64, count=len(conteos))
+    pesos = np.fromiter(conteos.values(), dtype=np.float64, count=len(conteos))
+    return np.bincount(indices, weights=pesos, minlength=2 ** num_qubits)
+
+
+def error_por_pixel(conteos, shots, normalizacion):
+    # Error típico estimado de cada píxel (en intensidad 0..1)
+    probabilidades = conteos / shots
+    if np.ndim(normalizacion) == 1:
+        # Color: cada plano de canal tiene su norma (el cuarto plano está vacío)
+        huecos = 2 ** backends.QUBITS_CANAL
+        normalizacion = np.repeat(np.append(normalizacion, [0] * (huecos - 3)), len(conteos) // huecos)
+    return normalizacion * np.sqrt((1 - probabilidades) / (4 * shots))
+
+
+@instrumentacion.medir('reconstruccion')
+def reconstruir_imagenes_por_medidas(circuitos, normalizaciones, error_objetivo=0.01,
+                                     shots_iniciales=SHOTS_INICIALES, max_shots=MAX_SHOTS, semilla=None):
+    # Reconstruye cada imagen a partir de medidas, añadiendo shots hasta que el error
+    # máximo por píxel baje de error_objetivo (o se alcance max_shots).
+    # Devuelve las imágenes (N, lado, lado), o (N, lado, lado, 3) en color, y por imagen {'shots', 'error'}
+    circuitos = list(circuitos)
+    if len(normalizaciones) != len(circuitos):
+        raise ValueError("Hace falta una normalización por cada circuito.")
+    if not circuitos:
+        return np.empty((0,), dtype=np.float32), []        # Sin circuitos no se conoce el lado
+    num_qubits = circuitos[0].num_qubits
+    memoria.comprobar_memoria(num_qubits, len(circuitos))
+
+    sim = obtener_simulador()
+    medidos = [preparar_circuito_medidas(cq) for cq in circuitos]
+    conteos = np.zeros((len(circuitos), 2 ** num_qubits))
+    shots = np.zeros(len(circuitos), dtype=np.int64)
+    errores = np.full(len(circuitos), np.inf)
+    faltan = {i: min(shots_iniciales, max_shots) for i in range(len(circuitos))}
+    ronda = 0
+
+    while faltan:
+        # Un trabajo por número de shots, con todas las imágenes que lo piden. Sin redondeos:
+        # cada imagen recibe exactamente los shots estimados, nunca más allá de max_shots
+        grupos = {}
+        for i, extra in faltan.items():
+            grupos.setdefault(int(extra), []).append(i)
+        for extra, indices in grupos.items():
+            opciones = {} if semilla is None else {'seed_simulator': semilla + ronda}
+            result = sim.run([medidos[i] for i in indices], shots=extra, **opciones).result()
+            for j, i in enumerate(indices):
+                conteos[i] += decodificar_conteos(result.data(j)['counts'], num_qubits)
+                shots[i] += extra
+        ronda += 1
+
+        siguientes = {}
+        for i in faltan:
+            errores[i] = error_por_pixel(conteos[i], shots[i], normalizaciones[i]).max()
+            if errores[i] > error_objetivo and shots[i] < max_shots:
+                # error ∝ 1/sqrt(shots): shots totales necesarios ≈ shots * (error / objetivo)^2
+                necesarios = int(np.ceil(shots[i] * (errores[i] / error_objetivo) ** 2))
+                siguientes[i] = min(necesarios, max_shots) - shots[i]
+        faltan = siguientes
+
+    imagenes = backends.decodificar(np.sqrt(conteos / shots[:, None]), normalizaciones)
+    informe = [{'shots': int(n), 'error': float(e)} for n, e in zip(shots, errores)]
+    return imagenes, informe
+
+
+def reconstruir_imagen_por_medidas(cq, normalizacion, error_objetivo=0.01, **opciones):
+    imagenes, informe = reconstruir_imagenes_por_medidas([cq], [normalizacion], error_objetivo, **opciones)
+    return imagenes[0], informe[0]
 
 # -------------------------------------------------------------
 # 3) Ejecucuion completa
@@ -137,24 +396,45 @@ def reconstruir_imagen(cq, normalizacion):
 
 if __name__ == "__main__":
     path = "paisaje.jpg"   # Cambia la ruta a tu imagen
+    resolucion = 8         # Potencia de 2, hasta 1024 (20 qubits)
+    # Modo sin gráficos (nunca carga matplotlib): --headless o COMPCUANTICA_HEADLESS=1
+    headless = "--headless" in sys.argv or os.environ.get("COMPCUANTICA_HEADLESS") == "1"
+    # Reconstrucción por medidas en lugar de statevector exacto: --shots
+    por_medidas = "--shots" in sys.argv
 
-    arr_original = preprocesar_image(path)
-    cq, num_qubits, normalizacion = codificar_a_qubits(arr_original)
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    requerida = memoria.comprobar_memoria(num_qubits)
+    print(f"Memoria estimada para {resolucion}x{resolucion} ({num_qubits} qubits): {memoria.formatear_bytes(requerida)}")
+
+    arr_original = preprocesar_image(path, resolucion)
 
-    t_clasico_inicio = time.time()
+    t_clasico_inicio = time.perf_counter()
     arr_inverso_tradicional = inversion_tradiconal(arr_original)
-    t_clasico_fin = time.time()
+    t_clasico_fin = time.perf_counter()
     tiempo_clasico = t_clasico_fin - t_clasico_inicio
 
-    t_cuantico_inicio = time.time()
+    # La construcción del circuito cuenta en el tiempo cuántico, igual que en Practica2
+    t_cuantico_inicio = time.perf_counter()
+    cq, num_qubits, normalizacion = codificar_a_qubits(arr_original)
     aplicar_quantum_negativo(cq, num_qubits)
-    arr_inverso_cuantico = reconstruir_imagen(cq, normalizacion)
-    t_cuantico_fin = time.time()
+    if por_medidas:
+        arr_inverso_cuantico, informe = reconstruir_imagen_por_medidas(cq, normalizacion)
+        print(f"Medidas: {informe['shots']} shots, error por píxel {informe['error']:.4f}")
+    else:
+        arr_inverso_cuantico = reconstruir_imagen(cq, normalizacion)
+    t_cuantico_fin = time.perf_counter()
     tiempo_cuantico = t_cuantico_fin - t_cuantico_inicio
 
+    if headless:
+        print(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+        print(f"Inversión cuántica: {tiempo_cuantico:.4f} s")
+        sys.exit(0)
+
+    import matplotlib.pyplot as plt
+
     # Mostrar ambas imágenes
     fig, ax = plt.subplots(1, 3)
-    ax[0].set_title("Original (8x8)")
+    ax[0].set_title(f"Original ({resolucion}x{resolucion})")
     ax[0].imshow(arr_original, cmap="gray")
 
     ax[1].set_title(f"Inversión tradicional: {tiempo_clasico:.4f} s")
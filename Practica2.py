@@ -2,19 +2,28 @@
 # IMPORTACIONES
 # -------------------------------------------------------------
 import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
-import pennylane as qml
+import functools
+import os
+import sys
 import time
 
+import codificacion
+import instrumentacion
+import memoria
+import permutaciones
+import preprocesado
+
+# PIL, matplotlib y pennylane tardan en importarse: se cargan la primera vez
+# que se usan (matplotlib solo en el main con gráficos)
+
 # -------------------------------------------------------------
-# 0) Cargar imagen, convertir a escala de grises y reducir a 8x8
+# 0) Cargar imagen, convertir a escala de grises y reducir a resolucion x resolucion
+#    (potencia de 2: 8x8 → 6 qubits, 1024x1024 → 20 qubits)
 # -------------------------------------------------------------
-def preprocesar_image(path):
-    img = Image.open(path).convert("L")  # Escala de grises
-    img = img.resize((8, 8))             # Reducir tamaño
-    img_arr = np.array(img) / 255.0      # Normalizar
-    return img_arr
+@instrumentacion.medir('preprocesado')
+def preprocesar_image(path, resolucion=8, cache=None):
+    # Mismo preprocesado que Practica1 (JPEG reducido, float32, caché opcional)
+    return preprocesado.preprocesar(path, resolucion, cache)
 
 # -----------------------METODO CLASICO------------------------
 def inversion_tradiconal(img_arr):
@@ -24,39 +33,95 @@ def inversion_tradiconal(img_arr):
 # -----------------------METODO CUANTICO-----------------------
 # 1) Codificar la imagen en amplitudes
 # -------------------------------------------------------------
-def codificar_a_qubits(img_arr):
-    flat = img_arr.flatten()
-    normalizacion = np.sqrt(np.sum(flat**2))
-    flat = flat / normalizacion         # Normalize to unit vector
+@instrumentacion.medir('codificacion')
+def codificar_a_qubits(img_arr, out=None):
+    # Color (R, R, 3): R, G y B en un solo registro con QUBITS_CANAL qubits más
+    # (bits altos); num_qubits son los qubits de píxel y hay una norma por canal.
+    # out: buffer float32 (R*R,) (o (4*R*R,) en color) donde escribir las amplitudes
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    flat, normalizacion = codificacion.codificar_imagen(img_arr, out=out)   # Normalize to unit vector
 
-    num_pixeles = len(flat)             # 64
-    num_qubits = int(np.log2(num_pixeles))   # 6
+    num_qubits = int(np.log2(img_arr.shape[0] * img_arr.shape[1]))   # 64 → 6
 
     return flat, num_qubits, normalizacion
 
 # -----------------------METODO CUANTICO-----------------------
 # 2) Aplicar filtro negativo usando puertas X
 # -------------------------------------------------------------
-def circuito_negativo(flat, num_qubits):
-    dev = qml.device("default.qubit", wires=num_qubits)
+@functools.lru_cache(maxsize=None)
+def lightning_disponible():
+    # Se comprueba una sola vez si el plugin lightning.qubit está instalado
+    import pennylane as qml
+    try:
+        qml.device("lightning.qubit", wires=1)
+        return True
+    except Exception:
+        return False
+
+def resolver_dispositivo(dispositivo):
+    # "auto" elige lightning.qubit si está instalado y default.qubit si no
+    if dispositivo == "auto":
+        return "lightning.qubit" if lightning_disponible() else "default.qubit"
+    if dispositivo not in ("default.qubit", "lightning.qubit"):
+        raise ValueError(f"Dispositivo desconocido: {dispositivo}")
+    return dispositivo
+
+@functools.lru_cache(maxsize=None)
+def qnode_negativo(num_qubits, dispositivo="default.qubit", qubits_filtro=None):
+    # Un único device y QNode por (num_qubits, dispositivo), reutilizado entre llamadas.
+    # Las features son argumento del QNode: con un lote (N, 2**n) AmplitudeEmbedding
+    # usa parameter broadcasting y las N imágenes se ejecutan de una vez.
+    # qubits_filtro: qubits de píxel a invertir (en color, los de canal no se tocan)
+    import pennylane as qml
+    dev = qml.device(dispositivo, wires=num_qubits)
+    if qubits_filtro is None:
+        qubits_filtro = num_qubits
 
     @qml.qnode(dev)
-    def circuit():
-        qml.AmplitudeEmbedding(features=flat, wires=range(num_qubits), normalize=False)
-        # Aplicar NOT cuántico a todos los qubits
-        for q in range(num_qubits):
+    def circuit(features):
+        qml.AmplitudeEmbedding(features=features, wires=range(num_qubits), normalize=False)
+        # Aplicar NOT cuántico a los qubits de píxel: los bits bajos, que en
+        # PennyLane (big-endian) son los últimos wires
+        for q in range(num_qubits - qubits_filtro, num_qubits):
             qml.PauliX(wires=q)
         return qml.state()
 
-    return circuit()
+    return circuit
+
+def _describir_negativo(estado, flat, num_qubits, motor="permutacion", dispositivo="default.qubit"):
+    descripcion = {'ancho': int(np.log2(np.shape(flat)[-1])), 'motor': motor}
+    if motor == "pennylane":
+        # El QNode es AmplitudeEmbedding + una X por qubit de píxel, todas en paralelo
+        descripcion.update(profundidad=2, puertas={'AmplitudeEmbedding': 1, 'PauliX': num_qubits})
+    # Con "permutacion" no se ejecuta ningún circuito (es un gather): sin profundidad ni puertas
+    return descripcion
+
+# Filtro y simulación van juntos en el QNode: una sola etapa
+@instrumentacion.medir('simulacion', _describir_negativo)
+def circuito_negativo(flat, num_qubits, motor="permutacion", dispositivo="default.qubit"):
+    # num_qubits son los qubits de píxel; en color el registro tiene además los de canal
+    qubits_totales = int(np.log2(np.shape(flat)[-1]))
+    # Rechazar el trabajo si el lote no cabe en memoria
+    memoria.comprobar_memoria(qubits_totales, 1 if np.ndim(flat) == 1 else len(flat))
+    if motor == "permutacion":
+        # Las X solo permutan amplitudes: un gather sobre flat (o un lote (N, 64)).
+        # Se invierten los bits bajos del índice (los de píxel)
+        operaciones = [("x", (q,)) for q in range(num_qubits)]
+        permutacion = permutaciones.compilar_permutacion(operaciones, qubits_totales)
+        return permutaciones.aplicar_permutacion(flat, permutacion)
+    if motor != "pennylane":
+        raise ValueError(f"Motor desconocido: {motor}")
+
+    return qnode_negativo(qubits_totales, resolver_dispositivo(dispositivo), num_qubits)(flat)
 
 # -----------------------METODO CUANTICO-----------------------
 # 3) Reconstrucción de la imagen
 # -------------------------------------------------------------
-def reconstruir_imagen(statevector, normalizacion):
-    amplitudes = np.abs(statevector) * normalizacion
-    image = amplitudes.reshape((8, 8))
-    return image
+@instrumentacion.medir('reconstruccion')
+def reconstruir_imagen(statevector, normalizacion, out=None):
+    # |amplitud| * normalización escrito en out (float32 (lado, lado)) o en un array nuevo;
+    # en color, un plano por canal con su propia norma → (lado, lado, 3)
+    return codificacion.decodificar_estado(statevector, normalizacion, out=out)
 
 
 # -------------------------------------------------------------
@@ -64,30 +129,46 @@ def reconstruir_imagen(statevector, normalizacion):
 # -------------------------------------------------------------
 if __name__ == "__main__":
     path = "paisaje.jpg"   
+    resolucion = 8         # Potencia de 2, hasta 1024 (20 qubits)
+    # Modo sin gráficos (nunca carga matplotlib): --headless o COMPCUANTICA_HEADLESS=1
+    headless = "--headless" in sys.argv or os.environ.get("COMPCUANTICA_HEADLESS") == "1"
+
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    requerida = memoria.comprobar_memoria(num_qubits)
+    print(f"Memoria estimada para {resolucion}x{resolucion} ({num_qubits} qubits): {memoria.formatear_bytes(requerida)}")
 
-    arr_original = preprocesar_image(path)
+    arr_original = preprocesar_image(path, resolucion)
 
-    t_clasico_inicio = time.time()
+    t_clasico_inicio = time.perf_counter()
     arr_inverso_tradicional = inversion_tradiconal(arr_original)
-    t_clasico_fin = time.time()
+    t_clasico_fin = time.perf_counter()
     tiempo_clasico = t_clasico_fin - t_clasico_inicio
 
-    t_cuantico_inicio = time.time()
+    # "permutacion" resuelve las X con un gather; "pennylane" ejecuta el QNode
+    motor = "pennylane" if "--pennylane" in sys.argv else "permutacion"
+
+    t_cuantico_inicio = time.perf_counter()
     flat, num_qubits, normalizacion = codificar_a_qubits(arr_original)
-    estado_final = circuito_negativo(flat, num_qubits)
+    estado_final = circuito_negativo(flat, num_qubits, motor=motor)
     arr_inverso_cuantico = reconstruir_imagen(estado_final, normalizacion)
-    t_cuantico_fin = time.time()
+    t_cuantico_fin = time.perf_counter()
     tiempo_cuantico = t_cuantico_fin - t_cuantico_inicio
 
+    if headless:
+        print(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+        print(f"Inversión cuántica({motor}): {tiempo_cuantico:.4f} s")
+        sys.exit(0)
+
+    import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots(1, 3)
-    ax[0].set_title("Original (8x8)")
+    ax[0].set_title(f"Original ({resolucion}x{resolucion})")
     ax[0].imshow(arr_original, cmap="gray")
 
     ax[1].set_title(f"Inversión tradicional: {tiempo_clasico:.4f} s")
     ax[1].imshow(arr_inverso_tradicional, cmap="gray")
 
-    ax[2].set_title(f"Inversión cuántica(pennylane): {tiempo_cuantico:.4f} s")
+    ax[2].set_title(f"Inversión cuántica({motor}): {tiempo_cuantico:.4f} s")
     ax[2].imshow(arr_inverso_cuantico, cmap="gray")
 
     plt.show()
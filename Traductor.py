@@ -1,181 +1,683 @@
 """
-Traductor de Qiskit a PennyLane
-Convierte archivos .py con código Qiskit a PennyLane ejecutable
+Traductor de Qiskit a PennyLane (o a NumPy)
+Convierte archivos .py con código Qiskit a PennyLane ejecutable. Con el
+objetivo 'numpy' genera en su lugar un módulo autónomo, sin ningún SDK
+cuántico, que aplica las puertas como contracciones tensoriales sobre un
+array de statevectors (admite lotes (N, 2**n)).
 """
 
-import re
+import argparse
+import ast
+import copy
+import hashlib
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+
+import puertas
+from puertas import ARIDAD_PUERTAS, GATE_MAPPING   # Nombres de PennyLane y aridad de cada puerta
 
 # =============================================================================
 # CONFIGURACIÓN - Cambia estas rutas según tus archivos
 # =============================================================================
 RUTA_ARCHIVO_QISKIT = "Practica1.py"  # Archivo de entrada
 RUTA_ARCHIVO_PENNYLANE = "codigo_pennylane.py"  # Archivo de salida
+RUTA_ARCHIVO_NUMPY = "codigo_numpy.py"  # Archivo de salida con el objetivo 'numpy'
+NOMBRE_MANIFIESTO = ".traductor_manifiesto.json"  # Hashes del modo por lotes (en el destino)
+# Funciones de estado (--estado) del archivo por defecto: Practica1 prepara el estado
+# aproximado con preparacion.preparar_aproximado, que tiene su versión sin circuito
+ESTADO_ARCHIVO_QISKIT = {'preparar_aproximado': 'estado_aproximado'}
+
+# =============================================================================
+# MAPEO DE PUERTAS QISKIT → NUMPY (matrices definidas en PRELUDIO_NUMPY)
+# =============================================================================
+MATRICES_NUMPY = {
+    'x': '_X', 'y': '_Y', 'z': '_Z', 'h': '_H',
+    's': '_S', 't': '_T', 'sdg': '_SDG', 'tdg': '_TDG',
+    'rx': '_rx', 'ry': '_ry', 'rz': '_rz',
+    'cx': '_CX', 'cy': '_CY', 'cz': '_CZ', 'swap': '_SWAP',
+    'ccx': '_CCX', 'cswap': '_CSWAP'
+}
+
+# Simulador mínimo que se copia al principio del módulo generado. Los statevectors
+# son arrays (..., 2**n) en el orden de Qiskit (el qubit q es el bit q del índice)
+PRELUDIO_NUMPY = '''# -------------------------------------------------------------
+# SIMULADOR NUMPY (generado): statevectors (..., 2**n), orden de Qiskit
+# -------------------------------------------------------------
+import numpy as np
+
+_X = np.array([[0, 1], [1, 0]], dtype=complex)
+_Y = np.array([[0, -1j], [1j, 0]])
+_Z = np.diag([1, -1]).astype(complex)
+_H = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+_S = np.diag([1, 1j])
+_T = np.diag([1, np.exp(1j * np.pi / 4)])
+_SDG = _S.conj()
+_TDG = _T.conj()
+_SWAP = np.eye(4, dtype=complex)[[0, 2, 1, 3]]
+
+def _controlada(matriz, controles=1):
+    # Los controles son los primeros qubits de la puerta (los bits altos de la matriz)
+    resultado = np.eye(2 ** controles * len(matriz), dtype=complex)
+    resultado[-len(matriz):, -len(matriz):] = matriz
+    return resultado
+
+_CX, _CY, _CZ = _controlada(_X), _controlada(_Y), _controlada(_Z)
+_CCX = _controlada(_X, 2)
+_CSWAP = _controlada(_SWAP)
+
+# Rotaciones: con un array de ángulos (N,) devuelven un lote de matrices (N, 2, 2)
+def _matrices(filas):
+    return np.moveaxis(np.array(filas, dtype=complex), (0, 1), (-2, -1))
+
+def _rx(theta):
+    c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+    return _matrices([[c, -1j * s], [-1j * s, c]])
+
+def _ry(theta):
+    c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+    return _matrices([[c, -s], [s, c]])
+
+def _rz(theta):
+    fase = np.exp(-0.5j * np.asarray(theta))
+    cero = np.zeros_like(fase)
+    return _matrices([[fase, cero], [cero, np.conj(fase)]])
+
+def _estado_inicial(n_wires):
+    estado = np.zeros(2 ** n_wires, dtype=complex)
+    estado[0] = 1
+    return estado
+
+def _preparar(amplitudes, normalize=False):
+    # initialize / AmplitudeEmbedding: (2**n,) o un lote (N, 2**n)
+    estado = np.asarray(amplitudes, dtype=complex)
+    if normalize:
+        estado = estado / np.linalg.norm(estado, axis=-1, keepdims=True)
+    return estado
+
+def _aplicar(estado, matriz, qubits):
+    # Puerta de k qubits como contracción tensorial sobre el estado (..., 2**n)
+    forma = np.shape(estado)
+    n = int(np.log2(forma[-1]))
+    ejes = [n - q for q in qubits]              # El eje 0 es el lote; el qubit q, el eje n - q
+    k = len(qubits)
+    if np.ndim(matriz) > 2:
+        # Lote de matrices (..., 2**k, 2**k): una puerta por estado del lote (con broadcasting)
+        lote = np.broadcast_shapes(forma[:-1], np.shape(matriz)[:-2])
+        tensor = np.broadcast_to(estado, lote + forma[-1:]).reshape((-1,) + (2,) * n)
+        matrices = np.broadcast_to(matriz, lote + np.shape(matriz)[-2:]).reshape(-1, 2 ** k, 2 ** k)
+        finales = list(range(n + 1 - k, n + 1))
+        tensor = np.moveaxis(tensor, ejes, finales)
+        resultado = np.einsum('bij,brj->bri', matrices, tensor.reshape(len(tensor), -1, 2 ** k))
+        return np.moveaxis(resultado.reshape(tensor.shape), finales, ejes).reshape(lote + forma[-1:])
+    tensor = np.reshape(estado, (-1,) + (2,) * n)
+    if matriz is _X:
+        return np.flip(tensor, ejes[0]).reshape(forma)   # X solo permuta: sin contracción
+    resultado = np.tensordot(matriz.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), ejes))
+    return np.moveaxis(resultado, list(range(k)), ejes).reshape(forma)
+'''
+
+# Métodos del circuito sin efecto en una simulación de statevector
+METODOS_IGNORADOS = ('barrier', 'measure', 'measure_all', 'save_statevector', 'remove_final_measurements')
+
+# Nombres y atributos que solo existen con Qiskit Aer: las funciones que los usan se omiten
+NOMBRES_AER = {'AerSimulator', 'SetStatevector', 'transpile'}
+ATRIBUTOS_AER = {'get_statevector', 'set_statevector', 'run'}
+
+MODULOS_QISKIT = ('qiskit', 'qiskit_aer')
+
+# Funciones que se sustituyen por una versión escrita a mano (solo usan NumPy: el
+# código traducido no depende de otros módulos del proyecto de origen)
+FUNCIONES_PLANTILLA = {
+    'reconstruir_imagen': '\n'.join([
+        "def reconstruir_imagen(statevector, normalizacion):",
+        "    '''Reconstruye la imagen desde el statevector en PennyLane'''",
+        "    amplitudes = np.abs(statevector)",
+        "    if np.ndim(normalizacion) == 1:",
+        "        # Color: un plano por canal (en los bits altos del índice) con su propia norma → (lado, lado, canales)",
+        "        canales = len(normalizacion)",
+        "        planos = 2 ** int(np.ceil(np.log2(canales)))",
+        "        lado = int(round(np.sqrt(amplitudes.size // planos)))",
+        "        image = amplitudes.reshape((planos, lado, lado))[:canales] * np.reshape(normalizacion, (canales, 1, 1))",
+        "        return np.moveaxis(image, 0, -1)",
+        "    lado = int(round(np.sqrt(amplitudes.size)))",
+        "    image = (amplitudes * normalizacion).reshape((lado, lado))",
+        "    return image",
+    ]),
+}
+
+# Funciones que usa el main generado cuando el original no tiene uno
+FUNCIONES_MAIN = {'preprocesar_image', 'inversion_tradiconal', 'codificar_a_qubits', 'reconstruir_imagen'}
+
+# Variable con el número de wires dentro de las funciones traducidas
+VARIABLE_WIRES = 'n_wires'
 
 # =============================================================================
-# MAPEO DE PUERTAS QISKIT → PENNYLANE
+# TABLAS DE DESPACHO (se construyen una sola vez)
 # =============================================================================
-GATE_MAPPING = {
-    'x': 'qml.PauliX',
-    'y': 'qml.PauliY',
-    'z': 'qml.PauliZ',
-    'h': 'qml.Hadamard',
-    'cx': 'qml.CNOT',
-    'cy': 'qml.CY',
-    'cz': 'qml.CZ',
-    'swap': 'qml.SWAP',
-    'rx': 'qml.RX',
-    'ry': 'qml.RY',
-    'rz': 'qml.RZ',
-    's': 'qml.S',
-    't': 'qml.T',
-    'sdg': 'qml.adjoint(qml.S)',
-    'tdg': 'qml.adjoint(qml.T)',
-    'ccx': 'qml.Toffoli',
-    'cswap': 'qml.CSWAP'
+
+def _texto(nodo, lineas):
+    """Código fuente de una expresión (col_offset cuenta bytes UTF-8)"""
+    if any(getattr(n, 'sustituido', False) for n in ast.walk(nodo)):
+        return ast.unparse(nodo)                    # Reescrita (p. ej. cq.num_qubits): el original ya no vale
+    if nodo.lineno == nodo.end_lineno:
+        return lineas[nodo.lineno - 1].encode('utf-8')[nodo.col_offset:nodo.end_col_offset].decode('utf-8')
+    return ast.unparse(nodo)
+
+def _cable(qubit, lineas):
+    """Wire de PennyLane para un qubit de Qiskit (Qiskit es little-endian)"""
+    if isinstance(qubit, ast.Constant) and isinstance(qubit.value, int):
+        return f"{VARIABLE_WIRES} - {qubit.value + 1}"
+    texto = _texto(qubit, lineas)
+    if not isinstance(qubit, (ast.Name, ast.Attribute, ast.Subscript, ast.Call)):
+        texto = f"({texto})"
+    return f"{VARIABLE_WIRES} - 1 - {texto}"
+
+def _traductor_puerta(puerta):
+    """Crea el traductor de una llamada cq.<puerta>(params..., qubits...)"""
+    aridad = ARIDAD_PUERTAS[puerta]
+    destino = GATE_MAPPING[puerta]
+
+    def traducir(llamada, lineas):
+        if len(llamada.args) < aridad or llamada.keywords:
+            raise ValueError(f"Línea {llamada.lineno}: llamada a '{puerta}' no soportada")
+        parametros = ''.join(_texto(p, lineas) + ', ' for p in llamada.args[:-aridad])
+        cables = [_cable(q, lineas) for q in llamada.args[-aridad:]]
+        wires = cables[0] if aridad == 1 else '[' + ', '.join(cables) + ']'
+        return [f"{destino}({parametros}wires={wires})"]
+
+    return traducir
+
+def _traducir_initialize(llamada, lineas):
+    """cq.initialize(amplitudes, ...) → qml.AmplitudeEmbedding"""
+    argumentos = {kw.arg: kw.value for kw in llamada.keywords}
+    features = llamada.args[0] if llamada.args else argumentos['params']
+    normalize = _texto(argumentos['normalize'], lineas) if 'normalize' in argumentos else 'False'
+    return [f"qml.AmplitudeEmbedding(features={_texto(features, lineas)}, "
+            f"wires=range({VARIABLE_WIRES}), normalize={normalize})"]
+
+def _ignorar(llamada, lineas):
+    return []
+
+def _traductor_puerta_numpy(puerta):
+    """Crea el traductor NumPy de cq.<puerta>(params..., qubits...): cq = _aplicar(cq, matriz, [qubits])"""
+    aridad = ARIDAD_PUERTAS[puerta]
+    matriz = MATRICES_NUMPY[puerta]
+
+    def traducir(llamada, lineas):
+        if len(llamada.args) < aridad or llamada.keywords:
+            raise ValueError(f"Línea {llamada.lineno}: llamada a '{puerta}' no soportada")
+        circuito = llamada.func.value.id
+        parametros = [_texto(p, lineas) for p in llamada.args[:-aridad]]
+        expresion = f"{matriz}({', '.join(parametros)})" if parametros else matriz
+        # Los índices de qubit se conservan: el estado generado sigue el orden de Qiskit
+        qubits = ', '.join(_texto(q, lineas) for q in llamada.args[-aridad:])
+        return [f"{circuito} = _aplicar({circuito}, {expresion}, [{qubits}])"]
+
+    return traducir
+
+def _traducir_initialize_numpy(llamada, lineas):
+    """cq.initialize(amplitudes, ...) → cq = _preparar(amplitudes, normalize)"""
+    argumentos = {kw.arg: kw.value for kw in llamada.keywords}
+    features = llamada.args[0] if llamada.args else argumentos['params']
+    normalize = _texto(argumentos['normalize'], lineas) if 'normalize' in argumentos else 'False'
+    circuito = llamada.func.value.id
+    return [f"{circuito} = _preparar({_texto(features, lineas)}, normalize={normalize})"]
+
+_TRADUCTORES_METODO = {puerta: _traductor_puerta(puerta) for puerta in GATE_MAPPING}
+_TRADUCTORES_METODO['initialize'] = _traducir_initialize
+_TRADUCTORES_METODO.update({metodo: _ignorar for metodo in METODOS_IGNORADOS})
+
+# Atributos de un circuito que el traductor sabe convertir: métodos, cq.qubits (como
+# argumento de initialize) y cq.num_qubits (el número de wires)
+ATRIBUTOS_CIRCUITO = _TRADUCTORES_METODO.keys() | {'qubits', 'num_qubits'}
+
+_TRADUCTORES_NUMPY = {puerta: _traductor_puerta_numpy(puerta) for puerta in MATRICES_NUMPY}
+_TRADUCTORES_NUMPY['initialize'] = _traducir_initialize_numpy
+_TRADUCTORES_NUMPY.update({metodo: _ignorar for metodo in METODOS_IGNORADOS})
+
+# Traductores de sentencias por objetivo de generación
+TRADUCTORES = {'pennylane': _TRADUCTORES_METODO, 'numpy': _TRADUCTORES_NUMPY}
+
+# Cabecera de las sentencias compuestas que pueden contener puertas
+_CABECERAS = {
+    ast.For: lambda s, lineas: f"for {_texto(s.target, lineas)} in {_texto(s.iter, lineas)}:",
+    ast.While: lambda s, lineas: f"while {_texto(s.test, lineas)}:",
+    ast.If: lambda s, lineas: f"if {_texto(s.test, lineas)}:",
 }
 
 # =============================================================================
-# FUNCIONES DE TRADUCCIÓN
+# ANÁLISIS
 # =============================================================================
 
-def extraer_informacion_circuito(codigo):
-    """Extrae información del código Qiskit"""
-    lineas = codigo.split('\n')
-    
-    info = {
-        'num_qubits_var': None,
-        'num_qubits_literal': None,
-        'circuit_var': 'qc',
-        'initialize_var': None
+def _es_modulo_qiskit(nodo):
+    """True si el nodo es un import de qiskit/qiskit_aer"""
+    if isinstance(nodo, ast.Import):
+        return any(a.name.split('.')[0] in MODULOS_QISKIT for a in nodo.names)
+    if isinstance(nodo, ast.ImportFrom):
+        return (nodo.module or '').split('.')[0] in MODULOS_QISKIT
+    if isinstance(nodo, ast.Try):
+        return any(_es_modulo_qiskit(n) for n in ast.walk(nodo) if n is not nodo)
+    return False
+
+def _es_creacion(sentencia):
+    """cq = QuantumCircuit(n) → (cq, n); si no, None"""
+    if (isinstance(sentencia, ast.Assign) and len(sentencia.targets) == 1
+            and isinstance(sentencia.targets[0], ast.Name)
+            and isinstance(sentencia.value, ast.Call)
+            and isinstance(sentencia.value.func, ast.Name)
+            and sentencia.value.func.id == 'QuantumCircuit'
+            and len(sentencia.value.args) == 1):
+        return sentencia.targets[0].id, sentencia.value.args[0]
+    return None
+
+def _es_preparacion(sentencia, circuitos, funciones_estado):
+    """x = f(cq, ...) con f en funciones_estado → (cq, llamada); si no, None"""
+    if not (isinstance(sentencia, ast.Assign) and len(sentencia.targets) == 1
+            and isinstance(sentencia.value, ast.Call) and sentencia.value.args):
+        return None
+    llamada = sentencia.value
+    nombre = llamada.func.attr if isinstance(llamada.func, ast.Attribute) else getattr(llamada.func, 'id', None)
+    circuito = llamada.args[0]
+    if nombre in funciones_estado and isinstance(circuito, ast.Name) and circuito.id in circuitos:
+        return circuito.id, llamada
+    return None
+
+def _es_main(nodo):
+    return (isinstance(nodo, ast.If) and isinstance(nodo.test, ast.Compare)
+            and isinstance(nodo.test.left, ast.Name) and nodo.test.left.id == '__name__')
+
+def _analizar_funcion(nodo):
+    """Recoge en un solo recorrido los circuitos, referencias y dependencias de Aer"""
+    referencias = set()
+    receptores = {}
+    circuitos = set()
+    usa_aer = False
+    devuelve_valor = False
+    importa_qiskit = False
+    for n in ast.walk(nodo):
+        if isinstance(n, ast.Name):
+            referencias.add(n.id)
+            usa_aer |= n.id in NOMBRES_AER
+        elif isinstance(n, ast.Attribute):
+            usa_aer |= n.attr in ATRIBUTOS_AER
+            if isinstance(n.value, ast.Name):
+                receptores.setdefault(n.value.id, set()).add(n.attr)
+        elif isinstance(n, ast.Return) and n.value is not None:
+            devuelve_valor = True
+        elif isinstance(n, (ast.Import, ast.ImportFrom)):
+            # Imports diferidos dentro de la función: se eliminan al traducir
+            importa_qiskit |= _es_modulo_qiskit(n)
+        elif isinstance(n, ast.Assign):
+            creacion = _es_creacion(n)
+            if creacion:
+                circuitos.add(creacion[0])
+
+    for nombre, atributos in receptores.items():
+        if atributos & _TRADUCTORES_METODO.keys():
+            circuitos.add(nombre)
+    # Motivo por el que la función no se puede traducir (None si se puede)
+    motivo = "depende de Qiskit Aer" if usa_aer else None
+    for c in sorted(circuitos):
+        for atributo in sorted(receptores.get(c, set()) - ATRIBUTOS_CIRCUITO):
+            motivo = motivo or f"usa {c}.{atributo}, que el traductor no admite"
+
+    parametros = [a.arg for a in nodo.args.args] if isinstance(nodo, ast.FunctionDef) else []
+    return {
+        'referencias': referencias,
+        'circuitos': circuitos,
+        'parametros_circuito': [p for p in parametros if p in circuitos],
+        'parametros': parametros,
+        'traducible': motivo is None,
+        'motivo': motivo,
+        'devuelve_valor': devuelve_valor,
+        'importa_qiskit': importa_qiskit,
     }
-    
-    for linea in lineas:
-        match = re.search(r'(\w+)\s*=\s*int\(np\.log2\(.*?\)\)', linea)
-        if match:
-            info['num_qubits_var'] = match.group(1)
-        
-        match = re.search(r'(\w+)\s*=\s*QuantumCircuit\((\d+)\)', linea)
-        if match:
-            info['circuit_var'] = match.group(1)
-            info['num_qubits_literal'] = int(match.group(2))
-        
-        match = re.search(r'(\w+)\s*=\s*QuantumCircuit\((\w+)\)', linea)
-        if match:
-            info['circuit_var'] = match.group(1)
-            if not info['num_qubits_var']:
-                info['num_qubits_var'] = match.group(2)
-        
-        pattern = rf'{info["circuit_var"]}\.initialize\(([^,]+),'
-        match = re.search(pattern, linea)
-        if match:
-            info['initialize_var'] = match.group(1).strip()
-    
-    return info
-
-def traducir_funcion_qiskit(codigo_funcion, info):
-    """Traduce una función de Qiskit a PennyLane"""
-    lineas = codigo_funcion.split('\n')
-    nombre_match = re.match(r'def\s+(\w+)\((.*?)\):', lineas[0])
-    if not nombre_match:
-        return codigo_funcion
-    nombre_func = nombre_match.group(1)
-    params = nombre_match.group(2)
-
-    # Traducción automática de reconstruir_imagen
-    if nombre_func == "reconstruir_imagen":
-        return '\n'.join([
-            "def reconstruir_imagen(statevector, normalizacion):",
-            "    '''Reconstruye la imagen desde el statevector en PennyLane'''",
-            "    amplitudes = np.abs(statevector) * normalizacion",
-            "    image = amplitudes.reshape((8, 8))",
-            "    return image"
-        ])
-
-    indent = "    "
-    nuevo_codigo = [f"def {nombre_func}({params}):"]
-
-    # Copiar código clásico (sin Qiskit)
-    for linea in lineas[1:]:
-        stripped = linea.strip()
-        if not stripped or stripped.startswith('#'):
-            continue
-        if stripped.startswith('for ') and 'range' in stripped:
-            continue
-        if stripped.startswith("return") and info['circuit_var'] in stripped:
-            continue
-        if re.search(r'\.(x|y|z|h|cx|cy|cz|swap|rx|ry|rz|initialize)\(', stripped):
-            continue
-        if any(x in stripped for x in ['QuantumCircuit', 'AerSimulator', 'save_statevector']):
-            continue
-        nuevo_codigo.append(linea)
-
-    num_qubits = info['num_qubits_literal'] or info['num_qubits_var'] or 'n_qubits'
-
-    # Device + QNode
-    nuevo_codigo.append("")
-    nuevo_codigo.append(f"{indent}dev = qml.device('default.qubit', wires={num_qubits})")
-    nuevo_codigo.append(f"{indent}@qml.qnode(dev)")
-    nuevo_codigo.append(f"{indent}def circuit():")
-    circuit_indent = indent + "    "
-
-    for linea in lineas[1:]:
-        stripped = linea.strip()
-        # Initialize
-        if f"{info['circuit_var']}.initialize" in stripped:
-            nuevo_codigo.append(f"{circuit_indent}qml.AmplitudeEmbedding(")
-            nuevo_codigo.append(f"{circuit_indent}    features={info['initialize_var']},")
-            nuevo_codigo.append(f"{circuit_indent}    wires=range({num_qubits}),")
-            nuevo_codigo.append(f"{circuit_indent}    normalize=False")
-            nuevo_codigo.append(f"{circuit_indent})")
-
-        traduccion = traducir_operacion(stripped, info, circuit_indent)
-        if traduccion:
-            nuevo_codigo.append(traduccion)
-
-    # Return statevector + número de qubits
-    nuevo_codigo.append(f"{circuit_indent}return qml.state()")
-    nuevo_codigo.append("")
-    nuevo_codigo.append(f"{indent}statevector = circuit()")
-    nuevo_codigo.append(f"{indent}num_qubits = {num_qubits}")
-    nuevo_codigo.append(f"{indent}return statevector, num_qubits, normalizacion")
-
-    return '\n'.join(nuevo_codigo)
-
-def traducir_operacion(linea, info, indent):
-    """Traduce una operación individual de Qiskit a PennyLane"""
-    circuit_var = info['circuit_var']
-
-    # Puertas de un qubit
-    for gate, pl_gate in GATE_MAPPING.items():
-        pattern = rf'{circuit_var}\.{gate}\(([^)]+)\)'
-        match = re.search(pattern, linea)
-        if match:
-            qubit = match.group(1).strip()
-            return f"{indent}{pl_gate}(wires={qubit})"
-
-    # Puertas de dos qubits
-    two_qubit = r'(cx|cy|cz|swap)'
-    pattern = rf'{circuit_var}\.({two_qubit})\(([^,]+),\s*([^)]+)\)'
-    match = re.search(pattern, linea)
-    if match:
-        gate = match.group(1)
-        q1, q2 = match.group(2).strip(), match.group(3).strip()
-        return f"{indent}{GATE_MAPPING[gate]}(wires=[{q1}, {q2}])"
-
-    # Puertas parametrizadas
-    param_pattern = rf'{circuit_var}\.(rx|ry|rz)\(([^,]+),\s*([^)]+)\)'
-    match = re.search(param_pattern, linea)
-    if match:
-        gate = match.group(1)
-        param, qubit = match.group(2).strip(), match.group(3).strip()
-        return f"{indent}{GATE_MAPPING[gate]}({param}, wires={qubit})"
 
+def _propagar_omitidas(funciones):
+    """
+    Omite también las funciones que usan funciones omitidas (recorrido lineal en aristas).
+    Devuelve {función omitida: motivo}
+    """
+    usuarios = {nombre: [] for nombre in funciones}
+    for nombre, info in funciones.items():
+        for ref in info['referencias'] & funciones.keys():
+            if ref != nombre:
+                usuarios[ref].append(nombre)
+
+    pendientes = [n for n, info in funciones.items() if not info['traducible'] and n not in FUNCIONES_PLANTILLA]
+    omitidas = {n: funciones[n]['motivo'] for n in pendientes}
+    while pendientes:
+        omitida = pendientes.pop()
+        for usuario in usuarios[omitida]:
+            if usuario not in omitidas and usuario not in FUNCIONES_PLANTILLA:
+                omitidas[usuario] = f"llama a {omitida} ({omitidas[omitida]})"
+                pendientes.append(usuario)
+    return omitidas
+
+# =============================================================================
+# TRANSFORMACIÓN
+# =============================================================================
+
+def _circuito_de_sentencia(sentencia, circuitos):
+    """Circuito sobre el que actúa una sentencia puramente cuántica, o None"""
+    if isinstance(sentencia, ast.Expr):
+        llamada = sentencia.value
+        if (isinstance(llamada, ast.Call) and isinstance(llamada.func, ast.Attribute)
+                and isinstance(llamada.func.value, ast.Name)
+                and llamada.func.value.id in circuitos
+                and llamada.func.attr in _TRADUCTORES_METODO):
+            return llamada.func.value.id
+        return None
+    if type(sentencia) in _CABECERAS:
+        encontrados = {_circuito_de_sentencia(s, circuitos) for s in sentencia.body + sentencia.orelse}
+        if len(encontrados) == 1 and None not in encontrados:
+            return encontrados.pop()
     return None
 
-def generar_main():
-    """Genera automáticamente un main para PennyLane usando StatePrep"""
-    main_code = [
+def _contiene_circuito(sentencia, circuitos, funciones_estado):
+    """True si un bloque compuesto contiene operaciones o preparaciones de algún circuito"""
+    return any(_circuito_de_sentencia(s, circuitos) is not None
+               or _es_preparacion(s, circuitos, funciones_estado) is not None
+               for s in ast.walk(sentencia) if isinstance(s, ast.stmt) and s is not sentencia)
+
+def _omitidas_en(nodos, omitidas):
+    """Funciones omitidas a las que se refieren los nodos (ordenadas)"""
+    return sorted({n.id for nodo in nodos for n in ast.walk(nodo) if isinstance(n, ast.Name) and n.id in omitidas})
+
+def _cabecera_nodos(sentencia):
+    """Expresiones de la cabecera de una sentencia compuesta (se evalúan antes que sus ramas)"""
+    return [sentencia.target, sentencia.iter] if isinstance(sentencia, ast.For) else [sentencia.test]
+
+def _guarda_omitidas(nombres, omitidas, sangria):
+    """
+    Sustituye el código que llama a funciones omitidas (solo ocurre en el main: una función
+    que las llama también se omite) por un error de línea de órdenes en lugar de un NameError
+    """
+    mensaje = '; '.join(f"{nombre} no está en el código traducido: {omitidas[nombre]}" for nombre in nombres)
+    return [f"{sangria}raise SystemExit({mensaje!r})"]
+
+class _ReescritorNumQubits(ast.NodeTransformer):
+    """cq.num_qubits → número de wires del circuito (el circuito traducido es un statevector)"""
+
+    def __init__(self, wires):
+        self.wires = wires
+
+    def visit_Attribute(self, nodo):
+        if nodo.attr == 'num_qubits' and isinstance(nodo.value, ast.Name) and nodo.value.id in self.wires:
+            expresion = ast.parse(self.wires[nodo.value.id], mode='eval').body
+            expresion.sustituido = True
+            return expresion
+        return self.generic_visit(nodo)
+
+def _sustituir_num_qubits(sentencia, circuitos, wires):
+    """La sentencia con cq.num_qubits reescrito, o la misma si no lo usa"""
+    if not any(isinstance(n, ast.Attribute) and n.attr == 'num_qubits'
+               and isinstance(n.value, ast.Name) and n.value.id in circuitos for n in ast.walk(sentencia)):
+        return sentencia
+    expresiones = {c: wires.get(c, f"int(np.log2(np.shape({c})[-1]))") for c in circuitos}
+    nueva = _ReescritorNumQubits(expresiones).visit(copy.deepcopy(sentencia))
+    nueva.sustituido = True
+    return nueva
+
+def _traducir_sentencia_cuantica(sentencia, lineas, objetivo='pennylane'):
+    """Traduce una sentencia cuántica (y los bucles que la contienen) a líneas del objetivo"""
+    if isinstance(sentencia, ast.Expr):
+        llamada = sentencia.value
+        return TRADUCTORES[objetivo][llamada.func.attr](llamada, lineas)
+    cuerpo = [l for s in sentencia.body for l in _traducir_sentencia_cuantica(s, lineas, objetivo)] or ['pass']
+    resultado = [_CABECERAS[type(sentencia)](sentencia, lineas)] + ['    ' + l for l in cuerpo]
+    if sentencia.orelse:
+        resto = [l for s in sentencia.orelse for l in _traducir_sentencia_cuantica(s, lineas, objetivo)] or ['pass']
+        resultado += ['else:'] + ['    ' + l for l in resto]
+    return resultado
+
+class _ReescritorMutadores(ast.NodeTransformer):
+    """f(cq, ...) como sentencia → cq = f(cq, ...) para funciones que modificaban el circuito"""
+
+    def __init__(self, mutadores):
+        self.mutadores = mutadores
+
+    def visit_Expr(self, nodo):
+        llamada = nodo.value
+        if isinstance(llamada, ast.Call) and isinstance(llamada.func, ast.Name) and llamada.func.id in self.mutadores:
+            indice = self.mutadores[llamada.func.id]
+            if indice < len(llamada.args) and isinstance(llamada.args[indice], ast.Name):
+                destino = ast.Name(llamada.args[indice].id, ast.Store())
+                return ast.copy_location(ast.Assign([destino], llamada), nodo)
+        return nodo
+
+def _llama_a_mutador(sentencia, mutadores):
+    return any(isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id in mutadores
+               for n in ast.walk(sentencia))
+
+def _indentar(codigo, sangria):
+    return [sangria + linea if linea else linea for linea in codigo.split('\n')]
+
+def _traducir_preparacion(sentencia, circuito, llamada, lineas, funciones_estado):
+    """x = f(cq, args...) → cq, x = g(args...): el statevector se calcula sin QNode"""
+    funcion = llamada.func
+    if isinstance(funcion, ast.Attribute):
+        destino = f"{_texto(funcion.value, lineas)}.{funciones_estado[funcion.attr]}"
+    else:
+        destino = funciones_estado[funcion.id]
+    argumentos = [_texto(a, lineas) for a in llamada.args[1:]]
+    argumentos += [f"{kw.arg}={_texto(kw.value, lineas)}" for kw in llamada.keywords]
+    return f"{circuito}, {_texto(sentencia.targets[0], lineas)} = {destino}({', '.join(argumentos)})"
+
+class _RegistroQNodes:
+    """
+    QNodes de primer nivel del módulo generado: uno por circuito distinto, y su
+    device y QNode se crean una sola vez por número de wires (lru_cache)
+    """
+
+    def __init__(self):
+        self.nombres = {}
+        self.definiciones = []
+
+    def registrar(self, interior, argumentos, base):
+        clave = ('\n'.join(interior), tuple(argumentos))
+        if clave not in self.nombres:
+            nombre = f"_qnode_{base}"
+            usados = set(self.nombres.values())
+            sufijo = 2
+            while nombre in usados:
+                nombre = f"_qnode_{base}_{sufijo}"
+                sufijo += 1
+            self.nombres[clave] = nombre
+            self.definiciones += [
+                "@functools.lru_cache(maxsize=None)",
+                f"def {nombre}({VARIABLE_WIRES}):",
+                f"    dev = qml.device('default.qubit', wires={VARIABLE_WIRES})",
+                "",
+                "    @qml.qnode(dev)",
+                f"    def circuit({', '.join(argumentos)}):",
+            ]
+            self.definiciones += ['        ' + l for l in interior + ["return qml.state()"]]
+            self.definiciones += ["    return circuit", "", ""]
+        return self.nombres[clave]
+
+def _locales(nodo):
+    """Nombres locales de una función (parámetros y asignados) o del cuerpo del main"""
+    nombres = {n.id for n in ast.walk(nodo) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+    if isinstance(nodo, ast.FunctionDef):
+        nombres |= {a.arg for a in nodo.args.args + nodo.args.kwonlyargs}
+    return nombres
+
+def _argumentos_libres(interior, locales):
+    """Variables locales que usa el circuito (en orden de aparición): pasan a ser argumentos del QNode"""
+    arbol = ast.parse('\n'.join(interior))
+    nombres = sorted((n for n in ast.walk(arbol) if isinstance(n, ast.Name)), key=lambda n: (n.lineno, n.col_offset))
+    ligados = {n.id for n in nombres if isinstance(n.ctx, ast.Store)} | {VARIABLE_WIRES}
+    argumentos = []
+    for n in nombres:
+        if n.id in locales and n.id not in ligados and n.id not in argumentos:
+            argumentos.append(n.id)
+    return argumentos
+
+def _bloque_qnode(circuito, sentencias, lineas, expresion_wires, con_estado, sangria, contexto):
+    """Llamada al QNode de primer nivel que aplica las sentencias; el circuito pasa a ser el statevector"""
+    interior = []
+    if con_estado:
+        interior.append(f"qml.StatePrep({circuito}, wires=range({VARIABLE_WIRES}))")
+    interior += [l for s in sentencias for l in _traducir_sentencia_cuantica(s, lineas)]
+    # Las entradas (estado, features, ángulos...) son argumentos del QNode: admiten lotes (broadcasting)
+    argumentos = _argumentos_libres(interior, contexto['locales'])
+    nombre = contexto['qnodes'].registrar(interior, argumentos, contexto['nombre'])
+
+    bloque = [
+        f"{VARIABLE_WIRES} = {expresion_wires}",
+        f"{circuito} = {nombre}({VARIABLE_WIRES})({', '.join(argumentos)})",
+    ]
+    return [sangria + l if l else l for l in bloque]
+
+def _empieza_preparando(sentencias):
+    """True si la primera sentencia es cq.initialize(...), que sustituye el estado entero"""
+    primera = sentencias[0]
+    return (isinstance(primera, ast.Expr) and isinstance(primera.value, ast.Call)
+            and isinstance(primera.value.func, ast.Attribute) and primera.value.func.attr == 'initialize')
+
+def _bloque_numpy(circuito, sentencias, lineas, expresion_wires, con_estado, sangria, contexto):
+    """Sentencias aplicadas directamente sobre el statevector (el circuito ya es un array)"""
+    # |0...0> solo hace falta si el bloque no empieza preparando el estado
+    bloque = [] if con_estado or _empieza_preparando(sentencias) else [
+        f"{circuito} = _estado_inicial({expresion_wires})"]
+    bloque += [l for s in sentencias for l in _traducir_sentencia_cuantica(s, lineas, 'numpy')]
+    return [sangria + l if l else l for l in bloque]
+
+_BLOQUES = {'pennylane': _bloque_qnode, 'numpy': _bloque_numpy}
+
+def _traducir_cuerpo(cuerpo, lineas, inicio, circuitos, parametros_circuito, mutadores, estado=None,
+                     objetivo='pennylane', contexto=None):
+    """
+    Traduce una lista de sentencias; el código clásico se copia tal cual (con sus comentarios).
+    estado = (wires, con_estado) lo comparten los bloques anidados con el cuerpo que los contiene.
+    contexto = {'qnodes', 'locales', 'nombre', 'omitidas', 'funciones_estado'}: registro de
+    QNodes del módulo, nombres locales de la función, nombre base de sus QNodes, funciones
+    omitidas con su motivo (las sentencias que las llaman se sustituyen por un SystemExit) y
+    registro de funciones de estado (ver traducir_codigo_completo).
+    """
+    sangria = ' ' * cuerpo[0].col_offset
+    salida = []
+    pendientes = {}
+    if estado is None:
+        estado = ({c: f"int(np.log2(np.shape({c})[-1]))" for c in parametros_circuito},
+                  {c: True for c in parametros_circuito})
+    wires, con_estado = estado
+    omitidas = (contexto or {}).get('omitidas', {})
+    funciones_estado = (contexto or {}).get('funciones_estado') or {}
+
+    def afectados(sentencia):
+        # Circuitos que usa la sentencia, o cuyas operaciones pendientes leen nombres que ella
+        # usa (p. ej. la reasignación de un ángulo o devolver el buffer de las amplitudes):
+        # sus QNodes se evalúan antes, como en Qiskit
+        nombres = {n.id for n in ast.walk(sentencia) if isinstance(n, ast.Name)}
+        return [c for c, ops in pendientes.items()
+                if c in nombres or nombres & {n.id for op in ops for n in ast.walk(op) if isinstance(n, ast.Name)}]
+
+    def volcar(circuito):
+        # Circuitos que no salen de QuantumCircuit(n) (p. ej. cq.copy()) ya son un statevector
+        # (o un lote (N, 2**n) de statevectors)
+        salida.extend(_BLOQUES[objetivo](circuito, pendientes.pop(circuito), lineas,
+                                    wires.get(circuito, f"int(np.log2(np.shape({circuito})[-1]))"),
+                                    con_estado.get(circuito, True), sangria, contexto))
+        con_estado[circuito] = True
+
+    anterior = inicio
+    for sentencia in cuerpo:
+        sentencia = _sustituir_num_qubits(sentencia, circuitos, wires)
+        creacion = _es_creacion(sentencia)
+        compuesta = type(sentencia) in _CABECERAS
+        if _es_modulo_qiskit(sentencia):
+            pass                                        # Import diferido de qiskit: sobra en PennyLane
+        elif usadas := _omitidas_en(_cabecera_nodos(sentencia) if compuesta else [sentencia], omitidas):
+            # Llama a funciones omitidas: lo que sigue en este bloque ya no se ejecutaría
+            salida += [l.rstrip('\r\n') for l in lineas[anterior:sentencia.lineno - 1]]
+            salida += _guarda_omitidas(usadas, omitidas, sangria)
+            pendientes.clear()
+            break
+        elif (preparacion := _es_preparacion(sentencia, circuitos, funciones_estado)) is not None:
+            circuito, llamada = preparacion
+            if circuito in pendientes:
+                volcar(circuito)
+            salida.append(sangria + _traducir_preparacion(sentencia, circuito, llamada, lineas, funciones_estado))
+            con_estado[circuito] = True
+        elif creacion and creacion[0] in circuitos:
+            wires[creacion[0]] = _texto(creacion[1], lineas)
+            con_estado[creacion[0]] = False
+        elif (circuito := _circuito_de_sentencia(sentencia, circuitos)) is not None:
+            pendientes.setdefault(circuito, []).append(sentencia)
+        elif compuesta and (_contiene_circuito(sentencia, circuitos, funciones_estado)
+                            or _omitidas_en([sentencia], omitidas)):
+            # Bloque mixto (código clásico y cuántico, o ramas que llaman a funciones omitidas):
+            # se traduce rama a rama
+            for circuito in afectados(sentencia):
+                volcar(circuito)
+            salida += [l.rstrip('\r\n') for l in lineas[anterior:sentencia.lineno - 1]]
+            salida.append(sangria + _CABECERAS[type(sentencia)](sentencia, lineas))
+            antes = dict(con_estado)
+            for i, rama in enumerate([sentencia.body] + ([sentencia.orelse] if sentencia.orelse else [])):
+                if i:
+                    salida.append(sangria + 'else:')
+                con_estado_rama = dict(antes)
+                salida += _traducir_cuerpo(rama, lineas, rama[0].lineno - 1, circuitos, [], mutadores,
+                                           (wires, con_estado_rama), objetivo, contexto)
+                # Una rama que sale (return, break...) no cambia el estado del código que sigue
+                if not isinstance(rama[-1], (ast.Return, ast.Raise, ast.Break, ast.Continue)):
+                    for c, preparado in con_estado_rama.items():
+                        con_estado[c] = con_estado.get(c, False) or preparado
+        else:
+            for circuito in afectados(sentencia):
+                volcar(circuito)
+            if _llama_a_mutador(sentencia, mutadores):
+                nueva = _ReescritorMutadores(mutadores).visit(copy.deepcopy(sentencia))
+                salida += _indentar(ast.unparse(ast.fix_missing_locations(nueva)), sangria)
+            elif getattr(sentencia, 'sustituido', False):
+                salida += [l.rstrip('\r\n') for l in lineas[anterior:sentencia.lineno - 1]]
+                salida += _indentar(ast.unparse(sentencia), sangria)
+            else:
+                salida += [l.rstrip('\r\n') for l in lineas[anterior:sentencia.end_lineno]]
+        anterior = sentencia.end_lineno
+
+    for circuito in list(pendientes):
+        volcar(circuito)
+    return salida
+
+def _traducir_funcion(nodo, info, lineas, mutadores, objetivo='pennylane', qnodes=None, funciones_estado=None):
+    """Traduce una función: cabecera tal cual y cuerpo con los circuitos convertidos en QNodes (o en NumPy)"""
+    primera = min([d.lineno for d in nodo.decorator_list] + [nodo.lineno]) - 1
+    inicio_cuerpo = nodo.body[0].lineno - 1
+    cabecera = [l.rstrip('\r\n') for l in lineas[primera:inicio_cuerpo]]
+    contexto = {'qnodes': qnodes, 'locales': _locales(nodo), 'nombre': nodo.name,
+                'funciones_estado': funciones_estado}
+    cuerpo = _traducir_cuerpo(nodo.body, lineas, inicio_cuerpo, info['circuitos'],
+                              info['parametros_circuito'], mutadores, objetivo=objetivo, contexto=contexto)
+    if nodo.name in mutadores:
+        # Antes modificaba el circuito en sitio: ahora devuelve el nuevo statevector
+        circuito = info['parametros'][mutadores[nodo.name]]
+        cuerpo.append(' ' * nodo.body[0].col_offset + f"return {circuito}")
+    return cabecera + cuerpo
+
+def generar_main(objetivo='pennylane'):
+    """Genera automáticamente un main para PennyLane usando StatePrep (o para NumPy con _aplicar)"""
+    main_code = []
+    if objetivo != 'numpy':
+        # El QNode del filtro, a nivel de módulo y uno por número de qubits
+        main_code += [
+            "@functools.lru_cache(maxsize=None)",
+            "def _qnode_negativo(num_qubits):",
+            "    dev = qml.device('default.qubit', wires=num_qubits)",
+            "",
+            "    @qml.qnode(dev)",
+            "    def circuito_negativo(estado):",
+            "        qml.StatePrep(estado, wires=range(num_qubits))",
+            "        for q in range(num_qubits):",
+            "            qml.PauliX(wires=q)",
+            "        return qml.state()",
+            "    return circuito_negativo",
+            "",
+        ]
+    main_code += [
         "if __name__ == '__main__':",
         "    ruta_imagen = 'paisaje.jpg'  # Reemplaza con tu imagen 8x8",
         "    img_arr = preprocesar_image(ruta_imagen)",
@@ -193,15 +695,18 @@ def generar_main():
         "",
         "    cq, num_qubits, normalizacion = codificar_a_qubits(img_arr)",
         "",
-        "    dev = qml.device('default.qubit', wires=num_qubits)",
-        "    @qml.qnode(dev)",
-        "    def circuito_negativo():",
-        "        qml.StatePrep(cq, wires=range(num_qubits))",
-        "        for q in range(num_qubits):",
-        "            qml.PauliX(wires=q)",
-        "        return qml.state()",
-        "",
-        "    cq_neg = circuito_negativo()",
+    ]
+    if objetivo == 'numpy':
+        main_code += [
+            "    cq_neg = cq",
+            "    for q in range(num_qubits):",
+            "        cq_neg = _aplicar(cq_neg, _X, [q])",
+        ]
+    else:
+        main_code += [
+            "    cq_neg = _qnode_negativo(num_qubits)(cq)",
+        ]
+    main_code += [
         "    img_cuantica = reconstruir_imagen(cq_neg, normalizacion)",
         "    plt.subplot(1, 3, 3)",
         "    plt.imshow(img_cuantica, cmap='gray')",
@@ -214,53 +719,275 @@ def generar_main():
     ]
     return '\n'.join(main_code)
 
-def traducir_codigo_completo(codigo_qiskit):
-    """Traduce el código completo de Qiskit a PennyLane"""
-    info = extraer_informacion_circuito(codigo_qiskit)
-
-    # Separar en funciones
-    funciones = re.split(r'\n(?=def\s+\w+)', codigo_qiskit)
-    codigo_traducido = []
-
-    # Header
-    codigo_traducido.append("# Código traducido de Qiskit a PennyLane")
-    codigo_traducido.append("# Generado automáticamente\n")
-    codigo_traducido.append("import pennylane as qml")
-    codigo_traducido.append("import numpy as np")
-    codigo_traducido.append("import matplotlib.pyplot as plt")
-    codigo_traducido.append("from PIL import Image")
-    codigo_traducido.append("import time\n")
-
-    # Traducir funciones
-    for seccion in funciones:
-        if seccion.strip().startswith('def'):
-            codigo_traducido.append(traducir_funcion_qiskit(seccion, info))
-        elif seccion.strip() and not any(x in seccion for x in ['import', 'from']):
-            codigo_traducido.append(seccion)
-    
-    # Agregar main
-    codigo_traducido.append(generar_main())
-
-    return '\n'.join(codigo_traducido)
+def traducir_codigo_completo(codigo_qiskit, objetivo='pennylane', funciones_estado=None):
+    """
+    Traduce el código completo de Qiskit a PennyLane (o a NumPy) en una sola pasada sobre el AST.
+    funciones_estado = {f: g} registra funciones que preparan un circuito (primer argumento)
+    y tienen una versión que devuelve directamente el statevector: x = f(cq, ...) se
+    traduce a cq, x = g(...).
+    """
+    if objetivo not in TRADUCTORES:
+        raise ValueError(f"Objetivo desconocido: {objetivo}")
+    arbol = ast.parse(codigo_qiskit)
+    lineas = codigo_qiskit.splitlines(keepends=True)
+
+    # Análisis: un recorrido por función
+    funciones = {n.name: _analizar_funcion(n) for n in arbol.body if isinstance(n, ast.FunctionDef)}
+    omitidas = _propagar_omitidas(funciones)
+    mutadores = {
+        nombre: info['parametros'].index(info['parametros_circuito'][0])
+        for nombre, info in funciones.items()
+        if nombre not in omitidas and nombre not in FUNCIONES_PLANTILLA
+        and info['parametros_circuito'] and not info['devuelve_valor']
+    }
+
+    if objetivo == 'numpy':
+        codigo_traducido = [
+            "# Código traducido de Qiskit a NumPy",
+            "# Generado automáticamente (sin dependencias de SDKs cuánticos)",
+            "",
+        ] + PRELUDIO_NUMPY.splitlines() + [""]
+    else:
+        codigo_traducido = [
+            "# Código traducido de Qiskit a PennyLane",
+            "# Generado automáticamente",
+            "",
+            "import functools",
+            "import pennylane as qml",
+        ]
+        importa_numpy = any(isinstance(n, ast.Import) and any(a.name == 'numpy' and a.asname == 'np' for a in n.names)
+                            for n in arbol.body)
+        if not importa_numpy:
+            codigo_traducido.append("import numpy as np")
+    cabecera = len(codigo_traducido)
+    qnodes = _RegistroQNodes()
+
+    # Transformación: cada nodo de primer nivel se copia, se sustituye o se traduce
+    anterior = 0
+    tiene_main = False
+    for nodo in arbol.body:
+        primera = min([d.lineno for d in getattr(nodo, 'decorator_list', [])] + [nodo.lineno]) - 1
+        codigo_traducido += [l.rstrip('\r\n') for l in lineas[anterior:primera]]
+        anterior = nodo.end_lineno
+
+        if _es_modulo_qiskit(nodo):
+            continue
+        if isinstance(nodo, ast.FunctionDef):
+            if nodo.name in FUNCIONES_PLANTILLA:
+                # Los decoradores del original (p. ej. la instrumentación) se conservan
+                codigo_traducido += [l.rstrip('\r\n') for l in lineas[primera:nodo.lineno - 1]]
+                codigo_traducido.append(FUNCIONES_PLANTILLA[nodo.name])
+            elif nodo.name in omitidas:
+                codigo_traducido.append(f"# {nodo.name}: omitida, {omitidas[nodo.name]}")
+            elif (funciones[nodo.name]['circuitos'] or funciones[nodo.name]['importa_qiskit']
+                  or _llama_a_mutador(nodo, mutadores)):
+                codigo_traducido += _traducir_funcion(nodo, funciones[nodo.name], lineas, mutadores, objetivo, qnodes,
+                                                      funciones_estado)
+            else:
+                codigo_traducido += [l.rstrip('\r\n') for l in lineas[primera:nodo.end_lineno]]
+        elif _es_main(nodo):
+            tiene_main = True
+            info = _analizar_funcion(nodo)
+            inicio_cuerpo = nodo.body[0].lineno - 1
+            codigo_traducido += [l.rstrip('\r\n') for l in lineas[primera:inicio_cuerpo]]
+            contexto = {'qnodes': qnodes, 'locales': _locales(nodo), 'nombre': 'main', 'omitidas': omitidas,
+                        'funciones_estado': funciones_estado}
+            codigo_traducido += _traducir_cuerpo(nodo.body, lineas, inicio_cuerpo, info['circuitos'], [], mutadores,
+                                                 objetivo=objetivo, contexto=contexto)
+        else:
+            codigo_traducido += [l.rstrip('\r\n') for l in lineas[primera:nodo.end_lineno]]
+
+    # Agregar main si el original no tenía y define las funciones que usa
+    if not tiene_main and FUNCIONES_MAIN <= funciones.keys():
+        codigo_traducido.append("")
+        codigo_traducido.append(generar_main(objetivo))
+
+    if qnodes.definiciones:
+        # Devices y QNodes a nivel de módulo, antes del código traducido que los usa
+        codigo_traducido[cabecera:cabecera] = [
+            "",
+            "# =============================================================================",
+            "# QNODES (uno por circuito; device y QNode se crean una vez por número de wires)",
+            "# =============================================================================",
+        ] + qnodes.definiciones
+    return _depurar_importaciones('\n'.join(codigo_traducido) + '\n')
+
+def _depurar_importaciones(codigo):
+    """
+    Quita los imports de primer nivel que el código traducido ya no usa (p. ej. los
+    de funciones omitidas) y los repetidos (numpy o functools de la cabecera y del original)
+    """
+    arbol = ast.parse(codigo)
+    usados = {n.id for n in ast.walk(arbol) if isinstance(n, ast.Name)}
+    lineas = codigo.splitlines()
+    vistos = set()
+    for nodo in arbol.body:
+        if not isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            continue
+        conservados = []
+        for alias in nodo.names:
+            nombre = alias.asname or alias.name.split('.')[0]
+            clave = (getattr(nodo, 'module', None), alias.name, nombre)
+            if nombre in usados and clave not in vistos:
+                conservados.append(alias)
+                vistos.add(clave)
+        if len(conservados) == len(nodo.names):
+            continue
+        # Las líneas del import se vacían (None) y se quitan al final, sin mover los números de línea
+        lineas[nodo.lineno - 1:nodo.end_lineno] = [None] * (nodo.end_lineno - nodo.lineno + 1)
+        if conservados:
+            nodo.names = conservados
+            lineas[nodo.lineno - 1] = ast.unparse(nodo)
+    return '\n'.join(l for l in lineas if l is not None) + '\n'
+
+# =============================================================================
+# MODO POR LOTES: ÁRBOLES DE DIRECTORIOS, POOL DE PROCESOS Y MANIFIESTO
+# =============================================================================
+
+def _hash(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+def _version_traductor():
+    """Hash del propio traductor y de sus tablas de puertas: si cambian, hay que regenerar todo"""
+    contenido = b''
+    for modulo in (__file__, puertas.__file__):
+        with open(os.path.abspath(modulo), 'rb') as f:
+            contenido += f.read()
+    return _hash(contenido)
+
+def traducir_archivo(ruta_entrada, ruta_salida, objetivo='pennylane', funciones_estado=None):
+    """Traduce un archivo; los que no usan Qiskit se copian tal cual. Devuelve None o el error"""
+    try:
+        with open(ruta_entrada, 'r', encoding='utf-8') as f:
+            codigo = f.read()
+        if 'qiskit' in codigo:
+            codigo = traducir_codigo_completo(codigo, objetivo, funciones_estado)
+        os.makedirs(os.path.dirname(ruta_salida) or '.', exist_ok=True)
+        temporal = ruta_salida + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as f:
+            f.write(codigo)
+        os.replace(temporal, ruta_salida)
+    except (OSError, SyntaxError, ValueError) as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+def _traducir_tarea(tarea):
+    return tarea[0], traducir_archivo(*tarea[1:])
+
+def _cargar_manifiesto(ruta):
+    try:
+        with open(ruta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'version': None, 'archivos': {}}
+
+def traducir_directorio(origen, destino, procesos=None, forzar=False, objetivo='pennylane', funciones_estado=None):
+    """
+    Traduce todos los .py de origen a destino (misma estructura).
+    Solo se regeneran los archivos cuyo contenido cambió desde la última
+    ejecución según el manifiesto de hashes; los borrados se eliminan.
+    """
+    ruta_manifiesto = os.path.join(destino, NOMBRE_MANIFIESTO)
+    manifiesto = _cargar_manifiesto(ruta_manifiesto)
+    # Cambiar de objetivo o de funciones de estado también regenera todo
+    version = f"{_version_traductor()}:{objetivo}:{json.dumps(funciones_estado or {}, sort_keys=True)}"
+    if forzar or manifiesto.get('version') != version:
+        manifiesto = {'version': version, 'archivos': {}}
+    anteriores = manifiesto['archivos']
+
+    actuales = {}
+    tareas = []
+    destino_abs = os.path.abspath(destino)
+    for carpeta, subcarpetas, archivos in os.walk(origen):
+        # No recorrer el propio destino si está dentro del origen
+        subcarpetas[:] = [d for d in subcarpetas if os.path.abspath(os.path.join(carpeta, d)) != destino_abs]
+        for nombre in archivos:
+            if not nombre.endswith('.py'):
+                continue
+            ruta = os.path.join(carpeta, nombre)
+            relativa = os.path.relpath(ruta, origen)
+            with open(ruta, 'rb') as f:
+                actuales[relativa] = _hash(f.read())
+            salida = os.path.join(destino, relativa)
+            if anteriores.get(relativa) != actuales[relativa] or not os.path.exists(salida):
+                tareas.append((relativa, ruta, salida, objetivo, funciones_estado))
+
+    # Eliminar las traducciones de archivos que ya no existen
+    for relativa in anteriores.keys() - actuales.keys():
+        try:
+            os.remove(os.path.join(destino, relativa))
+        except OSError:
+            pass
+
+    errores = {}
+    if tareas:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            trozo = max(1, len(tareas) // (4 * (procesos or os.cpu_count() or 1)))
+            for relativa, error in pool.map(_traducir_tarea, tareas, chunksize=trozo):
+                if error:
+                    errores[relativa] = error
+
+    # Los archivos con error no se guardan en el manifiesto, así se reintentan
+    manifiesto['archivos'] = {r: h for r, h in actuales.items() if r not in errores}
+    os.makedirs(destino, exist_ok=True)
+    with open(ruta_manifiesto, 'w', encoding='utf-8') as f:
+        json.dump(manifiesto, f, indent=2, sort_keys=True)
+
+    return {
+        'traducidos': len(tareas) - len(errores),
+        'sin_cambios': len(actuales) - len(tareas),
+        'eliminados': len(anteriores.keys() - actuales.keys()),
+        'errores': errores,
+    }
 
 # =============================================================================
 # EJECUCIÓN PRINCIPAL DEL TRADUCTOR
 # =============================================================================
 def main():
-    if not os.path.exists(RUTA_ARCHIVO_QISKIT):
-        print(f"❌ ERROR: No se encontró el archivo '{RUTA_ARCHIVO_QISKIT}'")
+    parser = argparse.ArgumentParser(description="Traductor de Qiskit a PennyLane (o a NumPy)")
+    parser.add_argument('origen', nargs='?', default=RUTA_ARCHIVO_QISKIT, help="Archivo o directorio de Qiskit")
+    parser.add_argument('destino', nargs='?', default=None,
+                        help="Archivo o directorio de salida (por defecto, codigo_pennylane.py o codigo_numpy.py)")
+    parser.add_argument('--objetivo', choices=tuple(TRADUCTORES), default='pennylane',
+                        help="Código generado: PennyLane o NumPy puro (sin SDK cuántico)")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool en modo directorio")
+    parser.add_argument('--forzar', action='store_true', help="Ignorar el manifiesto y traducir todo")
+    parser.add_argument('--estado', action='append', default=None, metavar='F=G',
+                        help="x = F(cq, ...) → cq, x = G(...): G devuelve el statevector que prepara F "
+                             "(repetible; por defecto, las de Practica1 si se traduce el archivo por defecto)")
+    args = parser.parse_args()
+    if args.destino is None:
+        args.destino = RUTA_ARCHIVO_NUMPY if args.objetivo == 'numpy' else RUTA_ARCHIVO_PENNYLANE
+    if args.estado is not None:
+        funciones_estado = dict(e.split('=', 1) for e in args.estado)
+    else:
+        funciones_estado = ESTADO_ARCHIVO_QISKIT if args.origen == RUTA_ARCHIVO_QISKIT else None
+
+    nombre_objetivo = 'NumPy' if args.objetivo == 'numpy' else 'PennyLane'
+    if os.path.isdir(args.origen):
+        print(f"⚙️  Traduciendo el directorio '{args.origen}' a {nombre_objetivo}...")
+        resumen = traducir_directorio(args.origen, args.destino, args.procesos, args.forzar, args.objetivo,
+                                      funciones_estado)
+        for relativa, error in sorted(resumen['errores'].items()):
+            print(f"❌ {relativa}: {error}")
+        print(f"✅ Traducidos: {resumen['traducidos']}, sin cambios: {resumen['sin_cambios']}, "
+              f"eliminados: {resumen['eliminados']}, errores: {len(resumen['errores'])}")
+        return
+
+    if not os.path.exists(args.origen):
+        print(f"❌ ERROR: No se encontró el archivo '{args.origen}'")
         return
 
-    with open(RUTA_ARCHIVO_QISKIT, 'r', encoding='utf-8') as f:
+    with open(args.origen, 'r', encoding='utf-8') as f:
         codigo_qiskit = f.read()
 
-    print("⚙️  Traduciendo código a PennyLane...")
-    codigo_pennylane = traducir_codigo_completo(codigo_qiskit)
+    print(f"⚙️  Traduciendo código a {nombre_objetivo}...")
+    codigo_traducido = traducir_codigo_completo(codigo_qiskit, args.objetivo, funciones_estado)
 
-    with open(RUTA_ARCHIVO_PENNYLANE, 'w', encoding='utf-8') as f:
-        f.write(codigo_pennylane)
+    with open(args.destino, 'w', encoding='utf-8') as f:
+        f.write(codigo_traducido)
 
-    print(f"✅ Traducción completada. Archivo generado: {RUTA_ARCHIVO_PENNYLANE}")
+    print(f"✅ Traducción completada. Archivo generado: {args.destino}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,173 @@
+"""
+Ajuste automático de Qiskit Aer
+Barre las opciones del simulador que más pesan en este flujo (hilos,
+experimentos en paralelo, fusión de puertas y umbral de paralelismo del
+statevector) con los circuitos reales de codificación + filtro, para un
+(num_qubits, tam_lote) dado, y guarda la mejor configuración en un perfil
+local. simular_statevectors (y por tanto reconstruir_imagen) la aplica
+automáticamente a los lotes de esa forma. La precisión no se ajusta: es
+siempre 'single' (complex64), la que presupuesta memoria.py.
+
+    python ajuste_aer.py --resolucion 64 --lote 16
+"""
+
+import argparse
+import functools
+import json
+import os
+import time
+
+import numpy as np
+
+import memoria
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+RUTA_PERFIL = os.path.join(os.path.expanduser("~"), ".compcuantica_aer.json")
+REPETICIONES_AJUSTE = 3
+
+# Mejora mínima para cambiar una opción (por debajo es ruido de medida)
+MEJORA_MINIMA = 0.05
+
+# Opciones del simulador con que se crea en Practica1 (punto de partida del barrido).
+# Son fijas: un perfil nunca las cambia (la memoria se estima con statevectors complex64)
+OPCIONES_BASE = {'precision': 'single'}
+
+def candidatos(num_qubits, tam_lote):
+    """Valores a probar por opción, en el orden en que se ajustan"""
+    nucleos = os.cpu_count() or 1
+    hilos = sorted({0, 1, max(1, nucleos // 2), nucleos})             # 0 = todos los núcleos
+    return [
+        ('max_parallel_threads', hilos),
+        # Varios experimentos a la vez (cada uno con menos hilos) solo tiene sentido con lotes
+        ('max_parallel_experiments', sorted({1, 0, min(tam_lote, nucleos)}) if tam_lote > 1 else [1]),
+        ('fusion_enable', [True, False]),
+        ('fusion_threshold', [5, 10, 14, 20]),
+        ('statevector_parallel_threshold', sorted({8, 12, 14, 16, num_qubits + 1})),
+    ]
+
+# =============================================================================
+# PERFIL
+# =============================================================================
+
+def _clave(num_qubits, tam_lote):
+    # Los lotes se agrupan en potencias de 2, como en la calibración de backends
+    return f"{num_qubits}:{1 << max(0, int(tam_lote) - 1).bit_length()}"
+
+def _cargar_perfil():
+    try:
+        with open(RUTA_PERFIL, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+@functools.lru_cache(maxsize=None)
+def _perfil():
+    return _cargar_perfil()
+
+def opciones(num_qubits, tam_lote):
+    """
+    Opciones ajustadas para un lote (num_qubits, tam_lote): las de su clave o,
+    si no se ajustó, las del lote más parecido con los mismos qubits. {} sin perfil.
+    """
+    perfil = _perfil()
+    clave = _clave(num_qubits, tam_lote)
+    if clave not in perfil:
+        parecidas = [c for c in perfil if c.split(':')[0] == str(num_qubits)]
+        if not parecidas:
+            return {}
+        clave = min(parecidas, key=lambda c: abs(np.log2(int(c.split(':')[1])) - np.log2(max(1, tam_lote))))
+    # Un perfil antiguo puede traer otra precisión: las opciones base prevalecen
+    return dict(perfil[clave]['opciones'], **OPCIONES_BASE)
+
+def guardar(num_qubits, tam_lote, elegidas, tiempo, tiempo_base):
+    perfil = _cargar_perfil()
+    perfil[_clave(num_qubits, tam_lote)] = {'opciones': elegidas, 'segundos': tiempo, 'segundos_base': tiempo_base}
+    temporal = f"{RUTA_PERFIL}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump(perfil, f, indent=2, sort_keys=True)
+    os.replace(temporal, RUTA_PERFIL)
+    _perfil.cache_clear()
+
+# =============================================================================
+# BARRIDO
+# =============================================================================
+
+def _circuitos(num_qubits, tam_lote):
+    """Lote aleatorio codificado + filtro negativo, listo para Aer, y los estados esperados"""
+    import Practica1
+    import backends
+    generador = np.random.default_rng(0)
+    imagenes = generador.random((tam_lote, 2 ** (num_qubits // 2), 2 ** (num_qubits - num_qubits // 2)), dtype=np.float32)
+    flats, _ = backends.codificar(imagenes)
+    circuitos = [Practica1.preparar_circuito_statevector(Practica1.circuito_con_plantilla(flat, num_qubits))
+                 for flat in flats]
+    return circuitos, backends.BACKENDS['numpy']['ejecutar_lote'](flats, num_qubits)
+
+def medir(circuitos, esperados, opciones_, repeticiones=REPETICIONES_AJUSTE):
+    """Segundos (mínimo de las repeticiones) con esas opciones, o None si fallan o no dan el resultado esperado"""
+    import Practica1
+    simulador = Practica1.obtener_simulador()
+    try:
+        simulador.run(circuitos, **opciones_).result()                     # Calentamiento
+        tiempos = []
+        for _ in range(repeticiones):
+            t_inicio = time.perf_counter()
+            result = simulador.run(circuitos, **opciones_).result()
+            tiempos.append(time.perf_counter() - t_inicio)
+    except Exception:
+        return None
+    obtenidos = np.stack([np.asarray(Practica1.extraer_statevector(result, i)) for i in range(len(circuitos))])
+    if not np.allclose(obtenidos, esperados, atol=1e-5):
+        return None
+    return min(tiempos)
+
+def ajustar(num_qubits, tam_lote, repeticiones=REPETICIONES_AJUSTE, informar=print):
+    """
+    Barrido coordenada a coordenada: cada opción se fija a su mejor valor
+    manteniendo las ya ajustadas. Guarda el perfil y devuelve (opciones, segundos, segundos_base).
+    """
+    memoria.comprobar_memoria(num_qubits, tam_lote)
+    circuitos, esperados = _circuitos(num_qubits, tam_lote)
+    elegidas = dict(OPCIONES_BASE)
+    tiempo_base = mejor = medir(circuitos, esperados, elegidas, repeticiones)
+    if tiempo_base is None:
+        raise RuntimeError("Aer no ejecuta los circuitos con las opciones base.")
+    informar(f"base {elegidas}: {tiempo_base * 1000:.2f} ms")
+
+    for opcion, valores in candidatos(num_qubits, tam_lote):
+        if opcion == 'fusion_threshold' and not elegidas.get('fusion_enable', True):
+            continue
+        for valor in valores:
+            if elegidas.get(opcion) == valor:
+                continue
+            prueba = dict(elegidas, **{opcion: valor})
+            tiempo = medir(circuitos, esperados, prueba, repeticiones)
+            informar(f"  {opcion}={valor}: {'falla' if tiempo is None else f'{tiempo * 1000:.2f} ms'}")
+            if tiempo is not None and tiempo < mejor * (1 - MEJORA_MINIMA):
+                mejor, elegidas = tiempo, prueba
+
+    # Medida final de base y elegidas en las mismas condiciones (sin el calentamiento del
+    # principio); si alguna falla ahora, se conservan las cifras del barrido
+    final_base = medir(circuitos, esperados, OPCIONES_BASE, repeticiones)
+    final = medir(circuitos, esperados, elegidas, repeticiones)
+    if final_base is not None and final is not None:
+        tiempo_base, mejor = final_base, final
+    guardar(num_qubits, tam_lote, elegidas, mejor, tiempo_base)
+    return elegidas, mejor, tiempo_base
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ajusta las opciones de Qiskit Aer para un tamaño de lote")
+    parser.add_argument('--resolucion', type=int, default=8, help="Lado de la imagen (potencia de 2)")
+    parser.add_argument('--lote', type=int, default=16, help="Imágenes por trabajo multi-experimento")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES_AJUSTE)
+    args = parser.parse_args()
+
+    num_qubits = memoria.qubits_para_resolucion(args.resolucion)
+    elegidas, tiempo, tiempo_base = ajustar(num_qubits, args.lote, args.repeticiones)
+    print(f"Mejor: {elegidas}")
+    print(f"{tiempo_base * 1000:.2f} ms → {tiempo * 1000:.2f} ms ({tiempo_base / tiempo:.2f}x), guardado en {RUTA_PERFIL}")
@@ -0,0 +1,222 @@
+"""
+Almacén de resultados en disco y memoria compartida entre procesos
+Las imágenes reconstruidas (y, opcionalmente, los statevectors) se escriben en
+pilas .npy preasignadas y abiertas como memmap, con un índice de nombres de
+fichero y las normalizaciones; se leen de forma perezosa con abrir(), sin
+cargar toda la ejecución en memoria. Entre el proceso principal y los del pool,
+los lotes de amplitudes viajan en bloques de multiprocessing.shared_memory
+reutilizables en lugar de serializarse con pickle.
+
+    with Almacen('salida', len(rutas), 64, guardar_estados=True) as almacen:
+        almacen.anadir(rutas, normalizaciones, estados)
+    resultados = abrir('salida')
+    ruta, imagen = resultados[0]
+"""
+
+import contextlib
+import json
+import os
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+import backends
+import codificacion
+import memoria
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+# Versión del formato del almacén: los almacenes de otra versión no se abren
+VERSION_ALMACEN = 1
+
+FICHERO_IMAGENES = "imagenes.npy"
+FICHERO_ESTADOS = "estados.npy"
+FICHERO_NORMALIZACIONES = "normalizaciones.npy"
+FICHERO_INDICE = "indice.json"
+
+# =============================================================================
+# MEMORIA COMPARTIDA
+# =============================================================================
+# Un lote se describe con (nombre del bloque, forma, dtype): es lo único que se
+# serializa al enviarlo a otro proceso
+
+def _vista(bloque, forma, dtype):
+    return np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf)
+
+class BloquesCompartidos:
+    """
+    Bloques de memoria compartida que crea, reutiliza y libera el proceso
+    principal. Un bloque liberado se reutiliza para el siguiente lote que quepa.
+    """
+
+    def __init__(self):
+        # Los procesos del pool heredan el resource_tracker del principal: sin él,
+        # cada proceso arrancaría el suyo y borraría los bloques al terminar
+        resource_tracker.ensure_running()
+        self._bloques = {}
+        self._libres = []
+
+    def reservar(self, forma, dtype):
+        """(descriptor, vista) de un bloque libre con capacidad suficiente, o de uno nuevo"""
+        forma = tuple(int(d) for d in forma)
+        dtype = np.dtype(dtype)
+        tamano = max(1, int(np.prod(forma)) * dtype.itemsize)
+        for nombre in self._libres:
+            if self._bloques[nombre].size >= tamano:
+                self._libres.remove(nombre)
+                break
+        else:
+            bloque = shared_memory.SharedMemory(create=True, size=tamano)
+            nombre = bloque.name
+            self._bloques[nombre] = bloque
+        descriptor = (nombre, forma, dtype.str)
+        return descriptor, _vista(self._bloques[nombre], forma, dtype)
+
+    def compartir(self, array):
+        """Copia el array (una sola vez) en un bloque; devuelve su descriptor"""
+        descriptor, vista = self.reservar(np.shape(array), np.asarray(array).dtype)
+        vista[...] = array
+        return descriptor
+
+    def liberar(self, descriptor):
+        """Devuelve el bloque a la reserva (las vistas anteriores dejan de ser válidas)"""
+        self._libres.append(descriptor[0])
+
+    def cerrar(self):
+        for bloque in self._bloques.values():
+            bloque.unlink()
+            try:
+                bloque.close()
+            except BufferError:
+                pass                                # Queda una vista viva: se desmapea al liberarla
+        self._bloques.clear()
+        self._libres.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+@contextlib.contextmanager
+def adjuntar(descriptor):
+    """
+    Vista (sin copia) de un bloque creado por otro proceso. Al salir del with se
+    cierra: no deben quedar referencias a la vista (del antes de salir).
+    """
+    nombre, forma, dtype = descriptor
+    bloque = shared_memory.SharedMemory(name=nombre)
+    try:
+        yield _vista(bloque, forma, dtype)
+    finally:
+        bloque.close()
+
+# =============================================================================
+# ESCRITURA
+# =============================================================================
+
+class Almacen:
+    """
+    Pilas .npy preasignadas (memmap) para num_imagenes resultados: imágenes
+    float32 (N, R, R) o (N, R, R, 3) en color, normalizaciones y, con
+    guardar_estados, statevectors complex64 (N, 2**n). Los lotes se añaden en
+    el orden en que llegan; el índice (rutas en ese orden) se escribe al cerrar.
+    """
+
+    def __init__(self, directorio, num_imagenes, resolucion, color=False, guardar_estados=False):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.resolucion = resolucion
+        self.color = color
+        canales = (3,) if color else ()
+        self.imagenes = self._crear(FICHERO_IMAGENES, (num_imagenes, resolucion, resolucion) + canales, np.float32)
+        self.normalizaciones = self._crear(FICHERO_NORMALIZACIONES, (num_imagenes,) + canales, np.float32)
+        self.estados = None
+        if guardar_estados:
+            qubits = memoria.qubits_para_resolucion(resolucion) + (backends.QUBITS_CANAL if color else 0)
+            self.estados = self._crear(FICHERO_ESTADOS, (num_imagenes, 2 ** qubits), np.complex64)
+        self.rutas = []
+
+    def _crear(self, nombre, forma, dtype):
+        return np.lib.format.open_memmap(os.path.join(self.directorio, nombre), mode='w+', dtype=dtype, shape=forma)
+
+    def anadir(self, rutas, normalizaciones, estados):
+        """Decodifica un lote de statevectors directamente en la pila; devuelve su posición inicial"""
+        inicio = len(self.rutas)
+        fin = inicio + len(rutas)
+        if fin > len(self.imagenes):
+            raise ValueError(f"El almacén admite {len(self.imagenes)} imágenes y se intentan escribir {fin}.")
+        codificacion.decodificar(estados, normalizaciones, out=self.imagenes[inicio:fin])
+        self.normalizaciones[inicio:fin] = normalizaciones
+        if self.estados is not None:
+            self.estados[inicio:fin] = estados
+        self.rutas.extend(rutas)
+        return inicio
+
+    def cerrar(self):
+        """Vuelca las pilas a disco y escribe el índice"""
+        for pila in (self.imagenes, self.normalizaciones, self.estados):
+            if pila is not None:
+                pila.flush()
+        indice = {
+            'version': VERSION_ALMACEN,
+            'resolucion': self.resolucion,
+            'color': self.color,
+            'estados': self.estados is not None,
+            'rutas': self.rutas,
+        }
+        destino = os.path.join(self.directorio, FICHERO_INDICE)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False)
+        os.replace(temporal, destino)              # Nunca se lee un índice a medias
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+# =============================================================================
+# LECTURA
+# =============================================================================
+
+class Resultados:
+    """Resultados de un almacén, leídos bajo demanda (memmap de solo lectura)"""
+
+    def __init__(self, directorio):
+        with open(os.path.join(directorio, FICHERO_INDICE), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+        if indice.get('version') != VERSION_ALMACEN:
+            raise ValueError(f"Versión de almacén no soportada: {indice.get('version')}")
+        self.rutas = indice['rutas']
+        self.resolucion = indice['resolucion']
+        self.color = indice['color']
+        # Solo las posiciones escritas (una ejecución puede haber procesado menos imágenes)
+        escritas = len(self.rutas)
+        self.imagenes = np.load(os.path.join(directorio, FICHERO_IMAGENES), mmap_mode='r')[:escritas]
+        self.normalizaciones = np.load(os.path.join(directorio, FICHERO_NORMALIZACIONES), mmap_mode='r')[:escritas]
+        self.estados = None
+        if indice['estados']:
+            self.estados = np.load(os.path.join(directorio, FICHERO_ESTADOS), mmap_mode='r')[:escritas]
+        self._posiciones = None
+
+    def __len__(self):
+        return len(self.rutas)
+
+    def __getitem__(self, i):
+        return self.rutas[i], self.imagenes[i]
+
+    def posicion(self, ruta):
+        """Posición en el almacén de la imagen de origen ruta"""
+        if self._posiciones is None:
+            self._posiciones = {r: i for i, r in enumerate(self.rutas)}
+        return self._posiciones[ruta]
+
+    def imagen(self, ruta):
+        return self.imagenes[self.posicion(ruta)]
+
+def abrir(directorio):
+    """Abre un almacén para lectura perezosa"""
+    return Resultados(directorio)
@@ -0,0 +1,194 @@
+"""
+Envío asíncrono de trabajos (asyncio)
+Front end para un único proceso de servicio: los trabajos de Aer (sim.run
+devuelve un AerJob sin bloquear) y las llamadas a QNodes de PennyLane (en un
+pool de hilos) se esperan como awaitables, con un número máximo de lotes en
+vuelo. La lectura y decodificación de disco, la simulación y la escritura de
+resultados se solapan, y las imágenes se entregan con `async for` en orden de
+finalización:
+
+    async for ruta, imagen in procesar_imagenes(rutas, motor='aer'):
+        ...
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import backends
+import memoria
+import preprocesado
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+MAX_EN_VUELO = 4        # Lotes leídos o en simulación a la vez
+TAM_LOTE = 16           # Imágenes por trabajo enviado al simulador
+
+# Los objetos de Qiskit (la plantilla transpilada en caché) no sobreviven al hilo
+# que los creó: Aer falla al usarlos si ese hilo ya terminó. Toda la construcción
+# de circuitos y el envío a Aer van a un único hilo de larga duración, lo que
+# además los serializa (el simulador compartido no admite hilos concurrentes)
+_HILO_QISKIT = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qiskit")
+
+# El QNode (y su device) es uno por forma en caché y lightning.qubit guarda el
+# estado en el device: las ejecuciones con el mismo backend van de una en una
+_cerrojos = {}
+
+# =============================================================================
+# TRABAJOS COMO AWAITABLES
+# =============================================================================
+
+def enviar_aer(circuitos):
+    """Envía los circuitos a Aer como un único trabajo multi-experimento; devuelve el AerJob sin esperar"""
+    import Practica1
+    import ajuste_aer
+    simulador = Practica1.obtener_simulador()
+    opciones = ajuste_aer.opciones(circuitos[0].num_qubits, len(circuitos)) if circuitos else {}
+    return simulador.run([Practica1.preparar_circuito_statevector(cq) for cq in circuitos], **opciones)
+
+async def esperar_aer(trabajo, num_circuitos, ejecutor=None):
+    """Espera un AerJob sin bloquear el bucle de eventos; devuelve los statevectors (N, 2**n)"""
+    import Practica1
+    result = await asyncio.get_running_loop().run_in_executor(ejecutor, trabajo.result)
+    statevectors = [Practica1.extraer_statevector(result, i) for i in range(num_circuitos)]
+    if any(sv is None for sv in statevectors):
+        raise RuntimeError("No se pudo obtener el statevector del resultado del simulador.")
+    return np.stack([np.asarray(sv) for sv in statevectors])
+
+def _enviar_lote_aer(flats, num_qubits):
+    import Practica1
+    qubits_canal = backends._qubits_totales(flats) - num_qubits
+    return enviar_aer([Practica1.circuito_con_plantilla(flat, num_qubits, qubits_canal=qubits_canal)
+                       for flat in flats])
+
+async def ejecutar_aer(flats, num_qubits, ejecutor=None):
+    """Filtro negativo de un lote en Aer, como corrutina"""
+    # Construir los circuitos también es trabajo de CPU: fuera del bucle de eventos
+    trabajo = await asyncio.get_running_loop().run_in_executor(_HILO_QISKIT, _enviar_lote_aer, flats, num_qubits)
+    return await esperar_aer(trabajo, len(flats), ejecutor)
+
+async def ejecutar_en_hilo(motor, flats, num_qubits, ejecutor=None):
+    """Filtro negativo de un lote con un backend síncrono (QNodes de PennyLane, NumPy) en el pool de hilos"""
+    ejecutar = backends.BACKENDS[motor]['ejecutar_lote']
+    if motor == 'numpy':                            # Sin estado: puede ir en paralelo
+        return await asyncio.get_running_loop().run_in_executor(ejecutor, ejecutar, flats, num_qubits)
+    cerrojo = _cerrojos.setdefault(motor, threading.Lock())
+
+    def ejecutar_en_exclusiva():
+        with cerrojo:
+            return ejecutar(flats, num_qubits)
+    return await asyncio.get_running_loop().run_in_executor(ejecutor, ejecutar_en_exclusiva)
+
+async def ejecutar_lote(motor, flats, num_qubits, ejecutor=None):
+    if motor == 'aer':
+        return await ejecutar_aer(flats, num_qubits, ejecutor)
+    return await ejecutar_en_hilo(motor, flats, num_qubits, ejecutor)
+
+# =============================================================================
+# FRONT END: async for en orden de finalización
+# =============================================================================
+
+async def procesar_imagenes(rutas, resolucion=8, motor='aer', max_en_vuelo=MAX_EN_VUELO,
+                            tam_lote=TAM_LOTE, cache=None, color=False, ejecutor=None):
+    """
+    Generador asíncrono de (ruta, imagen negativa) en orden de finalización.
+    Como mucho max_en_vuelo lotes de tam_lote imágenes están leyéndose o
+    simulándose a la vez, lo que acota la memoria.
+    """
+    if max_en_vuelo < 1 or tam_lote < 1:
+        raise ValueError("max_en_vuelo y tam_lote deben ser al menos 1.")
+    rutas = list(rutas)
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    memoria.comprobar_memoria(num_qubits + (backends.QUBITS_CANAL if color else 0), tam_lote * max_en_vuelo)
+
+    propio = ejecutor is None
+    if propio:
+        # Un hilo por lote en vuelo: lectura, espera del simulador o QNode de PennyLane
+        ejecutor = ThreadPoolExecutor(max_workers=max_en_vuelo)
+    loop = asyncio.get_running_loop()
+    # 'auto' puede calibrar (lento, y con Aer): tampoco bloquea el bucle
+    motor = await loop.run_in_executor(_HILO_QISKIT, backends.elegir_backend, num_qubits, tam_lote, motor)
+
+    semaforo = asyncio.Semaphore(max_en_vuelo)
+    completados = asyncio.Queue()
+    lotes = [rutas[i:i + tam_lote] for i in range(0, len(rutas), tam_lote)]
+
+    async def procesar_lote(lote):
+        try:
+            imagenes = await loop.run_in_executor(ejecutor, preprocesado.preprocesar_lote,
+                                                  lote, resolucion, cache, color)
+            flats, normalizaciones = backends.codificar(imagenes)
+            estados = await ejecutar_lote(motor, flats, num_qubits, ejecutor)
+            completados.put_nowait((lote, backends.decodificar(estados, normalizaciones)))
+        except Exception as error:
+            completados.put_nowait(error)
+        finally:
+            semaforo.release()
+
+    async def lanzar():
+        for lote in lotes:
+            await semaforo.acquire()
+            tareas.add(asyncio.create_task(procesar_lote(lote)))
+
+    tareas = set()
+    lanzador = asyncio.create_task(lanzar())
+    try:
+        for _ in lotes:
+            resultado = await completados.get()
+            if isinstance(resultado, Exception):
+                raise resultado
+            for ruta, imagen in zip(*resultado):
+                yield ruta, imagen
+    finally:
+        # Al salir antes de tiempo (break, error) no quedan tareas huérfanas
+        lanzador.cancel()
+        for tarea in tareas:
+            tarea.cancel()
+        await asyncio.gather(lanzador, *tareas, return_exceptions=True)
+        if propio:
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+async def procesar_directorio(entrada, salida, resolucion=8, motor='aer', max_en_vuelo=MAX_EN_VUELO,
+                              tam_lote=TAM_LOTE, cache=None, color=False):
+    """Escribe el negativo de cada imagen en salida según se completa; devuelve cuántas se escribieron"""
+    import pipeline
+    loop = asyncio.get_running_loop()
+    escrituras = []
+    async for ruta, imagen in procesar_imagenes(pipeline.listar_imagenes(entrada), resolucion, motor,
+                                                max_en_vuelo, tam_lote, cache, color):
+        # La escritura (PNG) va al pool por defecto y se solapa con los lotes siguientes
+        escrituras.append(loop.run_in_executor(None, lambda r=ruta, i=imagen: list(pipeline.escribir([(r, i)], salida))))
+    await asyncio.gather(*escrituras)
+    return len(escrituras)
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def main():
+    import pipeline
+    parser = argparse.ArgumentParser(description="Filtro negativo cuántico con envío asíncrono de trabajos")
+    parser.add_argument('entrada', help="Directorio o patrón glob (entre comillas) de imágenes")
+    parser.add_argument('salida', help="Directorio donde se escriben los resultados")
+    parser.add_argument('--resolucion', type=int, default=8, help="Lado de la imagen (potencia de 2)")
+    parser.add_argument('--motor', choices=pipeline.MOTORES, default='aer', help="Backend de simulación")
+    parser.add_argument('--lote', type=int, default=TAM_LOTE, help="Imágenes por trabajo")
+    parser.add_argument('--en-vuelo', type=int, default=MAX_EN_VUELO, help="Lotes en vuelo a la vez")
+    parser.add_argument('--cache', default=None, help="Directorio de caché de imágenes preprocesadas")
+    parser.add_argument('--color', action='store_true', help="Procesa R, G y B en un único circuito")
+    args = parser.parse_args()
+
+    t_inicio = time.time()
+    os.makedirs(args.salida, exist_ok=True)
+    total = asyncio.run(procesar_directorio(args.entrada, args.salida, args.resolucion, args.motor,
+                                            args.en_vuelo, args.lote, args.cache, args.color))
+    print(f"✅ {total} imágenes procesadas en {time.time() - t_inicio:.2f} s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Registro de backends
+Interfaz común codificar → ejecutar_lote → decodificar para el filtro
+negativo, con implementaciones en NumPy, Qiskit Aer (statevector) y
+PennyLane (default.qubit y lightning.qubit). Las capacidades se detectan
+una sola vez y el modo 'auto' calibra los backends disponibles, elige el
+más rápido para (num_qubits, tam_lote) y guarda la elección en disco.
+Las imágenes en color (N, R, R, 3) van por el mismo camino: los planos R, G
+y B comparten registro y 2 qubits extra (los bits altos) indican el canal.
+"""
+
+import functools
+import importlib.util
+import json
+import os
+import time
+
+import numpy as np
+
+import codificacion
+import memoria
+import permutaciones
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+RUTA_CALIBRACION = os.path.join(os.path.expanduser("~"), ".compcuantica_backends.json")
+REPETICIONES_CALIBRACION = 3
+
+# Qubits de canal en modo color: 4 huecos para R, G, B y un plano vacío
+QUBITS_CANAL = codificacion.QUBITS_CANAL
+
+# =============================================================================
+# CODIFICACIÓN Y DECODIFICACIÓN (comunes a todos los backends)
+# =============================================================================
+
+def codificar(imagenes):
+    """
+    Lote (N, R, R) → amplitudes normalizadas (N, R*R) float32 y normalizaciones (N,).
+    En color, (N, R, R, 3) → (N, 4*R*R) y normalizaciones por canal (N, 3)
+    """
+    return codificacion.codificar(imagenes)
+
+def decodificar(estados, normalizaciones):
+    """Statevectors (N, R*R) → imágenes (N, R, R) float32; en color, (N, 4*R*R) → (N, R, R, 3)"""
+    return codificacion.decodificar(estados, normalizaciones)
+
+# =============================================================================
+# EJECUCIÓN DEL FILTRO NEGATIVO POR BACKEND
+# =============================================================================
+# num_qubits son los qubits de píxel (los que invierte el filtro); el registro
+# completo puede tener además los qubits de canal, y su tamaño sale de flats
+
+def _qubits_totales(flats):
+    return int(np.log2(np.shape(flats)[-1]))
+
+def _ejecutar_numpy(flats, num_qubits):
+    operaciones = [('x', (q,)) for q in range(num_qubits)]
+    permutacion = permutaciones.compilar_permutacion(operaciones, _qubits_totales(flats))
+    return permutaciones.aplicar_permutacion(flats, permutacion)
+
+def _ejecutar_aer(flats, num_qubits):
+    import Practica1
+    qubits_canal = _qubits_totales(flats) - num_qubits
+    circuitos = [Practica1.circuito_con_plantilla(flat, num_qubits, qubits_canal=qubits_canal) for flat in flats]
+    return np.stack([np.asarray(sv) for sv in Practica1.simular_statevectors(circuitos)])
+
+def _ejecutar_pennylane(dispositivo):
+    def ejecutar(flats, num_qubits):
+        import Practica2
+        return np.asarray(Practica2.qnode_negativo(_qubits_totales(flats), dispositivo, num_qubits)(flats))
+    return ejecutar
+
+def _modulo_instalado(nombre):
+    return importlib.util.find_spec(nombre) is not None
+
+BACKENDS = {
+    'numpy': {
+        'disponible': lambda: True,
+        'codificar': codificar,
+        'ejecutar_lote': _ejecutar_numpy,
+        'decodificar': decodificar,
+    },
+    'aer': {
+        'disponible': lambda: _modulo_instalado('qiskit_aer'),
+        'codificar': codificar,
+        'ejecutar_lote': _ejecutar_aer,
+        'decodificar': decodificar,
+    },
+    'default.qubit': {
+        'disponible': lambda: _modulo_instalado('pennylane'),
+        'codificar': codificar,
+        'ejecutar_lote': _ejecutar_pennylane('default.qubit'),
+        'decodificar': decodificar,
+    },
+    'lightning.qubit': {
+        'disponible': lambda: _modulo_instalado('pennylane_lightning'),
+        'codificar': codificar,
+        'ejecutar_lote': _ejecutar_pennylane('lightning.qubit'),
+        'decodificar': decodificar,
+    },
+}
+
+@functools.lru_cache(maxsize=None)
+def backends_disponibles():
+    """Nombres de los backends instalados (se comprueba una sola vez por proceso)"""
+    return tuple(nombre for nombre, backend in BACKENDS.items() if backend['disponible']())
+
+# =============================================================================
+# CALIBRACIÓN Y SELECCIÓN AUTOMÁTICA
+# =============================================================================
+
+def _clave(num_qubits, tam_lote):
+    # Los lotes se agrupan en potencias de 2 para no recalibrar con cada tamaño
+    return f"{num_qubits}:{1 << max(0, int(tam_lote) - 1).bit_length()}:{','.join(backends_disponibles())}"
+
+def _cargar_calibracion():
+    try:
+        with open(RUTA_CALIBRACION, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def calibrar(num_qubits, tam_lote, repeticiones=REPETICIONES_CALIBRACION):
+    """Mide cada backend disponible con un lote aleatorio y devuelve {nombre: segundos}"""
+    memoria.comprobar_memoria(num_qubits, tam_lote)
+    generador = np.random.default_rng(0)
+    imagenes = generador.random((tam_lote, 2 ** (num_qubits // 2), 2 ** (num_qubits - num_qubits // 2)), dtype=np.float32)
+    tiempos = {}
+    for nombre in backends_disponibles():
+        backend = BACKENDS[nombre]
+        flats, normalizaciones = backend['codificar'](imagenes)
+        try:
+            backend['ejecutar_lote'](flats, num_qubits)                     # Calentamiento
+            medidas = []
+            for _ in range(repeticiones):
+                t_inicio = time.perf_counter()
+                backend['decodificar'](backend['ejecutar_lote'](flats, num_qubits), normalizaciones)
+                medidas.append(time.perf_counter() - t_inicio)
+        except Exception:
+            continue                                                         # Instalado pero no funcional
+        tiempos[nombre] = min(medidas)
+    return tiempos
+
+def elegir_backend(num_qubits, tam_lote, nombre='auto', recalibrar=False):
+    """Devuelve el nombre del backend: el pedido, o el más rápido calibrado para 'auto'"""
+    if nombre != 'auto':
+        if nombre not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {nombre}")
+        if nombre not in backends_disponibles():
+            raise ImportError(f"El backend '{nombre}' no está instalado.")
+        return nombre
+
+    calibracion = _cargar_calibracion()
+    clave = _clave(num_qubits, tam_lote)
+    if recalibrar or clave not in calibracion:
+        tiempos = calibrar(num_qubits, tam_lote)
+        calibracion[clave] = {'elegido': min(tiempos, key=tiempos.get), 'tiempos': tiempos}
+        with open(RUTA_CALIBRACION, 'w', encoding='utf-8') as f:
+            json.dump(calibracion, f, indent=2, sort_keys=True)
+    return calibracion[clave]['elegido']
+
+def procesar_lote(imagenes, backend='auto'):
+    """Filtro negativo sobre un lote (N, R, R) con el backend indicado"""
+    imagenes = np.asarray(imagenes)
+    num_qubits = int(np.log2(imagenes.shape[1] * imagenes.shape[2]))     # Qubits de píxel
+    memoria.comprobar_memoria(num_qubits + (QUBITS_CANAL if imagenes.ndim == 4 else 0), len(imagenes))
+    seleccionado = BACKENDS[elegir_backend(num_qubits, len(imagenes), backend)]
+    flats, normalizaciones = seleccionado['codificar'](imagenes)
+    estados = seleccionado['ejecutar_lote'](flats, num_qubits)
+    return seleccionado['decodificar'](estados, normalizaciones)
@@ -0,0 +1,256 @@
+"""
+Benchmark de los métodos clásico, Qiskit Aer y PennyLane
+Mide con perf_counter, calentamiento, repeticiones y percentiles, desglosa
+cada ruta por etapas (preprocesar, codificar, transpilar, simular,
+decodificar), barre número de qubits y tamaño de lote y guarda el
+resultado en JSON para seguir regresiones entre versiones. Con
+--importacion mide además el tiempo de arranque (import en un proceso
+nuevo) de cada módulo y falla si supera el límite indicado.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import memoria
+
+# =============================================================================
+# CONFIGURACIÓN POR DEFECTO
+# =============================================================================
+RUTA_IMAGEN = "paisaje.jpg"
+RUTA_SALIDA = "benchmark.json"
+RESOLUCIONES = (8, 16, 32)      # 6, 8 y 10 qubits
+LOTES = (1, 8, 64)
+REPETICIONES = 20
+CALENTAMIENTO = 3
+PERCENTILES = (50, 90, 99)
+MODULOS_IMPORTACION = ('Practica1', 'Practica2', 'mosaico', 'pipeline', 'backends')
+MODULOS_PESADOS = ('matplotlib', 'PIL', 'qiskit', 'qiskit_aer', 'pennylane')
+REPETICIONES_IMPORTACION = 5
+
+# =============================================================================
+# RUTAS A MEDIR: cada una es una lista de (etapa, función) encadenadas
+# =============================================================================
+
+def _ruta_clasica(rutas, resolucion):
+    import Practica1
+    return [
+        ('preprocesar', lambda _: [Practica1.preprocesar_image(r, resolucion) for r in rutas]),
+        ('invertir', lambda imagenes: [Practica1.inversion_tradiconal(img) for img in imagenes]),
+    ]
+
+def _ruta_aer(rutas, resolucion):
+    import Practica1
+    from qiskit import transpile
+
+    sim = Practica1.obtener_simulador()
+
+    def codificar(imagenes):
+        circuitos, normalizaciones = [], []
+        for img_arr in imagenes:
+            cq, num_qubits, normalizacion = Practica1.codificar_a_qubits(img_arr)
+            Practica1.aplicar_quantum_negativo(cq, num_qubits)
+            circuitos.append(cq)
+            normalizaciones.append(normalizacion)
+        return circuitos, normalizaciones
+
+    def transpilar(datos):
+        circuitos, normalizaciones = datos
+        preparados = [Practica1.preparar_circuito_statevector(cq) for cq in circuitos]
+        return transpile(preparados, sim), normalizaciones
+
+    def simular(datos):
+        circuitos, normalizaciones = datos
+        return sim.run(circuitos).result(), normalizaciones
+
+    def decodificar(datos):
+        result, normalizaciones = datos
+        return [np.abs(Practica1.extraer_statevector(result, i)) * n for i, n in enumerate(normalizaciones)]
+
+    return [
+        ('preprocesar', lambda _: [Practica1.preprocesar_image(r, resolucion) for r in rutas]),
+        ('codificar', codificar),
+        ('transpilar', transpilar),
+        ('simular', simular),
+        ('decodificar', decodificar),
+    ]
+
+def _ruta_pennylane(rutas, resolucion, motor='pennylane'):
+    import Practica2
+
+    def codificar(imagenes):
+        codificadas = [Practica2.codificar_a_qubits(img_arr) for img_arr in imagenes]
+        flats = np.stack([flat for flat, _, _ in codificadas])
+        return flats, codificadas[0][1], [n for _, _, n in codificadas]
+
+    def simular(datos):
+        flats, num_qubits, normalizaciones = datos
+        return Practica2.circuito_negativo(flats, num_qubits, motor=motor), normalizaciones
+
+    def decodificar(datos):
+        estados, normalizaciones = datos
+        return [Practica2.reconstruir_imagen(e, n) for e, n in zip(estados, normalizaciones)]
+
+    return [
+        ('preprocesar', lambda _: [Practica2.preprocesar_image(r, resolucion) for r in rutas]),
+        ('codificar', codificar),
+        ('simular', simular),
+        ('decodificar', decodificar),
+    ]
+
+RUTAS = {
+    'clasico': _ruta_clasica,
+    'aer': _ruta_aer,
+    'pennylane': _ruta_pennylane,
+    'permutacion': lambda rutas, resolucion: _ruta_pennylane(rutas, resolucion, motor='permutacion'),
+}
+
+# =============================================================================
+# MEDICIÓN
+# =============================================================================
+
+def resumir(tiempos):
+    """Estadísticos de una lista de tiempos en segundos"""
+    tiempos = np.asarray(tiempos)
+    resumen = {
+        'media': float(tiempos.mean()),
+        'desviacion': float(tiempos.std()),
+        'min': float(tiempos.min()),
+        'max': float(tiempos.max()),
+    }
+    for p in PERCENTILES:
+        resumen[f'p{p}'] = float(np.percentile(tiempos, p))
+    return resumen
+
+def medir_ruta(etapas, repeticiones=REPETICIONES, calentamiento=CALENTAMIENTO):
+    """Ejecuta las etapas encadenadas y devuelve los tiempos por etapa y totales"""
+    por_etapa = {etapa: [] for etapa, _ in etapas}
+    totales = []
+    for i in range(calentamiento + repeticiones):
+        datos = None
+        total = 0.0
+        for etapa, funcion in etapas:
+            t_inicio = time.perf_counter()
+            datos = funcion(datos)
+            t = time.perf_counter() - t_inicio
+            total += t
+            if i >= calentamiento:
+                por_etapa[etapa].append(t)
+        if i >= calentamiento:
+            totales.append(total)
+    return {
+        'total': resumir(totales),
+        'etapas': {etapa: resumir(t) for etapa, t in por_etapa.items()},
+    }
+
+_SCRIPT_IMPORTACION = """
+import sys, time
+t_inicio = time.perf_counter()
+import {modulo}
+t = time.perf_counter() - t_inicio
+print(t, *[m for m in {pesados!r} if m in sys.modules])
+"""
+
+def medir_importacion(modulo, repeticiones=REPETICIONES_IMPORTACION):
+    """Tiempo de 'import modulo' en un intérprete nuevo y módulos pesados que arrastra"""
+    script = _SCRIPT_IMPORTACION.format(modulo=modulo, pesados=MODULOS_PESADOS)
+    # Con -c se importa desde el directorio actual: el del proyecto, lance quien lance el benchmark
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    tiempos = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-c', script], capture_output=True, cwd=directorio,
+                                text=True, check=True).stdout.split()
+        tiempos.append(float(salida[0]))
+    return {'tiempo': resumir(tiempos), 'cargados': salida[1:]}
+
+def benchmark_importacion(modulos=MODULOS_IMPORTACION, repeticiones=REPETICIONES_IMPORTACION):
+    """Mide el arranque de cada módulo; devuelve {modulo: medida}"""
+    resultados = {}
+    for modulo in modulos:
+        medida = medir_importacion(modulo, repeticiones)
+        resultados[modulo] = medida
+        print(f"import {modulo:<12} p50={medida['tiempo']['p50'] * 1e3:9.3f} ms "
+              f"cargados={','.join(medida['cargados']) or '-'}")
+    return resultados
+
+def _versiones():
+    versiones = {'python': platform.python_version(), 'numpy': np.__version__}
+    for modulo in ('qiskit', 'qiskit_aer', 'pennylane'):
+        try:
+            versiones[modulo] = __import__(modulo).__version__
+        except ImportError:
+            versiones[modulo] = None
+    return versiones
+
+def ejecutar_benchmark(ruta_imagen=RUTA_IMAGEN, rutas=tuple(RUTAS), resoluciones=RESOLUCIONES,
+                       lotes=LOTES, repeticiones=REPETICIONES, calentamiento=CALENTAMIENTO):
+    """Barre rutas x resoluciones x lotes y devuelve un diccionario serializable a JSON"""
+    resultados = []
+    for resolucion in resoluciones:
+        num_qubits = memoria.qubits_para_resolucion(resolucion)
+        for lote in lotes:
+            memoria.comprobar_memoria(num_qubits, lote)
+            for nombre in rutas:
+                etapas = RUTAS[nombre]([ruta_imagen] * lote, resolucion)
+                medida = medir_ruta(etapas, repeticiones, calentamiento)
+                resultados.append({
+                    'ruta': nombre,
+                    'resolucion': resolucion,
+                    'num_qubits': num_qubits,
+                    'lote': lote,
+                    **medida,
+                })
+                print(f"{nombre:>12} {resolucion:>5}x{resolucion:<5} lote={lote:<5} "
+                      f"p50={medida['total']['p50'] * 1e3:9.3f} ms")
+    return {
+        'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+        'maquina': {'sistema': platform.platform(), 'procesador': platform.processor()},
+        'versiones': _versiones(),
+        'repeticiones': repeticiones,
+        'calentamiento': calentamiento,
+        'resultados': resultados,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los métodos clásico, Aer y PennyLane")
+    parser.add_argument('--imagen', default=RUTA_IMAGEN)
+    parser.add_argument('--rutas', nargs='+', choices=list(RUTAS), default=list(RUTAS))
+    parser.add_argument('--resoluciones', nargs='+', type=int, default=list(RESOLUCIONES))
+    parser.add_argument('--lotes', nargs='+', type=int, default=list(LOTES))
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES)
+    parser.add_argument('--calentamiento', type=int, default=CALENTAMIENTO)
+    parser.add_argument('--salida', default=RUTA_SALIDA)
+    parser.add_argument('--importacion', action='store_true',
+                        help="Mide solo el tiempo de importación de cada módulo")
+    parser.add_argument('--limite-importacion', type=float, default=None,
+                        help="Milisegundos (p50) por encima de los cuales el benchmark falla")
+    args = parser.parse_args()
+
+    if args.importacion:
+        resultados = benchmark_importacion()
+        informe = {
+            'fecha': datetime.datetime.now().isoformat(timespec='seconds'),
+            'versiones': _versiones(),
+            'importacion': resultados,
+        }
+    else:
+        informe = ejecutar_benchmark(args.imagen, args.rutas, args.resoluciones, args.lotes,
+                                     args.repeticiones, args.calentamiento)
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2)
+    print(f"✅ Resultados guardados en {args.salida}")
+
+    if args.importacion and args.limite_importacion is not None:
+        lentos = [m for m, r in resultados.items() if r['tiempo']['p50'] * 1e3 > args.limite_importacion]
+        if lentos:
+            sys.exit(f"❌ Importación por encima de {args.limite_importacion} ms: {', '.join(lentos)}")
+
+if __name__ == "__main__":
+    main()
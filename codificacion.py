@@ -0,0 +1,252 @@
+"""
+Codificación y decodificación sin reservas de memoria
+Capa común a Practica1, Practica2 y backends: amplitude encoding de imágenes
+y reconstrucción de intensidades desde statevectors, escribiendo con
+operaciones in situ (out=) en buffers float32 del llamador o de una reserva
+reutilizable. Trabaja por lotes ((N, R, R) ↔ (N, R*R), p. ej. (N, 64)) o
+con una imagen; en color, (N, R, R, 3) ↔ (N, 4*R*R). Solo se reservan arrays
+del tamaño del número de imágenes (normas), nunca del tamaño de la imagen;
+el resto de memoria temporal es el buffer de iteración de NumPy en las
+operaciones con broadcasting, acotado (8192 elementos) por llamada.
+
+Micro-benchmark de memoria temporal y reservas por imagen frente al camino anterior:
+
+    python codificacion.py --resolucion 8 --lote 64
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+# Qubits de canal en modo color: 4 huecos para R, G, B y un plano vacío
+QUBITS_CANAL = 2
+
+# Divisor mínimo: una imagen negra (norma 0) se multiplica por 1/TINY y sigue a 0
+_TINY = np.finfo(np.float32).tiny
+
+# =============================================================================
+# RESERVA DE BUFFERS
+# =============================================================================
+
+class ReservaBuffers:
+    """
+    Buffers reutilizables por (forma, dtype): tomar() devuelve uno libre o lo
+    crea, soltar() lo devuelve. creados cuenta los que se han tenido que reservar.
+    """
+
+    def __init__(self):
+        self._libres = {}
+        self.creados = 0
+
+    def tomar(self, forma, dtype=np.float32):
+        clave = (tuple(forma), np.dtype(dtype).str)
+        libres = self._libres.get(clave)
+        if libres:
+            return libres.pop()
+        self.creados += 1
+        return np.empty(clave[0], dtype=clave[1])
+
+    def soltar(self, *buffers):
+        for buffer in buffers:
+            self._libres.setdefault((buffer.shape, buffer.dtype.str), []).append(buffer)
+
+    def vaciar(self):
+        self._libres.clear()
+
+RESERVA = ReservaBuffers()
+
+def amplitudes(forma_imagen):
+    """Amplitudes del estado de una imagen (R, R) → R*R o, en color, (R, R, 3) → 4*R*R"""
+    pixeles = forma_imagen[0] * forma_imagen[1]
+    return pixeles * 2 ** QUBITS_CANAL if len(forma_imagen) == 3 else pixeles
+
+# =============================================================================
+# CODIFICACIÓN
+# =============================================================================
+
+def _destino(out, forma, dtype=np.float32):
+    if out is None:
+        return np.empty(forma, dtype=dtype)
+    if out.shape != forma or not out.flags.c_contiguous:
+        raise ValueError(f"El buffer de salida debe ser contiguo y de forma {forma} (es {out.shape}).")
+    return out
+
+def codificar(imagenes, out=None, normalizaciones=None):
+    """
+    Lote (N, R, R) → amplitudes normalizadas out (N, R*R) float32 y normalizaciones (N,).
+    En color, (N, R, R, 3) → (N, 4*R*R) y normalizaciones por canal (N, 3).
+    Sin out o normalizaciones se crean nuevos. Devuelve (out, normalizaciones).
+    """
+    imagenes = np.asarray(imagenes, dtype=np.float32)
+    n = len(imagenes)
+    color = imagenes.ndim == 4
+    out = _destino(out, (n, amplitudes(imagenes.shape[1:])))
+    normalizaciones = _destino(normalizaciones, (n, 3) if color else (n,))
+    inversas = RESERVA.tomar(normalizaciones.shape)
+    if color:
+        _codificar_color(imagenes, out, normalizaciones, inversas)
+    else:
+        out[...] = imagenes.reshape(n, -1)
+        np.einsum('ij,ij->i', out, out, out=normalizaciones)
+        np.sqrt(normalizaciones, out=normalizaciones)
+        np.maximum(normalizaciones, _TINY, out=inversas)
+        np.reciprocal(inversas, out=inversas)
+        out *= inversas[:, None]
+        # Una imagen negra no es un estado válido: se codifica como |0> con norma 0
+        if not normalizaciones.all():
+            out[normalizaciones == 0, 0] = 1
+    RESERVA.soltar(inversas)
+    return out, normalizaciones
+
+def _codificar_color(imagenes, out, normalizaciones, inversas):
+    # Planos R, G, B y uno vacío seguidos: el canal ocupa los 2 bits altos del índice
+    n, lado = len(imagenes), imagenes.shape[1]
+    planos = out.reshape(n, 2 ** QUBITS_CANAL, lado * lado)
+    planos[:, 3:] = 0
+    planos[:, :3].reshape(n, 3, lado, lado)[...] = np.moveaxis(imagenes, -1, 1)
+    np.einsum('ncp,ncp->nc', planos[:, :3], planos[:, :3], out=normalizaciones)
+    np.sqrt(normalizaciones, out=normalizaciones)
+    # Cada canal con norma propia y el mismo peso (1/sqrt(k), k = canales no vacíos),
+    # así un canal oscuro no pierde resolución frente a los demás
+    canales = np.count_nonzero(normalizaciones, axis=1)
+    normalizaciones *= np.sqrt(canales, dtype=np.float32)[:, None]
+    np.maximum(normalizaciones, _TINY, out=inversas)
+    np.reciprocal(inversas, out=inversas)
+    planos[:, :3] *= inversas[..., None]
+    # Una imagen negra no es un estado válido: se codifica como |0> con norma 0
+    if not canales.all():
+        out[canales == 0, 0] = 1
+
+def codificar_imagen(img_arr, out=None):
+    """
+    Una imagen (R, R) → (flat (R*R,), normalización float); en color, (R, R, 3) →
+    (flat (4*R*R,), normalizaciones (3,)). out: buffer float32 de la forma de flat.
+    """
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    flats, normalizaciones = codificar(img_arr[None], None if out is None else out[None])
+    if img_arr.ndim == 3:
+        return flats[0], normalizaciones[0]
+    return flats[0], float(normalizaciones[0])
+
+# =============================================================================
+# DECODIFICACIÓN
+# =============================================================================
+
+def decodificar(estados, normalizaciones, out=None):
+    """
+    Statevectors (N, R*R) → imágenes out (N, R, R) float32 (|amplitud| * normalización);
+    en color, (N, 4*R*R) con normalizaciones (N, 3) → (N, R, R, 3). Sin out se crea uno nuevo.
+    """
+    estados = np.asarray(estados)
+    normalizaciones = np.asarray(normalizaciones, dtype=np.float32)
+    n = len(estados)
+    if normalizaciones.ndim == 2:
+        lado = int(round(np.sqrt(estados.shape[1] // 2 ** QUBITS_CANAL)))
+        out = _destino(out, (n, lado, lado, 3))
+        # Vista (N, 3, R, R) de la salida: cada plano se escribe en su canal sin copias
+        canales = np.moveaxis(out, -1, 1)
+        np.abs(estados.reshape(n, 2 ** QUBITS_CANAL, lado, lado)[:, :3], out=canales)
+        canales *= normalizaciones[:, :, None, None]
+        return out
+    lado = int(round(np.sqrt(estados.shape[1])))
+    out = _destino(out, (n, lado, lado))
+    planos = out.reshape(n, -1)
+    np.abs(estados, out=planos)
+    planos *= normalizaciones[:, None]
+    return out
+
+def decodificar_estado(statevector, normalizacion, out=None):
+    """Un statevector → imagen (R, R), o (R, R, 3) si normalizacion tiene una norma por canal"""
+    normalizaciones = np.asarray(normalizacion, dtype=np.float32)[None]
+    estados = np.asarray(statevector).reshape(1, -1)
+    return decodificar(estados, normalizaciones, None if out is None else out[None])[0]
+
+# =============================================================================
+# MICRO-BENCHMARK
+# =============================================================================
+
+def _anterior(imagenes):
+    """Codificación y decodificación de una en una como en la versión anterior (referencia)"""
+    resultado = []
+    for img_arr in imagenes:
+        flat = img_arr.flatten()
+        normalizacion = float(np.linalg.norm(flat))
+        flat /= normalizacion
+        estado = flat.astype(np.complex128)                # Statevector de Qiskit / PennyLane
+        amplitudes_ = np.abs(estado) * normalizacion
+        lado = int(round(np.sqrt(amplitudes_.size)))
+        resultado.append(amplitudes_.reshape((lado, lado)))
+    return resultado
+
+def _nuevo(imagenes, flats, normalizaciones, estados, salida):
+    """Codificación y decodificación del lote entero sobre buffers ya reservados"""
+    codificar(imagenes, flats, normalizaciones)
+    estados[...] = flats                                 # Aquí iría la simulación
+    decodificar(estados, normalizaciones, salida)
+
+def _reservas(antes, despues):
+    """Bloques reservados entre dos instantáneas de tracemalloc que siguen vivos (count de las entradas)"""
+    propios = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diferencias = despues.filter_traces(propios).compare_to(antes.filter_traces(propios), 'lineno')
+    return sum(max(0, d.count_diff) for d in diferencias)
+
+def _medir(funcion, repeticiones):
+    """(segundos, bytes temporales de pico y bloques reservados que siguen vivos, por llamada)"""
+    funcion()                                            # Calentamiento (reservas iniciales)
+    t_inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    segundos = (time.perf_counter() - t_inicio) / repeticiones
+    tracemalloc.start()
+    antes = tracemalloc.take_snapshot()
+    base = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    resultado = funcion()                                # Vivo hasta la segunda instantánea
+    pico = tracemalloc.get_traced_memory()[1]
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del resultado
+    return segundos, pico - base, _reservas(antes, despues)
+
+def benchmark(resolucion=8, tam_lote=64, repeticiones=200, color=False, informar=print):
+    """Compara tiempo, memoria temporal y reservas por imagen del camino anterior y del de esta capa"""
+    generador = np.random.default_rng(0)
+    forma = (tam_lote, resolucion, resolucion) + ((3,) if color else ())
+    imagenes = generador.random(forma, dtype=np.float32)
+    flats = np.empty((tam_lote, amplitudes(forma[1:])), dtype=np.float32)
+    normalizaciones = np.empty((tam_lote, 3) if color else (tam_lote,), dtype=np.float32)
+    estados = np.empty(flats.shape, dtype=np.complex64)
+    salida = np.empty(forma, dtype=np.float32)
+
+    filas = []
+    if not color:
+        filas.append(('anterior (una a una)', _medir(lambda: _anterior(imagenes), repeticiones)))
+    filas.append(('lote con buffers', _medir(lambda: _nuevo(imagenes, flats, normalizaciones, estados, salida),
+                                             repeticiones)))
+    creados = RESERVA.creados
+    _nuevo(imagenes, flats, normalizaciones, estados, salida)
+    informar(f"{tam_lote} imágenes {'x'.join(map(str, forma[1:]))}, {repeticiones} repeticiones")
+    for nombre, (segundos, pico, reservas) in filas:
+        informar(f"  {nombre:22s} {segundos / tam_lote * 1e6:8.2f} µs/imagen  "
+                 f"{pico / tam_lote:10.1f} bytes temporales/imagen  "
+                 f"{reservas / tam_lote:6.2f} reservas/imagen")
+    informar(f"  buffers de la reserva creados tras el calentamiento: {RESERVA.creados - creados}")
+    # tracemalloc solo cuenta los bloques que siguen vivos en la instantánea: los temporales
+    # ya liberados no aparecen en las reservas, sí en los bytes temporales de pico
+    informar("  reservas = bloques que siguen vivos al terminar la llamada (instantáneas de tracemalloc); "
+             "las temporales ya liberadas solo cuentan en los bytes temporales")
+    return filas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memoria temporal por imagen al codificar y decodificar")
+    parser.add_argument('--resolucion', type=int, default=8, help="Lado de la imagen (potencia de 2)")
+    parser.add_argument('--lote', type=int, default=64, help="Imágenes por lote")
+    parser.add_argument('--repeticiones', type=int, default=200)
+    parser.add_argument('--color', action='store_true', help="Imágenes RGB (R, R, 3)")
+    args = parser.parse_args()
+    benchmark(args.resolucion, args.lote, args.repeticiones, args.color)
@@ -0,0 +1,300 @@
+# Código traducido de Qiskit a NumPy
+# Generado automáticamente (sin dependencias de SDKs cuánticos)
+
+# -------------------------------------------------------------
+# SIMULADOR NUMPY (generado): statevectors (..., 2**n), orden de Qiskit
+# -------------------------------------------------------------
+import numpy as np
+
+_X = np.array([[0, 1], [1, 0]], dtype=complex)
+_Y = np.array([[0, -1j], [1j, 0]])
+_Z = np.diag([1, -1]).astype(complex)
+_H = np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+_S = np.diag([1, 1j])
+_T = np.diag([1, np.exp(1j * np.pi / 4)])
+_SDG = _S.conj()
+_TDG = _T.conj()
+_SWAP = np.eye(4, dtype=complex)[[0, 2, 1, 3]]
+
+def _controlada(matriz, controles=1):
+    # Los controles son los primeros qubits de la puerta (los bits altos de la matriz)
+    resultado = np.eye(2 ** controles * len(matriz), dtype=complex)
+    resultado[-len(matriz):, -len(matriz):] = matriz
+    return resultado
+
+_CX, _CY, _CZ = _controlada(_X), _controlada(_Y), _controlada(_Z)
+_CCX = _controlada(_X, 2)
+_CSWAP = _controlada(_SWAP)
+
+# Rotaciones: con un array de ángulos (N,) devuelven un lote de matrices (N, 2, 2)
+def _matrices(filas):
+    return np.moveaxis(np.array(filas, dtype=complex), (0, 1), (-2, -1))
+
+def _rx(theta):
+    c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+    return _matrices([[c, -1j * s], [-1j * s, c]])
+
+def _ry(theta):
+    c, s = np.cos(np.asarray(theta) / 2), np.sin(np.asarray(theta) / 2)
+    return _matrices([[c, -s], [s, c]])
+
+def _rz(theta):
+    fase = np.exp(-0.5j * np.asarray(theta))
+    cero = np.zeros_like(fase)
+    return _matrices([[fase, cero], [cero, np.conj(fase)]])
+
+def _estado_inicial(n_wires):
+    estado = np.zeros(2 ** n_wires, dtype=complex)
+    estado[0] = 1
+    return estado
+
+def _preparar(amplitudes, normalize=False):
+    # initialize / AmplitudeEmbedding: (2**n,) o un lote (N, 2**n)
+    estado = np.asarray(amplitudes, dtype=complex)
+    if normalize:
+        estado = estado / np.linalg.norm(estado, axis=-1, keepdims=True)
+    return estado
+
+def _aplicar(estado, matriz, qubits):
+    # Puerta de k qubits como contracción tensorial sobre el estado (..., 2**n)
+    forma = np.shape(estado)
+    n = int(np.log2(forma[-1]))
+    ejes = [n - q for q in qubits]              # El eje 0 es el lote; el qubit q, el eje n - q
+    k = len(qubits)
+    if np.ndim(matriz) > 2:
+        # Lote de matrices (..., 2**k, 2**k): una puerta por estado del lote (con broadcasting)
+        lote = np.broadcast_shapes(forma[:-1], np.shape(matriz)[:-2])
+        tensor = np.broadcast_to(estado, lote + forma[-1:]).reshape((-1,) + (2,) * n)
+        matrices = np.broadcast_to(matriz, lote + np.shape(matriz)[-2:]).reshape(-1, 2 ** k, 2 ** k)
+        finales = list(range(n + 1 - k, n + 1))
+        tensor = np.moveaxis(tensor, ejes, finales)
+        resultado = np.einsum('bij,brj->bri', matrices, tensor.reshape(len(tensor), -1, 2 ** k))
+        return np.moveaxis(resultado.reshape(tensor.shape), finales, ejes).reshape(lote + forma[-1:])
+    tensor = np.reshape(estado, (-1,) + (2,) * n)
+    if matriz is _X:
+        return np.flip(tensor, ejes[0]).reshape(forma)   # X solo permuta: sin contracción
+    resultado = np.tensordot(matriz.reshape((2,) * (2 * k)), tensor, axes=(list(range(k, 2 * k)), ejes))
+    return np.moveaxis(resultado, list(range(k)), ejes).reshape(forma)
+
+# -------------------------------------------------------------
+# IMPORTACIONES PARA AMBOS METODOS
+# -------------------------------------------------------------
+import os
+import sys
+import time
+
+import backends
+import codificacion
+import instrumentacion
+import memoria
+import preparacion
+import preprocesado
+
+# PIL, matplotlib, qiskit y qiskit_aer tardan en importarse: se cargan la
+# primera vez que se usan (matplotlib solo en el main con gráficos)
+
+# -------------------------------------------------------------
+# IMPORTACIONES PARA METODO CUANTICO (diferidas)
+# -------------------------------------------------------------
+# importar_aer: omitida, depende de Qiskit Aer
+
+
+# -------------------------------------------------------------
+# 0) Cargar imagen, convertir a escala de grises y reducir a resolucion x resolucion
+#    (PARA AMBOS METODOS). La resolución debe ser potencia de 2: 8x8 → 6 qubits,
+#    1024x1024 → 20 qubits
+# -------------------------------------------------------------
+@instrumentacion.medir('preprocesado')
+def preprocesar_image(path, resolucion=8, cache=None):
+    # Escala de grises, decodificación JPEG reducida, float32 en [0, 1] y caché
+    # opcional en disco (directorio cache o variable COMPCUANTICA_CACHE)
+    return preprocesado.preprocesar(path, resolucion, cache)
+
+
+# -----------------------METODO CLASICO------------------------
+# 1) Girar 180°
+# -------------------------------------------------------------
+def inversion_tradiconal(img_arr):
+    rotacion_clasica = img_arr[::-1, ::-1]
+    return rotacion_clasica
+
+
+# -----------------------METODO CUANTICO-----------------------
+# 1) Codificar la imagen en un circuito cuántico (amplitude encoding)
+# -------------------------------------------------------------
+@instrumentacion.medir('codificacion')
+def codificar_a_qubits(img_arr, fidelidad_minima=None):
+    # Con fidelidad_minima (p. ej. 0.99) la preparación es aproximada y de menor
+    # profundidad, y se devuelve además un informe con la fidelidad y el ahorro de puertas
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    # Color (R, R, 3): R, G y B en un solo registro con QUBITS_CANAL qubits más (bits altos),
+    # y la normalización es un array con una norma por canal
+
+    # Amplitudes normalizadas (Qiskit requiere esto) en un buffer float32 de la reserva:
+    # el circuito copia las amplitudes, así que el buffer se devuelve enseguida
+    flat = codificacion.RESERVA.tomar((codificacion.amplitudes(img_arr.shape),))
+    flat, normalizacion = codificacion.codificar_imagen(img_arr, out=flat)
+
+    num_qubits = int(np.log2(img_arr.shape[0] * img_arr.shape[1]))   # Qubits de píxel: 8x8 = 64 → 6 qubits
+
+    if fidelidad_minima is not None:
+        cq, informe = preparacion.estado_aproximado(flat, fidelidad_minima)
+        codificacion.RESERVA.soltar(flat)
+        return cq, num_qubits, normalizacion, informe
+    cq = _preparar(flat, normalize=True)
+    codificacion.RESERVA.soltar(flat)
+
+    return cq, num_qubits, normalizacion
+
+# -----------------------METODO CUANTICO-----------------------
+# 2) Aplicar filtro cuántico negativo (Puerta X a todos los qubits)
+# -------------------------------------------------------------
+@instrumentacion.medir('filtro')
+def aplicar_quantum_negativo(cq, num_qubits):
+    for q in range(num_qubits):
+        cq = _aplicar(cq, _X, [q])
+    return cq
+
+# -----------------------METODO CUANTICO-----------------------
+# 2b) Plantillas reutilizables: preparación de estado + filtro
+# -------------------------------------------------------------
+# La estructura del circuito solo depende del número de qubits y del filtro,
+# así que se construye y transpila una vez (LRU) y para cada imagen solo se
+# cambia el statevector inicial, sin volver a descomponer initialize.
+# En color el registro tiene qubits_canal qubits más, que el filtro no toca
+# plantilla_circuito: omitida, depende de Qiskit Aer
+
+
+# codificar_con_plantilla: omitida, llama a circuito_con_plantilla (depende de Qiskit Aer)
+
+
+# circuito_con_plantilla: omitida, depende de Qiskit Aer
+
+
+# estadisticas_plantillas: omitida, llama a plantilla_circuito (depende de Qiskit Aer)
+
+# -----------------------METODO CUANTICO-----------------------
+# 3) Medir y reconstruir la imagen procesada
+# -------------------------------------------------------------
+_simulador = None
+
+# obtener_simulador: omitida, depende de Qiskit Aer
+
+
+# preparar_circuito_statevector: omitida, usa correr_cq.data, que el traductor no admite
+
+
+# extraer_statevector: omitida, depende de Qiskit Aer
+
+
+# simular_statevectors: omitida, depende de Qiskit Aer
+
+
+# reconstruir_imagenes: omitida, llama a simular_statevectors (depende de Qiskit Aer)
+
+
+@instrumentacion.medir('reconstruccion')
+def reconstruir_imagen(statevector, normalizacion):
+    '''Reconstruye la imagen desde el statevector en PennyLane'''
+    amplitudes = np.abs(statevector)
+    if np.ndim(normalizacion) == 1:
+        # Color: un plano por canal (en los bits altos del índice) con su propia norma → (lado, lado, canales)
+        canales = len(normalizacion)
+        planos = 2 ** int(np.ceil(np.log2(canales)))
+        lado = int(round(np.sqrt(amplitudes.size // planos)))
+        image = amplitudes.reshape((planos, lado, lado))[:canales] * np.reshape(normalizacion, (canales, 1, 1))
+        return np.moveaxis(image, 0, -1)
+    lado = int(round(np.sqrt(amplitudes.size)))
+    image = (amplitudes * normalizacion).reshape((lado, lado))
+    return image
+
+# -----------------------METODO CUANTICO-----------------------
+# 3b) Reconstrucción por medidas (shots) con presupuesto adaptativo
+# -------------------------------------------------------------
+# p(k) = (pixel_k / normalizacion)^2, así que pixel_k ≈ sqrt(conteos_k / shots) * normalizacion.
+# Por el método delta, el error típico de cada píxel es normalizacion * sqrt((1 - p) / (4 * shots)):
+# baja como 1/sqrt(shots), lo que permite estimar cuántos shots faltan para el objetivo
+SHOTS_INICIALES = 1024
+MAX_SHOTS = 2 ** 20
+
+def preparar_circuito_medidas(cq):
+    # Copia del circuito de codificar_a_qubits (+ filtro) con medidas en todos los qubits
+    correr_cq = cq.copy()
+    return correr_cq
+
+
+def decodificar_conteos(conteos, num_qubits):
+    # Histograma {'0x1a': n, ...} de Aer → vector de conteos por índice de píxel (np.bincount)
+    indices = np.fromiter((int(k, 16) for k in conteos), dtype=np.int64, count=len(conteos))
+    pesos = np.fromiter(conteos.values(), dtype=np.float64, count=len(conteos))
+    return np.bincount(indices, weights=pesos, minlength=2 ** num_qubits)
+
+
+def error_por_pixel(conteos, shots, normalizacion):
+    # Error típico estimado de cada píxel (en intensidad 0..1)
+    probabilidades = conteos / shots
+    if np.ndim(normalizacion) == 1:
+        # Color: cada plano de canal tiene su norma (el cuarto plano está vacío)
+        huecos = 2 ** backends.QUBITS_CANAL
+        normalizacion = np.repeat(np.append(normalizacion, [0] * (huecos - 3)), len(conteos) // huecos)
+    return normalizacion * np.sqrt((1 - probabilidades) / (4 * shots))
+
+
+# reconstruir_imagenes_por_medidas: omitida, depende de Qiskit Aer
+
+
+# reconstruir_imagen_por_medidas: omitida, llama a reconstruir_imagenes_por_medidas (depende de Qiskit Aer)
+
+# -------------------------------------------------------------
+# 3) Ejecucuion completa
+# -------------------------------------------------------------
+
+if __name__ == "__main__":
+    path = "paisaje.jpg"   # Cambia la ruta a tu imagen
+    resolucion = 8         # Potencia de 2, hasta 1024 (20 qubits)
+    # Modo sin gráficos (nunca carga matplotlib): --headless o COMPCUANTICA_HEADLESS=1
+    headless = "--headless" in sys.argv or os.environ.get("COMPCUANTICA_HEADLESS") == "1"
+    # Reconstrucción por medidas en lugar de statevector exacto: --shots
+    por_medidas = "--shots" in sys.argv
+
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    requerida = memoria.comprobar_memoria(num_qubits)
+    print(f"Memoria estimada para {resolucion}x{resolucion} ({num_qubits} qubits): {memoria.formatear_bytes(requerida)}")
+
+    arr_original = preprocesar_image(path, resolucion)
+
+    t_clasico_inicio = time.perf_counter()
+    arr_inverso_tradicional = inversion_tradiconal(arr_original)
+    t_clasico_fin = time.perf_counter()
+    tiempo_clasico = t_clasico_fin - t_clasico_inicio
+
+    # La construcción del circuito cuenta en el tiempo cuántico, igual que en Practica2
+    t_cuantico_inicio = time.perf_counter()
+    cq, num_qubits, normalizacion = codificar_a_qubits(arr_original)
+    cq = aplicar_quantum_negativo(cq, num_qubits)
+    if por_medidas:
+        raise SystemExit('reconstruir_imagen_por_medidas no está en el código traducido: llama a reconstruir_imagenes_por_medidas (depende de Qiskit Aer)')
+    else:
+        arr_inverso_cuantico = reconstruir_imagen(cq, normalizacion)
+    t_cuantico_fin = time.perf_counter()
+    tiempo_cuantico = t_cuantico_fin - t_cuantico_inicio
+
+    if headless:
+        print(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+        print(f"Inversión cuántica: {tiempo_cuantico:.4f} s")
+        sys.exit(0)
+
+    import matplotlib.pyplot as plt
+
+    # Mostrar ambas imágenes
+    fig, ax = plt.subplots(1, 3)
+    ax[0].set_title(f"Original ({resolucion}x{resolucion})")
+    ax[0].imshow(arr_original, cmap="gray")
+
+    ax[1].set_title(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+    ax[1].imshow(arr_inverso_tradicional, cmap="gray")
+
+    ax[2].set_title(f"Inversión cuántica: {tiempo_cuantico:.4f} s")
+    ax[2].imshow(arr_inverso_cuantico, cmap="gray")
+
+    plt.show()
@@ -1,106 +1,270 @@
 # Código traducido de Qiskit a PennyLane
 # Generado automáticamente
 
+import functools
 import pennylane as qml
-import numpy as np
-import matplotlib.pyplot as plt
-from PIL import Image
-import time
 
-def preprocesar_image(path):
-    img = Image.open(path).convert("L")      # Escala de grises
-    img = img.resize((8, 8))                # Reducir tamaño a 8x8
-    img_arr = np.array(img) / 255.0             # Normalizar entre 0 y 1
-    return img_arr
+# =============================================================================
+# QNODES (uno por circuito; device y QNode se crean una vez por número de wires)
+# =============================================================================
+@functools.lru_cache(maxsize=None)
+def _qnode_codificar_a_qubits(n_wires):
+    dev = qml.device('default.qubit', wires=n_wires)
 
-    dev = qml.device('default.qubit', wires=num_qubits)
     @qml.qnode(dev)
-    def circuit():
+    def circuit(flat):
+        qml.AmplitudeEmbedding(features=flat, wires=range(n_wires), normalize=True)
         return qml.state()
+    return circuit
 
-    statevector = circuit()
-    num_qubits = num_qubits
-    return statevector, num_qubits, normalizacion
-def inversion_tradiconal(img_arr):
-    rotacion_clasica = img_arr[::-1, ::-1]
-    return rotacion_clasica
 
-    dev = qml.device('default.qubit', wires=num_qubits)
+@functools.lru_cache(maxsize=None)
+def _qnode_aplicar_quantum_negativo(n_wires):
+    dev = qml.device('default.qubit', wires=n_wires)
+
     @qml.qnode(dev)
-    def circuit():
+    def circuit(cq, num_qubits):
+        qml.StatePrep(cq, wires=range(n_wires))
+        for q in range(num_qubits):
+            qml.PauliX(wires=n_wires - 1 - q)
         return qml.state()
+    return circuit
+
+
+@functools.lru_cache(maxsize=None)
+def _qnode_preparar_circuito_medidas(n_wires):
+    dev = qml.device('default.qubit', wires=n_wires)
 
-    statevector = circuit()
-    num_qubits = num_qubits
-    return statevector, num_qubits, normalizacion
-def codificar_a_qubits(img_arr):
-    flat = img_arr.flatten()                            #Convierte la imagen en un vector unidimensional
-    normalizacion = np.sqrt(np.sum(flat**2))        # Normalización para amplitudes (Calcula la norma Euclidiana)
-    flat = flat / normalizacion                     # Qiskit requiere esto
-    num_pixeles = len(flat) 
-    num_qubits = int(np.log2(num_pixeles))           # 8x8 = 64 → 6 qubits
-
-    dev = qml.device('default.qubit', wires=num_qubits)
     @qml.qnode(dev)
-    def circuit():
-        qml.AmplitudeEmbedding(
-            features=flat,
-            wires=range(num_qubits),
-            normalize=False
-        )
+    def circuit(correr_cq):
+        qml.StatePrep(correr_cq, wires=range(n_wires))
         return qml.state()
+    return circuit
+
+
+# -------------------------------------------------------------
+# IMPORTACIONES PARA AMBOS METODOS
+# -------------------------------------------------------------
+import numpy as np
+import os
+import sys
+import time
+
+import backends
+import codificacion
+import instrumentacion
+import memoria
+import preparacion
+import preprocesado
+
+# PIL, matplotlib, qiskit y qiskit_aer tardan en importarse: se cargan la
+# primera vez que se usan (matplotlib solo en el main con gráficos)
+
+# -------------------------------------------------------------
+# IMPORTACIONES PARA METODO CUANTICO (diferidas)
+# -------------------------------------------------------------
+# importar_aer: omitida, depende de Qiskit Aer
+
+
+# -------------------------------------------------------------
+# 0) Cargar imagen, convertir a escala de grises y reducir a resolucion x resolucion
+#    (PARA AMBOS METODOS). La resolución debe ser potencia de 2: 8x8 → 6 qubits,
+#    1024x1024 → 20 qubits
+# -------------------------------------------------------------
+@instrumentacion.medir('preprocesado')
+def preprocesar_image(path, resolucion=8, cache=None):
+    # Escala de grises, decodificación JPEG reducida, float32 en [0, 1] y caché
+    # opcional en disco (directorio cache o variable COMPCUANTICA_CACHE)
+    return preprocesado.preprocesar(path, resolucion, cache)
 
-    statevector = circuit()
-    num_qubits = num_qubits
-    return statevector, num_qubits, normalizacion
+
+# -----------------------METODO CLASICO------------------------
+# 1) Girar 180°
+# -------------------------------------------------------------
+def inversion_tradiconal(img_arr):
+    rotacion_clasica = img_arr[::-1, ::-1]
+    return rotacion_clasica
+
+
+# -----------------------METODO CUANTICO-----------------------
+# 1) Codificar la imagen en un circuito cuántico (amplitude encoding)
+# -------------------------------------------------------------
+@instrumentacion.medir('codificacion')
+def codificar_a_qubits(img_arr, fidelidad_minima=None):
+    # Con fidelidad_minima (p. ej. 0.99) la preparación es aproximada y de menor
+    # profundidad, y se devuelve además un informe con la fidelidad y el ahorro de puertas
+    img_arr = np.asarray(img_arr, dtype=np.float32)
+    # Color (R, R, 3): R, G y B en un solo registro con QUBITS_CANAL qubits más (bits altos),
+    # y la normalización es un array con una norma por canal
+
+    # Amplitudes normalizadas (Qiskit requiere esto) en un buffer float32 de la reserva:
+    # el circuito copia las amplitudes, así que el buffer se devuelve enseguida
+    flat = codificacion.RESERVA.tomar((codificacion.amplitudes(img_arr.shape),))
+    flat, normalizacion = codificacion.codificar_imagen(img_arr, out=flat)
+
+    num_qubits = int(np.log2(img_arr.shape[0] * img_arr.shape[1]))   # Qubits de píxel: 8x8 = 64 → 6 qubits
+
+    if fidelidad_minima is not None:
+        cq, informe = preparacion.estado_aproximado(flat, fidelidad_minima)
+        codificacion.RESERVA.soltar(flat)
+        return cq, num_qubits, normalizacion, informe
+    n_wires = int(np.log2(len(flat)))
+    cq = _qnode_codificar_a_qubits(n_wires)(flat)
+    codificacion.RESERVA.soltar(flat)
+
+    return cq, num_qubits, normalizacion
+
+# -----------------------METODO CUANTICO-----------------------
+# 2) Aplicar filtro cuántico negativo (Puerta X a todos los qubits)
+# -------------------------------------------------------------
+@instrumentacion.medir('filtro')
 def aplicar_quantum_negativo(cq, num_qubits):
+    n_wires = int(np.log2(np.shape(cq)[-1]))
+    cq = _qnode_aplicar_quantum_negativo(n_wires)(cq, num_qubits)
+    return cq
+
+# -----------------------METODO CUANTICO-----------------------
+# 2b) Plantillas reutilizables: preparación de estado + filtro
+# -------------------------------------------------------------
+# La estructura del circuito solo depende del número de qubits y del filtro,
+# así que se construye y transpila una vez (LRU) y para cada imagen solo se
+# cambia el statevector inicial, sin volver a descomponer initialize.
+# En color el registro tiene qubits_canal qubits más, que el filtro no toca
+# plantilla_circuito: omitida, depende de Qiskit Aer
+
+
+# codificar_con_plantilla: omitida, llama a circuito_con_plantilla (depende de Qiskit Aer)
+
+
+# circuito_con_plantilla: omitida, depende de Qiskit Aer
 
-    dev = qml.device('default.qubit', wires=num_qubits)
-    @qml.qnode(dev)
-    def circuit():
-        qml.PauliX(wires=q)
-        return qml.state()
 
-    statevector = circuit()
-    num_qubits = num_qubits
-    return statevector, num_qubits, normalizacion
+# estadisticas_plantillas: omitida, llama a plantilla_circuito (depende de Qiskit Aer)
+
+# -----------------------METODO CUANTICO-----------------------
+# 3) Medir y reconstruir la imagen procesada
+# -------------------------------------------------------------
+_simulador = None
+
+# obtener_simulador: omitida, depende de Qiskit Aer
+
+
+# preparar_circuito_statevector: omitida, usa correr_cq.data, que el traductor no admite
+
+
+# extraer_statevector: omitida, depende de Qiskit Aer
+
+
+# simular_statevectors: omitida, depende de Qiskit Aer
+
+
+# reconstruir_imagenes: omitida, llama a simular_statevectors (depende de Qiskit Aer)
+
+
+@instrumentacion.medir('reconstruccion')
 def reconstruir_imagen(statevector, normalizacion):
     '''Reconstruye la imagen desde el statevector en PennyLane'''
-    amplitudes = np.abs(statevector) * normalizacion
-    image = amplitudes.reshape((8, 8))
+    amplitudes = np.abs(statevector)
+    if np.ndim(normalizacion) == 1:
+        # Color: un plano por canal (en los bits altos del índice) con su propia norma → (lado, lado, canales)
+        canales = len(normalizacion)
+        planos = 2 ** int(np.ceil(np.log2(canales)))
+        lado = int(round(np.sqrt(amplitudes.size // planos)))
+        image = amplitudes.reshape((planos, lado, lado))[:canales] * np.reshape(normalizacion, (canales, 1, 1))
+        return np.moveaxis(image, 0, -1)
+    lado = int(round(np.sqrt(amplitudes.size)))
+    image = (amplitudes * normalizacion).reshape((lado, lado))
     return image
-if __name__ == '__main__':
-    ruta_imagen = 'paisaje.jpg'  # Reemplaza con tu imagen 8x8
-    img_arr = preprocesar_image(ruta_imagen)
-    plt.figure(figsize=(8, 4))
-    plt.subplot(1, 3, 1)
-    plt.imshow(img_arr, cmap='gray')
-    plt.title('Original')
-    plt.axis('off')
-
-    img_clasica = inversion_tradiconal(img_arr)
-    plt.subplot(1, 3, 2)
-    plt.imshow(img_clasica, cmap='gray')
-    plt.title('Inversión clásica')
-    plt.axis('off')
-
-    cq, num_qubits, normalizacion = codificar_a_qubits(img_arr)
-
-    dev = qml.device('default.qubit', wires=num_qubits)
-    @qml.qnode(dev)
-    def circuito_negativo():
-        qml.StatePrep(cq, wires=range(num_qubits))
-        for q in range(num_qubits):
-            qml.PauliX(wires=q)
-        return qml.state()
 
-    cq_neg = circuito_negativo()
-    img_cuantica = reconstruir_imagen(cq_neg, normalizacion)
-    plt.subplot(1, 3, 3)
-    plt.imshow(img_cuantica, cmap='gray')
-    plt.title('Negativo cuántico')
-    plt.axis('off')
+# -----------------------METODO CUANTICO-----------------------
+# 3b) Reconstrucción por medidas (shots) con presupuesto adaptativo
+# -------------------------------------------------------------
+# p(k) = (pixel_k / normalizacion)^2, así que pixel_k ≈ sqrt(conteos_k / shots) * normalizacion.
+# Por el método delta, el error típico de cada píxel es normalizacion * sqrt((1 - p) / (4 * shots)):
+# baja como 1/sqrt(shots), lo que permite estimar cuántos shots faltan para el objetivo
+SHOTS_INICIALES = 1024
+MAX_SHOTS = 2 ** 20
+
+def preparar_circuito_medidas(cq):
+    # Copia del circuito de codificar_a_qubits (+ filtro) con medidas en todos los qubits
+    correr_cq = cq.copy()
+    n_wires = int(np.log2(np.shape(correr_cq)[-1]))
+    correr_cq = _qnode_preparar_circuito_medidas(n_wires)(correr_cq)
+    return correr_cq
+
+
+def decodificar_conteos(conteos, num_qubits):
+    # Histograma {'0x1a': n, ...} de Aer → vector de conteos por índice de píxel (np.bincount)
+    indices = np.fromiter((int(k, 16) for k in conteos), dtype=np.int64, count=len(conteos))
+    pesos = np.fromiter(conteos.values(), dtype=np.float64, count=len(conteos))
+    return np.bincount(indices, weights=pesos, minlength=2 ** num_qubits)
+
+
+def error_por_pixel(conteos, shots, normalizacion):
+    # Error típico estimado de cada píxel (en intensidad 0..1)
+    probabilidades = conteos / shots
+    if np.ndim(normalizacion) == 1:
+        # Color: cada plano de canal tiene su norma (el cuarto plano está vacío)
+        huecos = 2 ** backends.QUBITS_CANAL
+        normalizacion = np.repeat(np.append(normalizacion, [0] * (huecos - 3)), len(conteos) // huecos)
+    return normalizacion * np.sqrt((1 - probabilidades) / (4 * shots))
+
+
+# reconstruir_imagenes_por_medidas: omitida, depende de Qiskit Aer
+
+
+# reconstruir_imagen_por_medidas: omitida, llama a reconstruir_imagenes_por_medidas (depende de Qiskit Aer)
+
+# -------------------------------------------------------------
+# 3) Ejecucuion completa
+# -------------------------------------------------------------
+
+if __name__ == "__main__":
+    path = "paisaje.jpg"   # Cambia la ruta a tu imagen
+    resolucion = 8         # Potencia de 2, hasta 1024 (20 qubits)
+    # Modo sin gráficos (nunca carga matplotlib): --headless o COMPCUANTICA_HEADLESS=1
+    headless = "--headless" in sys.argv or os.environ.get("COMPCUANTICA_HEADLESS") == "1"
+    # Reconstrucción por medidas en lugar de statevector exacto: --shots
+    por_medidas = "--shots" in sys.argv
+
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    requerida = memoria.comprobar_memoria(num_qubits)
+    print(f"Memoria estimada para {resolucion}x{resolucion} ({num_qubits} qubits): {memoria.formatear_bytes(requerida)}")
+
+    arr_original = preprocesar_image(path, resolucion)
+
+    t_clasico_inicio = time.perf_counter()
+    arr_inverso_tradicional = inversion_tradiconal(arr_original)
+    t_clasico_fin = time.perf_counter()
+    tiempo_clasico = t_clasico_fin - t_clasico_inicio
+
+    # La construcción del circuito cuenta en el tiempo cuántico, igual que en Practica2
+    t_cuantico_inicio = time.perf_counter()
+    cq, num_qubits, normalizacion = codificar_a_qubits(arr_original)
+    cq = aplicar_quantum_negativo(cq, num_qubits)
+    if por_medidas:
+        raise SystemExit('reconstruir_imagen_por_medidas no está en el código traducido: llama a reconstruir_imagenes_por_medidas (depende de Qiskit Aer)')
+    else:
+        arr_inverso_cuantico = reconstruir_imagen(cq, normalizacion)
+    t_cuantico_fin = time.perf_counter()
+    tiempo_cuantico = t_cuantico_fin - t_cuantico_inicio
+
+    if headless:
+        print(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+        print(f"Inversión cuántica: {tiempo_cuantico:.4f} s")
+        sys.exit(0)
+
+    import matplotlib.pyplot as plt
+
+    # Mostrar ambas imágenes
+    fig, ax = plt.subplots(1, 3)
+    ax[0].set_title(f"Original ({resolucion}x{resolucion})")
+    ax[0].imshow(arr_original, cmap="gray")
+
+    ax[1].set_title(f"Inversión tradicional: {tiempo_clasico:.4f} s")
+    ax[1].imshow(arr_inverso_tradicional, cmap="gray")
+
+    ax[2].set_title(f"Inversión cuántica: {tiempo_cuantico:.4f} s")
+    ax[2].imshow(arr_inverso_cuantico, cmap="gray")
 
-    plt.tight_layout()
-    plt.savefig('resultado.png')
-    print('Imagen guardada en resultado.png')
\ No newline at end of file
+    plt.show()
@@ -0,0 +1,226 @@
+"""
+Instrumentación por etapas
+Decorador medir(etapa) para las funciones del flujo (preprocesado, codificación,
+filtro, simulación y reconstrucción, en Qiskit y en PennyLane). Con la
+instrumentación activa, cada llamada registra el tiempo de pared, el pico de
+memoria que reserva la etapa (tracemalloc, por encima de lo que ya estaba
+reservado al empezar) y el RSS máximo del proceso, el ancho, la profundidad y las
+puertas de los circuitos que recibe o devuelve, y el dtype y el tamaño del
+estado. Los registros se exportan como traza JSON-lines y como fichero de texto
+de Prometheus. Desactivada (por defecto), el decorador solo comprueba un booleano.
+
+Se activa con activar() o definiendo COMPCUANTICA_METRICAS=<directorio>: en ese
+caso, al terminar el proceso se escriben <directorio>/traza.jsonl y
+<directorio>/metricas.prom.
+"""
+
+import atexit
+import functools
+import json
+import os
+import time
+import tracemalloc
+
+import numpy as np
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+VARIABLE_METRICAS = "COMPCUANTICA_METRICAS"
+
+PREFIJO_PROMETHEUS = "compcuantica_etapa"
+
+_activa = False
+_registros = []
+_pila = []                                         # [etapa, pico de memoria anidado] de las etapas en curso
+
+# =============================================================================
+# ACTIVACIÓN
+# =============================================================================
+
+def activar(memoria=True):
+    """Activa la instrumentación (con memoria=True, también tracemalloc)"""
+    global _activa
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _activa = True
+
+def desactivar():
+    """Desactiva la instrumentación (los registros ya tomados se conservan)"""
+    global _activa
+    _activa = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def activa():
+    return _activa
+
+def registros():
+    """Copia de los registros tomados hasta ahora"""
+    return list(_registros)
+
+def limpiar():
+    _registros.clear()
+
+# =============================================================================
+# DESCRIPCIÓN DE CIRCUITOS Y ESTADOS
+# =============================================================================
+
+def _elementos(valores):
+    """Valores y, un nivel por debajo, los elementos de listas y tuplas"""
+    for valor in valores:
+        if isinstance(valor, (list, tuple)):
+            yield from valor
+        else:
+            yield valor
+
+def describir(valores):
+    """Ancho, profundidad y puertas de los QuantumCircuit, y dtype y tamaño del primer array"""
+    descripcion = {}
+    circuitos = [v for v in _elementos(valores) if hasattr(v, 'count_ops') and hasattr(v, 'depth')]
+    if circuitos:
+        puertas = {}
+        for cq in circuitos:
+            for nombre, cuantas in cq.count_ops().items():
+                puertas[nombre] = puertas.get(nombre, 0) + int(cuantas)
+        descripcion.update(circuitos=len(circuitos),
+                           ancho=max(cq.num_qubits for cq in circuitos),
+                           profundidad=max(cq.depth() for cq in circuitos),
+                           puertas=puertas)
+    for valor in _elementos(valores):
+        if hasattr(valor, 'dtype') and hasattr(valor, 'size') and np.ndim(valor):
+            descripcion.update(dtype=str(valor.dtype), tamano=int(valor.size), bytes=int(valor.nbytes))
+            break
+    return descripcion
+
+def _rss_max():
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024   # KiB en Linux
+    except (ImportError, AttributeError):
+        return None
+
+# =============================================================================
+# DECORADOR
+# =============================================================================
+
+def medir(etapa, descriptor=None):
+    """
+    Decorador que registra cada llamada como la etapa indicada. descriptor(resultado,
+    *args, **kwargs) puede añadir campos (p. ej. el circuito de un QNode de PennyLane);
+    por defecto se describen los circuitos y arrays del resultado y de los argumentos.
+    """
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            # Desactivada, o dentro de la misma etapa (reconstruir_imagen → reconstruir_imagenes):
+            # la llamada exterior ya la cuenta
+            if not _activa or (_pila and _pila[-1][0] == etapa):
+                return funcion(*args, **kwargs)
+            return _medir_llamada(etapa, descriptor, funcion, args, kwargs)
+        return envoltura
+    return decorador
+
+def _medir_llamada(etapa, descriptor, funcion, args, kwargs):
+    memoria = tracemalloc.is_tracing()
+    if memoria:
+        memoria_inicio, pico_previo = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+    _pila.append([etapa, 0])
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion(*args, **kwargs)
+    finally:
+        duracion = time.perf_counter() - inicio
+        _, pico_anidado = _pila.pop()
+
+    # El fichero y no __module__, que vale '__main__' al ejecutar Practica1/Practica2 como script
+    modulo = os.path.splitext(os.path.basename(funcion.__code__.co_filename))[0]
+    registro = {'etapa': etapa, 'modulo': modulo, 'funcion': funcion.__name__,
+                'inicio': time.time() - duracion, 'duracion': duracion}
+    if memoria:
+        # reset_peak borra el pico de la etapa que nos contiene: se le pasa el nuestro
+        # (en valor absoluto, como los que lleva la pila)
+        _, pico = tracemalloc.get_traced_memory()
+        pico = max(pico, pico_anidado)
+        if _pila:
+            _pila[-1][1] = max(_pila[-1][1], pico, pico_previo)
+        # Sin lo que ya estaba reservado al empezar (imports, datos de etapas anteriores)
+        registro['memoria_pico'] = pico - memoria_inicio
+    registro['rss_max'] = _rss_max()
+    # El resultado primero: si la función devuelve el estado, es el que se describe
+    registro.update(describir((resultado,) + args))
+    if descriptor is not None:
+        registro.update(descriptor(resultado, *args, **kwargs))
+    _registros.append(registro)
+    return resultado
+
+# =============================================================================
+# EXPORTACIÓN
+# =============================================================================
+
+def exportar_jsonl(ruta, registros_=None):
+    """Escribe un registro JSON por línea"""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for registro in _registros if registros_ is None else registros_:
+            f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+def _etiquetas(**valores):
+    return '{' + ','.join(f'{k}="{v}"' for k, v in valores.items()) + '}'
+
+def texto_prometheus(registros_=None):
+    """Métricas agregadas por (módulo, etapa) en el formato de texto de Prometheus"""
+    agregadas = {}
+    for r in _registros if registros_ is None else registros_:
+        a = agregadas.setdefault((r['modulo'], r['etapa']), {'suma': 0.0, 'cuenta': 0, 'puertas': {}})
+        a['suma'] += r['duracion']
+        a['cuenta'] += 1
+        for campo in ('memoria_pico', 'rss_max', 'ancho', 'profundidad', 'tamano'):
+            if r.get(campo) is not None:
+                a[campo] = max(a.get(campo, 0), r[campo])
+        for nombre, cuantas in r.get('puertas', {}).items():
+            a['puertas'][nombre] = a['puertas'].get(nombre, 0) + cuantas
+
+    metricas = [
+        ('segundos', 'summary', "Tiempo de pared por etapa", None),
+        ('memoria_pico_bytes', 'gauge', "Pico de memoria (tracemalloc) reservada durante la etapa", 'memoria_pico'),
+        ('rss_max_bytes', 'gauge', "RSS máximo del proceso al terminar la etapa", 'rss_max'),
+        ('qubits', 'gauge', "Ancho máximo de los circuitos de la etapa", 'ancho'),
+        ('profundidad', 'gauge', "Profundidad máxima de los circuitos de la etapa", 'profundidad'),
+        ('amplitudes', 'gauge', "Tamaño máximo del estado de la etapa", 'tamano'),
+    ]
+    lineas = []
+    for sufijo, tipo, ayuda, campo in metricas:
+        nombre = f"{PREFIJO_PROMETHEUS}_{sufijo}"
+        lineas += [f"# HELP {nombre} {ayuda}", f"# TYPE {nombre} {tipo}"]
+        for (modulo, etapa), a in sorted(agregadas.items()):
+            etiquetas = _etiquetas(modulo=modulo, etapa=etapa)
+            if campo is None:
+                lineas += [f"{nombre}_sum{etiquetas} {a['suma']:.9f}", f"{nombre}_count{etiquetas} {a['cuenta']}"]
+            elif campo in a:
+                lineas.append(f"{nombre}{etiquetas} {a[campo]}")
+
+    nombre = f"{PREFIJO_PROMETHEUS}_puertas_total"
+    lineas += [f"# HELP {nombre} Puertas de los circuitos de la etapa", f"# TYPE {nombre} counter"]
+    for (modulo, etapa), a in sorted(agregadas.items()):
+        for puerta, cuantas in sorted(a['puertas'].items()):
+            lineas.append(f"{nombre}{_etiquetas(modulo=modulo, etapa=etapa, puerta=puerta)} {cuantas}")
+    return '\n'.join(lineas) + '\n'
+
+def exportar_prometheus(ruta, registros_=None):
+    """Escribe las métricas agregadas (formato de texto de Prometheus, p. ej. para node_exporter)"""
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        f.write(texto_prometheus(registros_))
+    os.replace(temporal, ruta)                     # node_exporter nunca lee un fichero a medias
+
+def exportar(directorio):
+    """Escribe traza.jsonl y metricas.prom en el directorio"""
+    os.makedirs(directorio, exist_ok=True)
+    exportar_jsonl(os.path.join(directorio, 'traza.jsonl'))
+    exportar_prometheus(os.path.join(directorio, 'metricas.prom'))
+
+# Activación por variable de entorno: se exporta al terminar el proceso
+if os.environ.get(VARIABLE_METRICAS):
+    activar()
+    atexit.register(exportar, os.environ[VARIABLE_METRICAS])
@@ -0,0 +1,68 @@
+"""
+Presupuesto de memoria
+Estima la memoria que necesita una ejecución a una resolución dada y rechaza
+los trabajos que no caben en la RAM disponible.
+"""
+
+import os
+
+import numpy as np
+
+# =============================================================================
+# TAMAÑOS (precisión simple de extremo a extremo)
+# =============================================================================
+BYTES_REAL = np.dtype(np.float32).itemsize       # imagen, flat e imagen reconstruida
+BYTES_COMPLEJO = np.dtype(np.complex64).itemsize  # statevector
+
+# Buffers vivos por imagen: imagen + flat + reconstrucción (float32) y
+# statevector de entrada + copia de trabajo del simulador (complex64)
+_BUFFERS_REALES = 3
+_BUFFERS_COMPLEJOS = 2
+
+# =============================================================================
+# FUNCIONES
+# =============================================================================
+
+def qubits_para_resolucion(resolucion):
+    """Número de qubits para una imagen resolucion x resolucion (potencia de 2)"""
+    resolucion = int(resolucion)
+    if resolucion < 2 or resolucion & (resolucion - 1):
+        raise ValueError(f"La resolución debe ser una potencia de 2 (recibido {resolucion})")
+    return 2 * (resolucion.bit_length() - 1)
+
+def memoria_requerida(num_qubits, num_imagenes=1):
+    """Bytes necesarios para procesar num_imagenes estados de num_qubits"""
+    amplitudes = 2 ** num_qubits
+    por_imagen = amplitudes * (_BUFFERS_REALES * BYTES_REAL + _BUFFERS_COMPLEJOS * BYTES_COMPLEJO)
+    return por_imagen * num_imagenes
+
+def memoria_disponible():
+    """Bytes de RAM libres, o None si no se pueden averiguar"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (AttributeError, ValueError, OSError):
+        return None
+
+def formatear_bytes(num_bytes):
+    """Texto legible para un tamaño en bytes"""
+    for unidad in ('B', 'KiB', 'MiB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.1f} {unidad}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GiB"
+
+def comprobar_memoria(num_qubits, num_imagenes=1):
+    """Devuelve los bytes necesarios; lanza MemoryError si no caben en la RAM libre"""
+    requerida = memoria_requerida(num_qubits, num_imagenes)
+    disponible = memoria_disponible()
+    if disponible is not None and requerida > disponible:
+        raise MemoryError(
+            f"El trabajo necesita {formatear_bytes(requerida)} ({num_imagenes} imagen(es) de "
+            f"{num_qubits} qubits) y solo hay {formatear_bytes(disponible)} libres."
+        )
+    return requerida
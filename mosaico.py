@@ -0,0 +1,158 @@
+# -------------------------------------------------------------
+# IMPORTACIONES
+# -------------------------------------------------------------
+import functools
+import time
+
+import numpy as np
+
+import codificacion
+import memoria
+import permutaciones
+
+# Tamaño de tesela: 8x8 = 64 píxeles → 6 qubits, igual que codificar_a_qubits
+TAM_TESELA = 8
+QUBITS_TESELA = memoria.qubits_para_resolucion(TAM_TESELA)
+
+# Filtro negativo (X en todos los qubits) como secuencia de (puerta, qubits)
+FILTRO_NEGATIVO = tuple(('x', (q,)) for q in range(QUBITS_TESELA))
+
+
+# -------------------------------------------------------------
+# 0) Cargar imagen completa en escala de grises (sin reducir)
+# -------------------------------------------------------------
+def cargar_imagen(path):
+    from PIL import Image                            # Diferido: solo al cargar
+    img = Image.open(path).convert("L")              # Escala de grises
+    img_arr = np.asarray(img, dtype=np.float32)      # Precisión simple
+    img_arr /= 255.0                                 # Normalizar entre 0 y 1
+    return img_arr
+
+
+# -------------------------------------------------------------
+# 1) Cortar la imagen en teselas 8x8 → lote (num_teselas, 64)
+# -------------------------------------------------------------
+def dividir_en_teselas(img_arr, tam=TAM_TESELA):
+    alto, ancho = img_arr.shape
+    filas, columnas = -(-alto // tam), -(-ancho // tam)     # Redondeo hacia arriba
+    # Rellenar con ceros hasta un múltiplo del tamaño de tesela
+    relleno = np.pad(img_arr, ((0, filas * tam - alto), (0, columnas * tam - ancho)))
+    teselas = relleno.reshape(filas, tam, columnas, tam).swapaxes(1, 2).reshape(-1, tam * tam)
+    return teselas, (alto, ancho)
+
+
+# -------------------------------------------------------------
+# 2) Codificar todas las teselas (amplitude encoding, una norma por tesela)
+# -------------------------------------------------------------
+def codificar_teselas(teselas):
+    # Misma codificación por lotes que Practica1 (una tesela negra queda como |0> con norma 0)
+    teselas = np.asarray(teselas, dtype=np.float32)
+    lado = int(round(np.sqrt(teselas.shape[1])))
+    return codificacion.codificar(teselas.reshape(-1, lado, lado))
+
+
+# -------------------------------------------------------------
+# 3) Evaluar el lote completo con un solo trabajo vectorizado
+# -------------------------------------------------------------
+def _evaluar_numpy(flat, operaciones):
+    permutacion = permutaciones.compilar_permutacion(operaciones, QUBITS_TESELA)
+    if permutacion is None:
+        raise ValueError("El motor 'numpy' solo admite puertas x, cx, swap, ccx y cswap.")
+    return permutaciones.aplicar_permutacion(flat, permutacion)
+
+@functools.lru_cache(maxsize=32)
+def _filtro(operaciones):
+    # Un filtro por secuencia de puertas: la misma función para las mismas operaciones,
+    # así Practica1.plantilla_circuito reutiliza la plantilla transpilada en caché
+    def filtro(cq, num_qubits):
+        for puerta, qubits in operaciones:
+            getattr(cq, puerta)(*qubits)
+    return filtro
+
+def _evaluar_aer(flat, operaciones):
+    import Practica1
+
+    filtro = _filtro(tuple((puerta, tuple(qubits)) for puerta, qubits in operaciones))
+    circuitos = [Practica1.circuito_con_plantilla(amplitudes, QUBITS_TESELA, filtro) for amplitudes in flat]
+    # Normalización 1: las normas reales se aplican al decodificar
+    imagenes = Practica1.reconstruir_imagenes(circuitos, [1.0] * len(circuitos), motor='aer')
+    return imagenes.reshape(len(circuitos), -1)
+
+@functools.lru_cache(maxsize=32)
+def _qnode_teselas(operaciones, num_qubits=QUBITS_TESELA):
+    # Un device y un QNode por (operaciones, wires), reutilizados entre llamadas como
+    # Practica2.qnode_negativo
+    import pennylane as qml
+    from puertas import GATE_MAPPING
+
+    dev = qml.device("default.qubit", wires=num_qubits)
+
+    @qml.qnode(dev)
+    def circuito(features):
+        qml.AmplitudeEmbedding(features=features, wires=range(num_qubits), normalize=False)
+        for puerta, qubits in operaciones:
+            # Qiskit es little-endian: el qubit q es el wire n-1-q de PennyLane
+            wires = [num_qubits - 1 - q for q in qubits]
+            getattr(qml, GATE_MAPPING[puerta].replace('qml.', ''))(wires=wires)
+        return qml.state()
+
+    return circuito
+
+def _evaluar_pennylane(flat, operaciones):
+    circuito = _qnode_teselas(tuple((puerta, tuple(qubits)) for puerta, qubits in operaciones))
+    # Broadcasting: una única ejecución para todas las teselas
+    return np.asarray(circuito(flat))
+
+MOTORES = {
+    'numpy': _evaluar_numpy,
+    'aer': _evaluar_aer,
+    'pennylane': _evaluar_pennylane,
+}
+
+def evaluar_teselas(flat, operaciones=FILTRO_NEGATIVO, motor='numpy'):
+    if motor not in MOTORES:
+        raise ValueError(f"Motor desconocido: {motor}")
+    memoria.comprobar_memoria(QUBITS_TESELA, len(flat))
+    return MOTORES[motor](flat, operaciones)
+
+
+# -------------------------------------------------------------
+# 4) Decodificar y recomponer la imagen
+# -------------------------------------------------------------
+def unir_teselas(teselas, forma, tam=TAM_TESELA):
+    alto, ancho = forma
+    filas, columnas = -(-alto // tam), -(-ancho // tam)
+    img = teselas.reshape(filas, columnas, tam, tam).swapaxes(1, 2).reshape(filas * tam, columnas * tam)
+    return img[:alto, :ancho]
+
+def procesar_por_teselas(img_arr, operaciones=FILTRO_NEGATIVO, motor='numpy'):
+    teselas, forma = dividir_en_teselas(img_arr)
+    flat, normalizaciones = codificar_teselas(teselas)
+    estados = evaluar_teselas(flat, operaciones, motor)
+    amplitudes = np.abs(estados).astype(np.float32, copy=False)
+    amplitudes *= normalizaciones[:, None]
+    return unir_teselas(amplitudes, forma)
+
+
+# -------------------------------------------------------------
+# EJECUCIÓN
+# -------------------------------------------------------------
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+
+    path = "paisaje.jpg"
+
+    arr_original = cargar_imagen(path)
+
+    t_inicio = time.perf_counter()
+    arr_procesado = procesar_por_teselas(arr_original)
+    tiempo = time.perf_counter() - t_inicio
+
+    fig, ax = plt.subplots(1, 2)
+    ax[0].set_title(f"Original ({arr_original.shape[1]}x{arr_original.shape[0]})")
+    ax[0].imshow(arr_original, cmap="gray")
+
+    ax[1].set_title(f"Negativo por teselas: {tiempo:.4f} s")
+    ax[1].imshow(arr_procesado, cmap="gray")
+
+    plt.show()
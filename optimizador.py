@@ -0,0 +1,179 @@
+"""
+Optimizador de circuitos (peephole)
+Pasada previa a la simulación sobre un QuantumCircuit de Qiskit:
+- Las puertas de permutación (x, cx, swap, ccx, cswap) que siguen a la
+  preparación de estado se absorben en sus amplitudes: el filtro negativo
+  queda reducido a un gather clásico y el circuito a una sola instrucción.
+- Las puertas de un qubit adyacentes sobre el mismo qubit se fusionan en una
+  única unitaria.
+- Los pares de puertas que se anulan (cx·cx, swap·swap, U·U† ...) se eliminan.
+Devuelve el circuito optimizado y el número de puertas y la profundidad
+antes y después.
+"""
+
+import numpy as np
+
+import permutaciones
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+PREPARACIONES = ('initialize', 'set_statevector')
+
+# Puertas de varios qubits que son su propia inversa (el par se anula)
+AUTOINVERSAS = ('cx', 'cy', 'cz', 'swap', 'ccx', 'cswap', 'ch')
+
+# Instrucciones que no son puertas: ni se fusionan ni se atraviesan
+_NO_UNITARIAS = ('measure', 'reset', 'barrier', 'save_statevector', 'save_state') + PREPARACIONES
+
+TOLERANCIA = 1e-9
+
+# =============================================================================
+# ABSORCIÓN DE PERMUTACIONES EN LA PREPARACIÓN DE ESTADO
+# =============================================================================
+
+def _indices(cq, instruccion):
+    return tuple(cq.find_bit(q).index for q in instruccion.qubits)
+
+def _nueva_preparacion(operacion, amplitudes):
+    """Preparación con las nuevas amplitudes (la primera instrucción parte de |0...0>)"""
+    try:
+        # set_statevector valida el vector entero de una vez; initialize, amplitud a amplitud
+        from qiskit_aer.library import SetStatevector
+        return SetStatevector(amplitudes / np.linalg.norm(amplitudes))
+    except ImportError:
+        return type(operacion)(amplitudes, normalize=True)
+
+def absorber_permutaciones(cq):
+    """
+    Si el circuito empieza preparando todos los qubits con un vector de amplitudes,
+    las puertas de permutación que la siguen se aplican a las amplitudes y
+    desaparecen del circuito.
+    Devuelve (instrucciones, número de puertas absorbidas).
+    """
+    instrucciones = list(cq.data)
+    if not instrucciones or instrucciones[0].operation.name not in PREPARACIONES:
+        return instrucciones, 0
+    if _indices(cq, instrucciones[0]) != tuple(range(cq.num_qubits)):
+        return instrucciones, 0
+
+    operaciones = []
+    fin = 1
+    while fin < len(instrucciones) and instrucciones[fin].operation.name in permutaciones.PUERTAS_PERMUTACION:
+        operaciones.append((instrucciones[fin].operation.name, _indices(cq, instrucciones[fin])))
+        fin += 1
+    if not operaciones:
+        return instrucciones, 0
+
+    preparacion = instrucciones[0].operation
+    amplitudes = permutaciones.amplitudes_preparacion(preparacion, cq.num_qubits, dtype=complex)
+    if amplitudes is None:
+        return instrucciones, 0                     # initialize(3), initialize('01+0')...
+
+    permutacion = permutaciones.compilar_permutacion(operaciones, cq.num_qubits)
+    nueva = instrucciones[0].replace(
+        operation=_nueva_preparacion(preparacion, permutaciones.aplicar_permutacion(amplitudes, permutacion)))
+    return [nueva] + instrucciones[fin:], len(operaciones)
+
+# =============================================================================
+# FUSIÓN DE PUERTAS DE UN QUBIT Y CANCELACIÓN DE PARES
+# =============================================================================
+
+def _es_identidad(matriz):
+    """True si la matriz es la identidad salvo fase global"""
+    fase = matriz[0, 0]
+    return abs(abs(fase) - 1) < TOLERANCIA and np.allclose(matriz, fase * np.eye(len(matriz)), atol=TOLERANCIA)
+
+def _matriz(operacion):
+    try:
+        return operacion.to_matrix()
+    except Exception:
+        return None                                  # Parámetros libres o puerta sin matriz
+
+def _fusionar(cq, instrucciones):
+    """
+    Recorrido lineal con una pila por qubit con la última instrucción que lo toca:
+    una puerta de un qubit se multiplica con la anterior si también lo es, y una
+    puerta autoinversa se anula con una idéntica inmediatamente anterior.
+    """
+    from qiskit.circuit.library import UnitaryGate
+
+    salida = []                                      # [instruccion, matriz acumulada o None]
+    pilas = {}
+    for instruccion in instrucciones:
+        nombre = instruccion.operation.name
+        qubits = _indices(cq, instruccion)
+        previas = {pilas[q][-1] if pilas.get(q) else None for q in qubits}
+        previa = previas.pop() if len(previas) == 1 else None
+        anterior = salida[previa] if previa is not None else None
+
+        if anterior is not None and not instruccion.clbits and nombre not in _NO_UNITARIAS:
+            if len(qubits) == 1 and len(anterior[0].qubits) == 1 and anterior[0].operation.name not in _NO_UNITARIAS:
+                matriz = _matriz(instruccion.operation)
+                if anterior[1] is None:
+                    anterior[1] = _matriz(anterior[0].operation)
+                if matriz is not None and anterior[1] is not None:
+                    anterior[1] = matriz @ anterior[1]
+                    if _es_identidad(anterior[1]):
+                        salida[previa] = None
+                        pilas[qubits[0]].pop()
+                    else:
+                        anterior[0] = anterior[0].replace(operation=UnitaryGate(anterior[1], check_input=False))
+                    continue
+            elif (nombre in AUTOINVERSAS and anterior[0].operation.name == nombre
+                  and _indices(cq, anterior[0]) == qubits and not anterior[0].operation.params):
+                salida[previa] = None
+                for q in qubits:
+                    pilas[q].pop()
+                continue
+
+        for q in qubits:
+            pilas.setdefault(q, []).append(len(salida))
+        salida.append([instruccion, None])
+    return [elemento[0] for elemento in salida if elemento is not None]
+
+# =============================================================================
+# PASADA COMPLETA
+# =============================================================================
+
+def optimizar_circuito(cq):
+    """
+    Devuelve (circuito optimizado, informe) con informe =
+    {'puertas_antes', 'puertas_despues', 'profundidad_antes', 'profundidad_despues', 'absorbidas'}
+    """
+    instrucciones, absorbidas = absorber_permutaciones(cq)
+    instrucciones = _fusionar(cq, instrucciones)
+
+    optimizado = cq.copy_empty_like()
+    for instruccion in instrucciones:
+        optimizado.append(instruccion)
+    informe = {
+        'puertas_antes': cq.size(),
+        'puertas_despues': optimizado.size(),
+        'profundidad_antes': cq.depth(),
+        'profundidad_despues': optimizado.depth(),
+        'absorbidas': absorbidas,
+    }
+    return optimizado, informe
+
+def optimizar_circuitos(circuitos):
+    """Optimiza una lista de circuitos; devuelve (circuitos, informes)"""
+    resultados = [optimizar_circuito(cq) for cq in circuitos]
+    return [cq for cq, _ in resultados], [informe for _, informe in resultados]
+
+# =============================================================================
+# EJECUCIÓN: informe para el circuito de Practica1
+# =============================================================================
+if __name__ == "__main__":
+    import sys
+
+    import Practica1
+
+    resolucion = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    img_arr = Practica1.preprocesar_image("paisaje.jpg", resolucion)
+    cq, num_qubits, _ = Practica1.codificar_a_qubits(img_arr)
+    Practica1.aplicar_quantum_negativo(cq, num_qubits)
+    _, informe = optimizar_circuito(cq)
+    print(f"Puertas: {informe['puertas_antes']} → {informe['puertas_despues']} "
+          f"({informe['absorbidas']} absorbidas en la preparación)")
+    print(f"Profundidad: {informe['profundidad_antes']} → {informe['profundidad_despues']}")
@@ -0,0 +1,164 @@
+"""
+Motor de permutaciones
+Ejecuta sin simulador los circuitos formados solo por puertas clásicas
+reversibles (x, cx, swap, ccx, cswap): el circuito completo se compila a una
+única permutación de índices que se aplica con un gather de NumPy sobre las
+amplitudes de todo el lote de imágenes.
+"""
+
+import functools
+
+import numpy as np
+
+from puertas import GATE_MAPPING
+
+# =============================================================================
+# PUERTAS RECONOCIDAS
+# =============================================================================
+PUERTAS_PERMUTACION = ('x', 'cx', 'swap', 'ccx', 'cswap')
+
+# Nombres de PennyLane de las mismas puertas (PauliX, CNOT, SWAP, Toffoli, CSWAP)
+NOMBRES_PENNYLANE = {GATE_MAPPING[p].replace('qml.', ''): p for p in PUERTAS_PERMUTACION}
+
+# Instrucciones de Qiskit que no modifican el estado
+_IGNORADAS_QISKIT = ('barrier', 'save_statevector', 'save_state')
+
+# =============================================================================
+# COMPILACIÓN
+# =============================================================================
+
+def _bits(indices, qubit, num_qubits, orden):
+    """Devuelve el bit de cada índice asociado a un qubit"""
+    # Qiskit es little-endian (qubit 0 = bit menos significativo);
+    # PennyLane es big-endian (wire 0 = bit más significativo)
+    posicion = qubit if orden == 'little' else num_qubits - 1 - qubit
+    return (indices >> posicion) & 1, posicion
+
+def _aplicar_puerta(indices, puerta, qubits, num_qubits, orden):
+    """Transforma los índices de la base según una puerta (todas son involuciones)"""
+    bits = [_bits(indices, q, num_qubits, orden) for q in qubits]
+    if puerta == 'x':
+        (_, p), = bits
+        return indices ^ (1 << p)
+    if puerta == 'cx':
+        (c, _), (_, p) = bits
+        return indices ^ (c << p)
+    if puerta == 'ccx':
+        (c1, _), (c2, _), (_, p) = bits
+        return indices ^ ((c1 & c2) << p)
+    if puerta == 'swap':
+        (a, pa), (b, pb) = bits
+        d = a ^ b
+        return indices ^ ((d << pa) | (d << pb))
+    if puerta == 'cswap':
+        (c, _), (a, pa), (b, pb) = bits
+        d = (a ^ b) & c
+        return indices ^ ((d << pa) | (d << pb))
+    raise ValueError(f"La puerta '{puerta}' no es una permutación")
+
+def compilar_permutacion(operaciones, num_qubits, orden='little'):
+    """
+    Compila una lista de (puerta, qubits) en un único array de índices.
+    Devuelve None si alguna puerta no es una permutación clásica.
+    El estado final es estado[..., permutacion].
+    """
+    operaciones = tuple((puerta, tuple(int(q) for q in qubits)) for puerta, qubits in operaciones)
+    return _compilar(operaciones, num_qubits, orden)
+
+@functools.lru_cache(maxsize=32)
+def _compilar(operaciones, num_qubits, orden):
+    # Una permutación por (operaciones, qubits, orden); el mismo array se comparte
+    # entre llamadas, así que es de solo lectura
+    if any(puerta not in PUERTAS_PERMUTACION for puerta, _ in operaciones):
+        return None
+
+    # final[j] = inicial[f1(f2(...fK(j)))], por eso se recorren en orden inverso
+    indices = np.arange(2 ** num_qubits, dtype=np.intp)
+    for puerta, qubits in reversed(operaciones):
+        indices = _aplicar_puerta(indices, puerta, qubits, num_qubits, orden)
+    indices.flags.writeable = False
+    return indices
+
+def aplicar_permutacion(estados, permutacion):
+    """Aplica la permutación sobre el último eje (un estado o un lote (N, 2**n))"""
+    return np.take(estados, permutacion, axis=-1)
+
+# =============================================================================
+# ADAPTADORES
+# =============================================================================
+
+def amplitudes_preparacion(operacion, num_qubits, dtype=np.complex64):
+    """
+    Amplitudes de una instrucción initialize/set_statevector, o None si el estado
+    no se dio como vector (initialize(3) o initialize('01+0'), p. ej.)
+    """
+    # initialize guarda una lista de amplitudes; set_statevector, un único array
+    params = operacion.params[0] if operacion.name == 'set_statevector' else operacion.params
+    if len(params) != 2 ** num_qubits or isinstance(params[0], str):
+        return None
+    return np.asarray(params, dtype=dtype)
+
+def separar_circuito_qiskit(cq):
+    """
+    Separa un QuantumCircuit en (estado_inicial, operaciones).
+    Devuelve None si el circuito no empieza con initialize/set_statevector de un
+    vector de amplitudes o contiene puertas que no son permutaciones (medidas, rotaciones...).
+    """
+    estado_inicial = None
+    operaciones = []
+    for instruccion in cq.data:
+        nombre = instruccion.operation.name
+        qubits = [cq.find_bit(q).index for q in instruccion.qubits]
+        if nombre in _IGNORADAS_QISKIT:
+            continue
+        if nombre in ('initialize', 'set_statevector') and estado_inicial is None and not operaciones:
+            if qubits != list(range(cq.num_qubits)):
+                return None
+            estado_inicial = amplitudes_preparacion(instruccion.operation, cq.num_qubits)
+            if estado_inicial is None:
+                return None
+            continue
+        if nombre not in PUERTAS_PERMUTACION:
+            return None
+        operaciones.append((nombre, qubits))
+
+    if estado_inicial is None:
+        return None
+    return estado_inicial, operaciones
+
+def operaciones_pennylane(ops):
+    """Convierte operaciones de PennyLane a (puerta, wires); None si alguna no es permutación"""
+    operaciones = []
+    for op in ops:
+        if op.name not in NOMBRES_PENNYLANE:
+            return None
+        operaciones.append((NOMBRES_PENNYLANE[op.name], list(op.wires)))
+    return operaciones
+
+def ejecutar_qiskit(circuitos):
+    """
+    Ejecuta los circuitos que son permutaciones sin simulador.
+    Devuelve (estados, pendientes): estados[i] es None para los circuitos que
+    hay que mandar a Aer, cuyos índices se listan en pendientes.
+    """
+    estados = [None] * len(circuitos)
+    pendientes = []
+    grupos = {}
+    for i, cq in enumerate(circuitos):
+        separado = separar_circuito_qiskit(cq)
+        if separado is None:
+            pendientes.append(i)
+            continue
+        estado_inicial, operaciones = separado
+        permutacion = compilar_permutacion(operaciones, cq.num_qubits)
+        clave = id(permutacion)
+        grupos.setdefault(clave, (permutacion, [], []))
+        grupos[clave][1].append(i)
+        grupos[clave][2].append(estado_inicial)
+
+    # Un gather vectorizado por cada permutación distinta del lote
+    for permutacion, indices, iniciales in grupos.values():
+        finales = aplicar_permutacion(np.stack(iniciales), permutacion)
+        for i, estado in zip(indices, finales):
+            estados[i] = estado
+    return estados, pendientes
@@ -0,0 +1,233 @@
+"""
+Pipeline por lotes sin interfaz gráfica
+Procesa un directorio o un patrón glob de imágenes en streaming:
+preprocesar → codificar → simular → decodificar → escribir.
+Cada etapa es un generador; las colas acotadas entre etapas y el número
+máximo de lotes en vuelo limitan la memoria, y la simulación se reparte
+en un pool de procesos (los lotes van y vuelven en memoria compartida).
+Los resultados se escriben como PNG o en un almacén .npy (memmap).
+"""
+
+import argparse
+import glob
+import os
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+import almacen
+import backends
+import memoria
+import preprocesado
+
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tif', '.tiff')
+MOTORES = ('auto',) + tuple(backends.BACKENDS)
+
+_FIN = object()
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def listar_imagenes(entrada):
+    """Genera las rutas de imagen de un directorio o de un patrón glob"""
+    if os.path.isdir(entrada):
+        with os.scandir(entrada) as entradas:
+            for e in entradas:
+                if e.is_file() and e.name.lower().endswith(EXTENSIONES):
+                    yield e.path
+    else:
+        for ruta in glob.iglob(entrada):
+            if ruta.lower().endswith(EXTENSIONES):
+                yield ruta
+
+def en_hilo(generador, max_en_cola):
+    """Consume un generador en un hilo aparte a través de una cola acotada"""
+    cola = queue.Queue(maxsize=max_en_cola)
+
+    def productor():
+        try:
+            for elemento in generador:
+                cola.put(elemento)
+        except BaseException as e:
+            cola.put(e)
+        cola.put(_FIN)
+
+    threading.Thread(target=productor, daemon=True).start()
+    while True:
+        elemento = cola.get()
+        if elemento is _FIN:
+            return
+        if isinstance(elemento, BaseException):
+            raise elemento
+        yield elemento
+
+# =============================================================================
+# ETAPAS
+# =============================================================================
+
+def preprocesar(rutas, resolucion, cache=None, color=False):
+    """Carga cada imagen en escala de grises (o RGB con color) a resolucion x resolucion (float32)"""
+    for ruta in rutas:
+        yield ruta, preprocesado.preprocesar(ruta, resolucion, cache, color)
+
+def agrupar(imagenes, tam_lote):
+    """Agrupa las imágenes en lotes (rutas, imágenes (B, R, R) o (B, R, R, 3))"""
+    rutas, arrays = [], []
+    for ruta, img_arr in imagenes:
+        rutas.append(ruta)
+        arrays.append(img_arr)
+        if len(rutas) == tam_lote:
+            yield rutas, np.stack(arrays)
+            rutas, arrays = [], []
+    if rutas:
+        yield rutas, np.stack(arrays)
+
+def codificar(lotes):
+    """Amplitude encoding de cada lote: (rutas, flats (B, 2**n), normalizaciones)"""
+    for rutas, imagenes in lotes:
+        yield (rutas,) + backends.codificar(imagenes)
+
+def simular_lote(flats, motor, num_qubits):
+    """Aplica el filtro negativo (sobre los num_qubits de píxel) a un lote con el backend indicado (se ejecuta en un proceso del pool)"""
+    return backends.BACKENDS[motor]['ejecutar_lote'](flats, num_qubits)
+
+def simular_lote_compartido(entrada, salida, motor, num_qubits):
+    """Como simular_lote, pero lee los flats y escribe los estados en bloques de memoria compartida"""
+    with almacen.adjuntar(entrada) as flats, almacen.adjuntar(salida) as estados:
+        estados[...] = simular_lote(flats, motor, num_qubits)
+        del flats, estados                          # Sin vistas vivas, los bloques se pueden cerrar
+
+def simular(lotes, motor, num_qubits, procesos=None, max_en_vuelo=None, compartida=False):
+    """
+    Reparte los lotes en un pool de procesos y los devuelve en orden de finalización.
+    Con compartida, flats y estados (complex64) viajan en memoria compartida en vez
+    de con pickle: los estados devueltos son vistas válidas hasta pedir el siguiente lote.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    if max_en_vuelo is None:
+        max_en_vuelo = 2 * procesos
+    bloques = almacen.BloquesCompartidos() if compartida else None
+    en_vuelo = {}
+
+    def recoger(hechos):
+        for futuro in hechos:
+            rutas, normalizaciones, compartido = en_vuelo.pop(futuro)
+            if compartido is None:
+                yield rutas, normalizaciones, futuro.result()
+                continue
+            entrada, salida, estados = compartido
+            futuro.result()
+            yield rutas, normalizaciones, estados
+            bloques.liberar(entrada)
+            bloques.liberar(salida)
+
+    try:
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            for rutas, flats, normalizaciones in lotes:
+                if len(en_vuelo) >= max_en_vuelo:
+                    hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                    yield from recoger(hechos)
+                if compartida:
+                    entrada = bloques.compartir(flats)
+                    salida, estados = bloques.reservar(flats.shape, np.complex64)
+                    futuro = pool.submit(simular_lote_compartido, entrada, salida, motor, num_qubits)
+                    en_vuelo[futuro] = (rutas, normalizaciones, (entrada, salida, estados))
+                else:
+                    futuro = pool.submit(simular_lote, flats, motor, num_qubits)
+                    en_vuelo[futuro] = (rutas, normalizaciones, None)
+            while en_vuelo:
+                hechos, _ = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                yield from recoger(hechos)
+    finally:
+        if bloques is not None:
+            en_vuelo.clear()
+            bloques.cerrar()
+
+def decodificar(resultados):
+    """Reconstruye cada imagen: |amplitudes| * normalización"""
+    for rutas, normalizaciones, estados in resultados:
+        for ruta, imagen in zip(rutas, backends.decodificar(estados, normalizaciones)):
+            yield ruta, imagen
+
+def escribir(imagenes, salida):
+    """Guarda cada imagen como PNG en el directorio de salida"""
+    from PIL import Image
+    os.makedirs(salida, exist_ok=True)
+    for ruta, imagen in imagenes:
+        nombre = os.path.splitext(os.path.basename(ruta))[0] + '.png'
+        destino = os.path.join(salida, nombre)
+        pixeles = np.clip(imagen * 255.0, 0, 255).astype(np.uint8)
+        Image.fromarray(pixeles).save(destino)
+        yield destino
+
+def guardar(resultados, destino):
+    """Decodifica cada lote directamente en el almacén destino; genera las rutas de origen"""
+    for rutas, normalizaciones, estados in resultados:
+        destino.anadir(rutas, normalizaciones, estados)
+        yield from rutas
+
+# =============================================================================
+# PIPELINE COMPLETO
+# =============================================================================
+
+def ejecutar_pipeline(entrada, salida, resolucion=8, motor='numpy', procesos=None,
+                      tam_lote=64, max_en_cola=4, cache=None, color=False,
+                      almacenar=False, guardar_estados=False, compartida=True):
+    """
+    Ejecuta el pipeline en streaming y genera las rutas escritas según se completan.
+    Con almacenar, los resultados van a un almacén .npy en salida (ver almacen.py)
+    y se generan las rutas de origen; con guardar_estados, también los statevectors.
+    """
+    num_qubits = memoria.qubits_para_resolucion(resolucion)
+    # 'auto' se resuelve una vez (calibración en caché) antes de arrancar el pool
+    motor = backends.elegir_backend(num_qubits, tam_lote, motor)
+    # Cota de imágenes vivas a la vez: colas entre etapas + lotes en vuelo en el pool
+    procesos = procesos or os.cpu_count() or 1
+    # En color los canales van en QUBITS_CANAL qubits más del mismo registro
+    qubits_totales = num_qubits + (backends.QUBITS_CANAL if color else 0)
+    memoria.comprobar_memoria(qubits_totales, tam_lote * (2 * max_en_cola + 2 * procesos))
+
+    # Lectura y codificación en un hilo, para solaparlas con la simulación
+    # El almacén se preasigna: hace falta saber cuántas imágenes hay
+    rutas = list(listar_imagenes(entrada)) if almacenar else listar_imagenes(entrada)
+    lotes = en_hilo(codificar(agrupar(preprocesar(rutas, resolucion, cache, color), tam_lote)),
+                    max_en_cola)
+    resultados = simular(lotes, motor, num_qubits, procesos, compartida=compartida)
+    # Escritura en otro hilo, para no frenar el envío de lotes al pool
+    if almacenar:
+        with almacen.Almacen(salida, len(rutas), resolucion, color, guardar_estados) as destino:
+            yield from en_hilo(guardar(resultados, destino), max_en_cola * tam_lote)
+    else:
+        yield from en_hilo(escribir(decodificar(resultados), salida), max_en_cola * tam_lote)
+
+def main():
+    parser = argparse.ArgumentParser(description="Filtro negativo cuántico sobre un directorio de imágenes")
+    parser.add_argument('entrada', help="Directorio o patrón glob (entre comillas) de imágenes")
+    parser.add_argument('salida', help="Directorio donde se escriben los resultados")
+    parser.add_argument('--resolucion', type=int, default=8, help="Lado de la imagen (potencia de 2)")
+    parser.add_argument('--motor', choices=MOTORES, default='numpy', help="Backend de simulación ('auto' calibra y elige el más rápido)")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (por defecto, uno por núcleo)")
+    parser.add_argument('--lote', type=int, default=64, help="Imágenes por lote enviado al pool")
+    parser.add_argument('--en-cola', type=int, default=4, help="Lotes máximos en cola entre etapas")
+    parser.add_argument('--cache', default=None, help="Directorio de caché de imágenes preprocesadas")
+    parser.add_argument('--color', action='store_true', help="Procesa R, G y B en un único circuito (2 qubits de canal)")
+    parser.add_argument('--almacen', action='store_true', help="Escribe un almacén .npy (memmap) en vez de PNG")
+    parser.add_argument('--estados', action='store_true', help="Guarda también los statevectors en el almacén")
+    parser.add_argument('--pickle', action='store_true', help="Envía los lotes al pool con pickle en vez de memoria compartida")
+    args = parser.parse_args()
+
+    t_inicio = time.perf_counter()
+    total = 0
+    for _ in ejecutar_pipeline(args.entrada, args.salida, args.resolucion, args.motor,
+                               args.procesos, args.lote, args.en_cola, args.cache, args.color,
+                               args.almacen, args.estados, not args.pickle):
+        total += 1
+    tiempo = time.perf_counter() - t_inicio
+    print(f"✅ {total} imágenes procesadas en {tiempo:.2f} s")
+
+if __name__ == "__main__":
+    main()
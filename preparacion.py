@@ -0,0 +1,168 @@
+"""
+Preparación de estado aproximada
+Alternativa a cq.initialize para amplitudes reales no negativas (imágenes):
+árbol de rotaciones RY uniformemente controladas (Möttönen) en el que cada
+multiplexor se expresa en la base de Walsh. Los coeficientes de Walsh más
+pequeños se podan, con las CNOT que solo servían para ellos, hasta el máximo
+que respeta una fidelidad mínima. La fidelidad se calcula de forma exacta a
+partir de los ángulos podados, sin simular el circuito.
+"""
+
+import numpy as np
+
+# =============================================================================
+# ÁNGULOS DEL ÁRBOL DE RY
+# =============================================================================
+
+def _walsh(v):
+    """Transformada de Walsh-Hadamard (sin normalizar): (H v)_m = sum_j (-1)^popcount(m & j) v_j"""
+    v = np.asarray(v, dtype=np.float64)
+    n = len(v)
+    h = 1
+    while h < n:
+        v = v.reshape(-1, 2, h)
+        v = np.stack((v[:, 0] + v[:, 1], v[:, 0] - v[:, 1]), axis=1).reshape(n)
+        h *= 2
+    return v
+
+def angulos_arbol(amplitudes):
+    """
+    Ángulos de las RY por nivel. El nivel k prepara el qubit n-1-k controlado por los
+    k qubits superiores (Qiskit es little-endian: el qubit n-1 es el bit más significativo).
+    """
+    probabilidades = np.asarray(amplitudes, dtype=np.float64) ** 2
+    num_qubits = int(np.log2(len(probabilidades)))
+    niveles = []
+    for k in range(num_qubits):
+        bloques = probabilidades.reshape(2 ** k, 2, -1).sum(axis=2)
+        niveles.append(2 * np.arctan2(np.sqrt(bloques[:, 1]), np.sqrt(bloques[:, 0])))
+    return niveles
+
+def estado_de_angulos(niveles):
+    """Statevector (real) que prepara el árbol con los ángulos dados"""
+    estado = np.ones(1)
+    for alfa in niveles:
+        estado = np.stack((estado * np.cos(alfa / 2), estado * np.sin(alfa / 2)), axis=1).reshape(-1)
+    return estado
+
+# =============================================================================
+# PODA CON PRESUPUESTO DE FIDELIDAD
+# =============================================================================
+
+def _gray_inversa(m):
+    """Posición de cada máscara en el código Gray (ordena las CNOT para minimizar cambios)"""
+    m = np.asarray(m, dtype=np.int64)
+    rango = m.copy()
+    desplazamiento = 1
+    while desplazamiento < 64:
+        rango ^= rango >> desplazamiento
+        desplazamiento *= 2
+    return rango
+
+def _contar_puertas(coeficientes):
+    """(RY, CNOT) que emite construir_circuito para los coeficientes dados"""
+    rotaciones = cnots = 0
+    for theta in coeficientes:
+        mascaras = np.flatnonzero(theta)
+        rotaciones += len(mascaras)
+        if len(mascaras):
+            ordenadas = mascaras[np.argsort(_gray_inversa(mascaras))]
+            # Cambios de máscara entre rotaciones consecutivas, y vuelta a 0 al final
+            saltos = np.bitwise_xor(np.concatenate(([0], ordenadas)), np.concatenate((ordenadas, [0])))
+            cnots += int(sum(((saltos >> bit) & 1).sum() for bit in range(int(saltos.max()).bit_length())))
+    return rotaciones, cnots
+
+def aproximar(amplitudes, fidelidad_minima):
+    """
+    Coeficientes de Walsh podados por nivel que preparan un estado con
+    fidelidad >= fidelidad_minima, y la fidelidad alcanzada.
+    """
+    amplitudes = np.asarray(amplitudes, dtype=np.float64)
+    amplitudes = amplitudes / np.linalg.norm(amplitudes)
+    coeficientes = [_walsh(alfa) / len(alfa) for alfa in angulos_arbol(amplitudes)]
+
+    # Todos los coeficientes del árbol en un vector (nivel k en [2^k - 1, 2^(k+1) - 1)),
+    # ordenados por magnitud creciente
+    todos = np.concatenate(coeficientes)
+    orden = np.argsort(np.abs(todos), kind='stable')
+
+    def podar(cuantos):
+        podados = todos.copy()
+        podados[orden[:cuantos]] = 0
+        return np.split(podados, np.cumsum([len(theta) for theta in coeficientes])[:-1])
+
+    def fidelidad(podados):
+        estado = estado_de_angulos([_walsh(theta) for theta in podados])
+        return float(np.dot(amplitudes, estado) ** 2)
+
+    # Búsqueda binaria del mayor número de coeficientes podados que respeta la fidelidad
+    mejor, mejor_fidelidad = coeficientes, 1.0
+    bajo, alto = 1, len(orden)
+    while bajo <= alto:
+        medio = (bajo + alto) // 2
+        podados = podar(medio)
+        f = fidelidad(podados)
+        if f >= fidelidad_minima:
+            mejor, mejor_fidelidad = podados, f
+            bajo = medio + 1
+        else:
+            alto = medio - 1
+    return mejor, mejor_fidelidad
+
+# =============================================================================
+# CIRCUITO
+# =============================================================================
+
+def construir_circuito(cq, coeficientes):
+    """Añade al circuito las RY y CNOT de los coeficientes de Walsh (los nulos no emiten nada)"""
+    num_qubits = len(coeficientes)
+    for k, theta in enumerate(coeficientes):
+        objetivo = num_qubits - 1 - k
+        mascaras = np.flatnonzero(theta)
+        # La máscara m aplica RY(theta_m) con el signo de la paridad de los controles de m:
+        # las CNOT acumulan esa paridad sobre el objetivo y se deshacen al final del nivel
+        actual = 0
+        for m in [int(m) for m in mascaras[np.argsort(_gray_inversa(mascaras))]] + [None]:
+            destino = 0 if m is None else m
+            cambio = actual ^ destino
+            for bit in range(cambio.bit_length()):
+                if (cambio >> bit) & 1:
+                    cq.cx(objetivo + 1 + bit, objetivo)
+            actual = destino
+            if m is not None:
+                cq.ry(float(theta[m]), objetivo)
+    return cq
+
+def _informe(coeficientes, fidelidad):
+    rotaciones, cnots = _contar_puertas(coeficientes)
+    # Árbol completo: 2^n - 1 rotaciones y 2^n - 2 CNOT
+    rotaciones_exactas, cnots_exactas = 2 ** len(coeficientes) - 1, 2 ** len(coeficientes) - 2
+    return {
+        'fidelidad': fidelidad,
+        'rotaciones': rotaciones,
+        'cnots': cnots,
+        'rotaciones_exactas': rotaciones_exactas,
+        'cnots_exactas': cnots_exactas,
+        'ahorro': 1 - (rotaciones + cnots) / (rotaciones_exactas + cnots_exactas),
+    }
+
+def _comprobar(amplitudes):
+    if np.any(np.asarray(amplitudes) < 0):
+        raise ValueError("La preparación aproximada solo admite amplitudes reales no negativas.")
+
+def preparar_aproximado(cq, amplitudes, fidelidad_minima):
+    """
+    Prepara en cq un estado aproximado de las amplitudes (reales, no negativas).
+    Devuelve {'fidelidad', 'rotaciones', 'cnots', 'rotaciones_exactas', 'cnots_exactas', 'ahorro'}
+    """
+    _comprobar(amplitudes)
+    coeficientes, fidelidad = aproximar(amplitudes, fidelidad_minima)
+    construir_circuito(cq, coeficientes)
+    return _informe(coeficientes, fidelidad)
+
+def estado_aproximado(amplitudes, fidelidad_minima):
+    """Statevector que prepararía preparar_aproximado, y su informe (sin construir el circuito)"""
+    _comprobar(amplitudes)
+    coeficientes, fidelidad = aproximar(amplitudes, fidelidad_minima)
+    estado = estado_de_angulos([_walsh(theta) for theta in coeficientes])
+    return estado, _informe(coeficientes, fidelidad)
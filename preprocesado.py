@@ -0,0 +1,108 @@
+"""
+Preprocesado de imágenes
+Carga en escala de grises a resolucion x resolucion decodificando los JPEG a
+la menor escala suficiente (draft de PIL: la DCT se reduce 1/2, 1/4 o 1/8 al
+decodificar) y reduciendo el resto de formatos con reduce() antes del
+remuestreo. Los lotes se convierten a float32 sobre un único buffer, sin
+copias intermedias en float64, y una caché opcional en disco, indexada por
+el hash del contenido, guarda los arrays ya preprocesados para no volver a
+decodificar las mismas imágenes. Con color=True se conservan los canales
+R, G y B (resolucion, resolucion, 3).
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+import memoria
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+# Versión del formato de la caché: cambiarla invalida las entradas anteriores
+VERSION_CACHE = 1
+
+# reduce() entero antes del remuestreo cuando la imagen es 3 veces mayor que el destino
+REDUCCION = 3.0
+
+# Directorio de caché por defecto (desactivada si no se define)
+VARIABLE_CACHE = "COMPCUANTICA_CACHE"
+
+# =============================================================================
+# DECODIFICACIÓN
+# =============================================================================
+
+def cargar(ruta, resolucion, color=False):
+    """Imagen uint8 de resolucion x resolucion, en grises o (con color) RGB"""
+    from PIL import Image
+
+    modo = "RGB" if color else "L"
+    with Image.open(ruta) as img:
+        # Para JPEG decodifica directamente a la escala más pequeña >= resolucion
+        img.draft(modo, (resolucion, resolucion))
+        img = img.convert(modo).resize((resolucion, resolucion), reducing_gap=REDUCCION)
+    return np.asarray(img)
+
+# =============================================================================
+# CACHÉ EN DISCO
+# =============================================================================
+
+def _clave(ruta, resolucion, color):
+    with open(ruta, 'rb') as f:
+        contenido = hashlib.sha256(f.read()).hexdigest()
+    return f"{contenido}_{resolucion}{'_rgb' if color else ''}_v{VERSION_CACHE}"
+
+def _leer_cache(cache, clave):
+    try:
+        # memmap: las imágenes grandes no se copian hasta que se usan
+        return np.load(os.path.join(cache, clave + '.npy'), mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+def _escribir_cache(cache, clave, img_arr):
+    os.makedirs(cache, exist_ok=True)
+    destino = os.path.join(cache, clave + '.npy')
+    temporal = f"{destino}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        np.save(f, img_arr)
+    os.replace(temporal, destino)                  # Escritura atómica (varios procesos)
+
+# =============================================================================
+# PREPROCESADO
+# =============================================================================
+
+def preprocesar_lote(rutas, resolucion=8, cache=None, color=False):
+    """
+    Lote (N, resolucion, resolucion) float32 en [0, 1], o (N, resolucion, resolucion, 3)
+    con color. Con cache (un directorio),
+    las imágenes ya vistas se leen de disco sin decodificar. Por defecto se usa
+    el directorio de la variable de entorno COMPCUANTICA_CACHE, si existe.
+    """
+    memoria.qubits_para_resolucion(resolucion)     # Valida la resolución
+    if cache is None:
+        cache = os.environ.get(VARIABLE_CACHE)
+    rutas = list(rutas)
+    lote = np.empty((len(rutas), resolucion, resolucion) + ((3,) if color else ()), dtype=np.float32)
+    nuevas = []
+    for i, ruta in enumerate(rutas):
+        clave = _clave(ruta, resolucion, color) if cache else None
+        guardada = _leer_cache(cache, clave) if cache else None
+        if guardada is not None:
+            lote[i] = guardada
+        else:
+            lote[i] = cargar(ruta, resolucion, color)  # uint8 → float32 directamente sobre el lote
+            nuevas.append((i, clave))
+
+    # Solo las imágenes recién decodificadas se escalan (las de la caché ya lo están)
+    escritas = set()
+    for i, clave in nuevas:
+        lote[i] *= np.float32(1 / 255)
+        if cache and clave not in escritas:      # Imágenes repetidas en el lote: una escritura
+            _escribir_cache(cache, clave, lote[i])
+            escritas.add(clave)
+    return lote
+
+def preprocesar(ruta, resolucion=8, cache=None, color=False):
+    """Una imagen (resolucion, resolucion) float32 en [0, 1], o (resolucion, resolucion, 3) con color"""
+    return preprocesar_lote([ruta], resolucion, cache, color)[0]
@@ -0,0 +1,37 @@
+"""
+Tablas de puertas compartidas
+Nombres de PennyLane y aridad de las puertas de Qiskit que reconocen el
+traductor y los motores de ejecución (permutaciones, mosaico). Solo contiene
+datos: se puede importar sin cargar el traductor ni ningún SDK cuántico.
+"""
+
+# =============================================================================
+# MAPEO DE PUERTAS QISKIT → PENNYLANE
+# =============================================================================
+GATE_MAPPING = {
+    'x': 'qml.PauliX',
+    'y': 'qml.PauliY',
+    'z': 'qml.PauliZ',
+    'h': 'qml.Hadamard',
+    'cx': 'qml.CNOT',
+    'cy': 'qml.CY',
+    'cz': 'qml.CZ',
+    'swap': 'qml.SWAP',
+    'rx': 'qml.RX',
+    'ry': 'qml.RY',
+    'rz': 'qml.RZ',
+    's': 'qml.S',
+    't': 'qml.T',
+    'sdg': 'qml.adjoint(qml.S)',
+    'tdg': 'qml.adjoint(qml.T)',
+    'ccx': 'qml.Toffoli',
+    'cswap': 'qml.CSWAP'
+}
+
+# Número de qubits sobre los que actúa cada puerta (los argumentos previos son parámetros)
+ARIDAD_PUERTAS = {
+    'x': 1, 'y': 1, 'z': 1, 'h': 1, 's': 1, 't': 1, 'sdg': 1, 'tdg': 1,
+    'rx': 1, 'ry': 1, 'rz': 1,
+    'cx': 2, 'cy': 2, 'cz': 2, 'swap': 2,
+    'ccx': 3, 'cswap': 3
+}
@@ -0,0 +1,8 @@
+"""Configuración común de las pruebas: los módulos del proyecto están en la raíz del repositorio"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
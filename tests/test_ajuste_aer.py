@@ -0,0 +1,44 @@
+"""Pruebas del ajuste de Aer: perfil, precisión fija y medidas que fallan"""
+
+import json
+
+import pytest
+
+import ajuste_aer
+
+NUM_QUBITS = 4
+
+
+@pytest.fixture(autouse=True)
+def perfil_temporal(tmp_path, monkeypatch):
+    monkeypatch.setattr(ajuste_aer, 'RUTA_PERFIL', str(tmp_path / "perfil.json"))
+    ajuste_aer._perfil.cache_clear()
+    yield
+    ajuste_aer._perfil.cache_clear()
+
+
+def test_la_precision_no_se_barre():
+    assert 'precision' not in dict(ajuste_aer.candidatos(NUM_QUBITS, 16))
+
+def test_opciones_del_lote_mas_parecido_en_precision_simple():
+    assert ajuste_aer.opciones(NUM_QUBITS, 16) == {}
+    # Perfil escrito por una versión que también barría la precisión
+    with open(ajuste_aer.RUTA_PERFIL, 'w', encoding='utf-8') as f:
+        json.dump({f"{NUM_QUBITS}:16": {'opciones': {'precision': 'double', 'max_parallel_threads': 1}}}, f)
+    ajuste_aer._perfil.cache_clear()
+    assert ajuste_aer.opciones(NUM_QUBITS, 12) == {'precision': 'single', 'max_parallel_threads': 1}
+    assert ajuste_aer.opciones(NUM_QUBITS + 1, 16) == {}
+
+def test_ajustar_guarda_el_perfil():
+    elegidas, tiempo, tiempo_base = ajuste_aer.ajustar(NUM_QUBITS, 2, repeticiones=1, informar=lambda _: None)
+    assert elegidas['precision'] == 'single' and tiempo > 0 and tiempo_base > 0
+    assert ajuste_aer.opciones(NUM_QUBITS, 2) == elegidas
+
+def test_medida_final_fallida_conserva_el_barrido(monkeypatch):
+    medidas = iter([0.2, 0.1] + [None] * 100)         # Base, una mejora y después solo fallos
+    monkeypatch.setattr(ajuste_aer, 'medir', lambda *args: next(medidas))
+    elegidas, tiempo, tiempo_base = ajuste_aer.ajustar(NUM_QUBITS, 2, repeticiones=1, informar=lambda _: None)
+    assert (tiempo, tiempo_base) == (0.1, 0.2)
+    with open(ajuste_aer.RUTA_PERFIL, encoding='utf-8') as f:
+        guardado = next(iter(json.load(f).values()))
+    assert guardado['segundos'] == 0.1 and guardado['opciones'] == elegidas
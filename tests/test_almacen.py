@@ -0,0 +1,74 @@
+"""Pruebas del almacén en disco y de los bloques de memoria compartida"""
+
+import json
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+import almacen
+import codificacion
+
+
+def _lote(n, resolucion=8, color=False, semilla=0):
+    forma = (n, resolucion, resolucion) + ((3,) if color else ())
+    imagenes = np.random.default_rng(semilla).random(forma, dtype=np.float32)
+    flats, normalizaciones = codificacion.codificar(imagenes)
+    return imagenes, flats.astype(np.complex64), normalizaciones
+
+
+@pytest.mark.parametrize('color', [False, True])
+def test_ida_y_vuelta(tmp_path, color):
+    imagenes, estados, normalizaciones = _lote(5, color=color)
+    rutas = [f"imagen_{i}.png" for i in range(5)]
+    # Sitio para 8: solo las 5 escritas se ven al abrir
+    with almacen.Almacen(str(tmp_path), 8, 8, color=color, guardar_estados=True) as destino:
+        assert destino.anadir(rutas[:2], normalizaciones[:2], estados[:2]) == 0
+        assert destino.anadir(rutas[2:], normalizaciones[2:], estados[2:]) == 2
+    resultados = almacen.abrir(str(tmp_path))
+    assert len(resultados) == 5 and resultados.color == color
+    np.testing.assert_allclose(resultados.imagenes, imagenes, atol=1e-6)
+    np.testing.assert_array_equal(resultados.estados, estados)
+    ruta, imagen = resultados[3]
+    assert ruta == rutas[3]
+    np.testing.assert_array_equal(resultados.imagen(ruta), imagen)
+
+def test_desbordamiento(tmp_path):
+    _, estados, normalizaciones = _lote(3)
+    with almacen.Almacen(str(tmp_path), 2, 8) as destino:
+        with pytest.raises(ValueError):
+            destino.anadir(['a', 'b', 'c'], normalizaciones, estados)
+
+def test_version_desconocida(tmp_path):
+    with almacen.Almacen(str(tmp_path), 1, 8):
+        pass
+    ruta_indice = os.path.join(tmp_path, almacen.FICHERO_INDICE)
+    with open(ruta_indice, encoding='utf-8') as f:
+        indice = json.load(f)
+    indice['version'] = almacen.VERSION_ALMACEN + 1
+    with open(ruta_indice, 'w', encoding='utf-8') as f:
+        json.dump(indice, f)
+    with pytest.raises(ValueError):
+        almacen.abrir(str(tmp_path))
+
+def _duplicar_en_otro_proceso(descriptor):
+    with almacen.adjuntar(descriptor) as vista:
+        vista *= 2
+        del vista
+
+def test_bloques_compartidos_entre_procesos():
+    datos = np.arange(12, dtype=np.complex64).reshape(3, 4)
+    with almacen.BloquesCompartidos() as bloques:
+        descriptor = bloques.compartir(datos)
+        proceso = multiprocessing.get_context('spawn').Process(target=_duplicar_en_otro_proceso, args=(descriptor,))
+        proceso.start()
+        proceso.join(60)
+        assert proceso.exitcode == 0
+        with almacen.adjuntar(descriptor) as vista:
+            np.testing.assert_array_equal(vista, 2 * datos)
+            del vista
+        # Un bloque liberado se reutiliza para el siguiente lote que quepa
+        bloques.liberar(descriptor)
+        siguiente, _ = bloques.reservar((2, 4), np.complex64)
+        assert siguiente[0] == descriptor[0]
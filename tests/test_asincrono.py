@@ -0,0 +1,58 @@
+"""Pruebas del front end asíncrono: resultados, orden de entrega, salida anticipada y errores"""
+
+import asyncio
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import asincrono
+import preprocesado
+
+
+def _crear_imagenes(directorio, n, resolucion=8):
+    generador = np.random.default_rng(0)
+    rutas = []
+    for i in range(n):
+        ruta = str(directorio / f"imagen_{i}.png")
+        Image.fromarray(generador.integers(0, 256, (resolucion, resolucion), dtype=np.uint8)).save(ruta)
+        rutas.append(ruta)
+    return rutas
+
+def _negativo(ruta):
+    # X en todos los qubits invierte el índice de la amplitud: la imagen girada 180°
+    return preprocesado.preprocesar_lote([ruta], cache=False)[0][::-1, ::-1]
+
+def _recoger(rutas, **opciones):
+    async def recoger():
+        return [resultado async for resultado in asincrono.procesar_imagenes(rutas, cache=False, **opciones)]
+    return asyncio.run(recoger())
+
+
+@pytest.mark.parametrize('motor', ['numpy', 'aer', 'default.qubit'])
+def test_todas_las_imagenes_una_vez(tmp_path, motor):
+    rutas = _crear_imagenes(tmp_path, 7)
+    resultados = _recoger(rutas, motor=motor, tam_lote=3, max_en_vuelo=2)
+    assert sorted(ruta for ruta, _ in resultados) == sorted(rutas)
+    for ruta, imagen in resultados:
+        np.testing.assert_allclose(imagen, _negativo(ruta), atol=1e-5)
+
+def test_salida_anticipada_sin_tareas_huerfanas(tmp_path):
+    rutas = _crear_imagenes(tmp_path, 6)
+
+    async def primera():
+        generador = asincrono.procesar_imagenes(rutas, motor='numpy', tam_lote=1, max_en_vuelo=2, cache=False)
+        ruta, _ = await generador.__anext__()
+        await generador.aclose()
+        return ruta, [tarea for tarea in asyncio.all_tasks() if tarea is not asyncio.current_task()]
+    ruta, pendientes = asyncio.run(primera())
+    assert ruta in rutas and pendientes == []
+
+def test_error_de_un_lote_se_propaga(tmp_path):
+    rutas = _crear_imagenes(tmp_path, 2) + [str(tmp_path / "no_existe.png")]
+    with pytest.raises(FileNotFoundError):
+        _recoger(rutas, motor='numpy', tam_lote=1)
+
+def test_parametros_invalidos(tmp_path):
+    with pytest.raises(ValueError):
+        _recoger(_crear_imagenes(tmp_path, 1), motor='numpy', max_en_vuelo=0)
@@ -0,0 +1,70 @@
+"""Pruebas del registro de backends y de la calibración en disco"""
+
+import json
+
+import numpy as np
+import pytest
+
+import backends
+
+
+@pytest.fixture
+def calibracion(tmp_path, monkeypatch):
+    """Calibración en un archivo temporal y con tiempos fijos; cuenta las llamadas a calibrar"""
+    ruta = tmp_path / "calibracion.json"
+    monkeypatch.setattr(backends, 'RUTA_CALIBRACION', str(ruta))
+    llamadas = []
+
+    def calibrar(num_qubits, tam_lote):
+        llamadas.append((num_qubits, tam_lote))
+        return {'numpy': 2.0, 'aer': 1.0}
+    monkeypatch.setattr(backends, 'calibrar', calibrar)
+    return ruta, llamadas
+
+
+def test_registro_completo():
+    for nombre, backend in backends.BACKENDS.items():
+        assert set(backend) == {'disponible', 'codificar', 'ejecutar_lote', 'decodificar'}, nombre
+    assert 'numpy' in backends.backends_disponibles()
+    assert set(backends.backends_disponibles()) <= set(backends.BACKENDS)
+
+def test_elegir_por_nombre(monkeypatch):
+    assert backends.elegir_backend(6, 8, 'numpy') == 'numpy'
+    with pytest.raises(ValueError):
+        backends.elegir_backend(6, 8, 'inexistente')
+    monkeypatch.setattr(backends, 'backends_disponibles', lambda: ('numpy',))
+    with pytest.raises(ImportError):
+        backends.elegir_backend(6, 8, 'aer')
+
+def test_calibracion_ida_y_vuelta(calibracion):
+    ruta, llamadas = calibracion
+    assert backends.elegir_backend(6, 8) == 'aer'
+    guardada = json.loads(ruta.read_text(encoding='utf-8'))
+    clave = backends._clave(6, 8)
+    assert guardada == {clave: {'elegido': 'aer', 'tiempos': {'numpy': 2.0, 'aer': 1.0}}}
+    # Lotes en la misma potencia de 2: se reutiliza la calibración guardada
+    assert backends.elegir_backend(6, 7) == 'aer' and len(llamadas) == 1
+    backends.elegir_backend(6, 9)
+    backends.elegir_backend(6, 8, recalibrar=True)
+    assert llamadas == [(6, 8), (6, 9), (6, 8)]
+    assert len(json.loads(ruta.read_text(encoding='utf-8'))) == 2
+
+def test_calibracion_corrupta_se_rehace(calibracion):
+    ruta, llamadas = calibracion
+    ruta.write_text("{no es json", encoding='utf-8')
+    assert backends.elegir_backend(4, 2) == 'aer' and len(llamadas) == 1
+    assert backends._clave(4, 2) in json.loads(ruta.read_text(encoding='utf-8'))
+
+def test_clave_agrupa_en_potencias_de_2():
+    assert backends._clave(6, 5) == backends._clave(6, 8) != backends._clave(6, 9)
+    assert backends._clave(6, 1) != backends._clave(8, 1)
+
+@pytest.mark.parametrize('color', [False, True])
+def test_backends_disponibles_coinciden(color):
+    forma = (3, 4, 4) + ((3,) if color else ())
+    imagenes = np.random.default_rng(0).random(forma, dtype=np.float32)
+    referencia = backends.procesar_lote(imagenes, 'numpy')
+    # X en cada qubit de píxel invierte el orden de los píxeles: giro de 180°
+    np.testing.assert_allclose(referencia, imagenes[:, ::-1, ::-1], atol=1e-5)
+    for nombre in backends.backends_disponibles():
+        np.testing.assert_allclose(backends.procesar_lote(imagenes, nombre), referencia, atol=1e-5, err_msg=nombre)
@@ -0,0 +1,10 @@
+"""Pruebas del benchmark de arranque"""
+
+import benchmark
+
+
+def test_importacion_desde_otro_directorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    medida = benchmark.medir_importacion('memoria', repeticiones=1)
+    assert medida['tiempo']['min'] > 0
+    assert medida['cargados'] == []
@@ -0,0 +1,61 @@
+"""Pruebas de la capa de codificación: ida y vuelta, imágenes negras, color y buffers"""
+
+import numpy as np
+import pytest
+
+import codificacion
+
+
+def _imagenes(forma, semilla=0):
+    return np.random.default_rng(semilla).random(forma, dtype=np.float32)
+
+
+@pytest.mark.parametrize('forma', [(5, 4, 4), (5, 8, 8), (3, 4, 4, 3)])
+def test_ida_y_vuelta(forma):
+    imagenes = _imagenes(forma)
+    flats, normalizaciones = codificacion.codificar(imagenes)
+    assert flats.shape == (forma[0], codificacion.amplitudes(forma[1:])) and flats.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(flats, axis=1), 1, rtol=1e-6)
+    np.testing.assert_allclose(codificacion.decodificar(flats, normalizaciones), imagenes, atol=1e-6)
+
+@pytest.mark.parametrize('forma', [(2, 4, 4), (2, 4, 4, 3)])
+def test_imagen_negra_es_el_estado_cero(forma):
+    imagenes = _imagenes(forma)
+    imagenes[0] = 0
+    flats, normalizaciones = codificacion.codificar(imagenes)
+    assert flats[0, 0] == 1 and not flats[0, 1:].any() and not np.any(normalizaciones[0])
+    np.testing.assert_array_equal(codificacion.decodificar(flats, normalizaciones)[0], 0)
+
+def test_color_con_un_canal_vacio():
+    imagen = _imagenes((4, 4, 3))
+    imagen[..., 1] = 0
+    flat, normalizaciones = codificacion.codificar_imagen(imagen)
+    assert normalizaciones[1] == 0
+    np.testing.assert_allclose(codificacion.decodificar_estado(flat, normalizaciones), imagen, atol=1e-6)
+
+def test_buffers_del_llamador():
+    imagenes = _imagenes((4, 8, 8))
+    flats = np.empty((4, 64), dtype=np.float32)
+    normalizaciones = np.empty(4, dtype=np.float32)
+    salida = np.empty((4, 8, 8), dtype=np.float32)
+    assert codificacion.codificar(imagenes, flats, normalizaciones)[0] is flats
+    assert codificacion.decodificar(flats, normalizaciones, out=salida) is salida
+    np.testing.assert_allclose(salida, imagenes, atol=1e-6)
+    with pytest.raises(ValueError):
+        codificacion.codificar(imagenes, np.empty((4, 32), dtype=np.float32))
+
+def test_reserva_reutiliza_buffers():
+    reserva = codificacion.ReservaBuffers()
+    buffer = reserva.tomar((3, 2))
+    reserva.soltar(buffer)
+    assert reserva.tomar((3, 2)) is buffer and reserva.creados == 1
+    assert reserva.tomar((3, 2)) is not buffer and reserva.creados == 2
+
+def test_benchmark_cuenta_reservas():
+    lineas = []
+    filas = dict(codificacion.benchmark(8, 16, repeticiones=2, informar=lineas.append))
+    _, _, reservas_anterior = filas['anterior (una a una)']
+    _, _, reservas_lote = filas['lote con buffers']
+    # El camino anterior deja al menos una imagen nueva por imagen; el lote escribe en buffers
+    assert reservas_anterior >= 16 and reservas_lote < reservas_anterior
+    assert any('reservas/imagen' in l for l in lineas)
@@ -0,0 +1,101 @@
+"""Pruebas de la instrumentación: registros, pico de memoria por etapa y exportación"""
+
+import json
+import re
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+
+import instrumentacion
+
+MIB = 1 << 20
+
+
+@pytest.fixture(autouse=True)
+def instrumentacion_activa():
+    instrumentacion.limpiar()
+    instrumentacion.activar()
+    yield
+    instrumentacion.desactivar()
+    instrumentacion.limpiar()
+
+
+@instrumentacion.medir('filtro')
+def _reservar(mib):
+    temporal = np.ones(mib * MIB, dtype=np.uint8)
+    return int(temporal[0])
+
+@instrumentacion.medir('simulacion')
+def _etapa_con_anidada(mib):
+    return _reservar(mib)
+
+@instrumentacion.medir('codificacion')
+def _circuito():
+    cq = QuantumCircuit(3)
+    cq.h(0)
+    cq.cx(0, 1)
+    cq.x(2)
+    return cq
+
+
+def test_desactivada_no_registra():
+    instrumentacion.desactivar()
+    _reservar(1)
+    assert instrumentacion.registros() == []
+
+def test_pico_de_memoria_relativo_al_inicio_de_la_etapa():
+    reservada = np.ones(32 * MIB, dtype=np.uint8)       # Ya reservado antes de la etapa
+    _reservar(2)
+    registro, = instrumentacion.registros()
+    assert 2 * MIB <= registro['memoria_pico'] < 4 * MIB
+    del reservada
+
+def test_pico_de_una_etapa_anidada_cuenta_en_la_exterior():
+    _etapa_con_anidada(4)
+    interior, exterior = instrumentacion.registros()
+    assert (interior['etapa'], exterior['etapa']) == ('filtro', 'simulacion')
+    assert exterior['memoria_pico'] >= interior['memoria_pico'] >= 4 * MIB
+
+def test_negativo_de_practica2_describe_el_motor_que_se_ejecuta():
+    import Practica2
+
+    flat = np.full(16, 0.25, dtype=np.float32)
+    Practica2.circuito_negativo(flat, 4, motor="permutacion")
+    Practica2.circuito_negativo(flat, 4, motor="pennylane")
+    permutacion, pennylane = instrumentacion.registros()
+    assert permutacion['motor'] == 'permutacion' and 'profundidad' not in permutacion
+    assert permutacion['ancho'] == 4
+    assert pennylane['profundidad'] == 2 and pennylane['puertas'] == {'AmplitudeEmbedding': 1, 'PauliX': 4}
+
+def test_exportar_jsonl(tmp_path):
+    _circuito()
+    _reservar(1)
+    ruta = tmp_path / "traza.jsonl"
+    instrumentacion.exportar_jsonl(ruta)
+    lineas = ruta.read_text(encoding='utf-8').splitlines()
+    registros = [json.loads(l) for l in lineas]
+    assert [r['etapa'] for r in registros] == ['codificacion', 'filtro']
+    assert registros[0]['modulo'] == 'test_instrumentacion' and registros[0]['funcion'] == '_circuito'
+    assert registros[0]['ancho'] == 3 and registros[0]['puertas'] == {'h': 1, 'cx': 1, 'x': 1}
+    assert all(r['duracion'] >= 0 and 'memoria_pico' in r for r in registros)
+
+def test_texto_prometheus():
+    for _ in range(2):
+        _circuito()
+    texto = instrumentacion.texto_prometheus()
+    prefijo = instrumentacion.PREFIJO_PROMETHEUS
+    etiquetas = '{modulo="test_instrumentacion",etapa="codificacion"}'
+    assert f"# TYPE {prefijo}_segundos summary" in texto
+    assert f"{prefijo}_segundos_count{etiquetas} 2" in texto
+    assert f"{prefijo}_qubits{etiquetas} 3" in texto
+    assert f'{prefijo}_puertas_total{{modulo="test_instrumentacion",etapa="codificacion",puerta="cx"}} 2' in texto
+    # Cada muestra: nombre{etiquetas} valor
+    muestra = re.compile(r'^[a-z_]+\{[^}]*\} [0-9.e+-]+$')
+    assert all(muestra.match(l) for l in texto.splitlines() if not l.startswith('#'))
+
+def test_exportar_escribe_los_dos_ficheros(tmp_path):
+    _circuito()
+    instrumentacion.exportar(str(tmp_path / "metricas"))
+    assert (tmp_path / "metricas" / "traza.jsonl").read_text(encoding='utf-8').count('\n') == 1
+    assert (tmp_path / "metricas" / "metricas.prom").read_text(encoding='utf-8').startswith('# HELP')
@@ -0,0 +1,53 @@
+"""Pruebas del presupuesto de memoria"""
+
+import numpy as np
+import pytest
+
+import backends
+import memoria
+import pipeline
+
+
+@pytest.mark.parametrize('resolucion, qubits', [(2, 2), (8, 6), (32, 10), (256, 16)])
+def test_qubits_para_resolucion(resolucion, qubits):
+    assert memoria.qubits_para_resolucion(resolucion) == qubits
+    assert 2 ** qubits == resolucion * resolucion
+
+@pytest.mark.parametrize('resolucion', [0, 1, 3, 6, 100, -4])
+def test_resolucion_no_potencia_de_2(resolucion):
+    with pytest.raises(ValueError, match="potencia de 2"):
+        memoria.qubits_para_resolucion(resolucion)
+
+def test_memoria_requerida():
+    # Por amplitud: 3 buffers float32 y 2 complex64
+    por_amplitud = 3 * 4 + 2 * 8
+    assert memoria.memoria_requerida(6) == 64 * por_amplitud
+    assert memoria.memoria_requerida(6, 10) == 10 * memoria.memoria_requerida(6)
+    assert memoria.memoria_requerida(7) == 2 * memoria.memoria_requerida(6)
+
+def test_formatear_bytes():
+    assert memoria.formatear_bytes(512) == "512.0 B"
+    assert memoria.formatear_bytes(1536) == "1.5 KiB"
+    assert memoria.formatear_bytes(3 * 1024 ** 3) == "3.0 GiB"
+
+def test_comprobar_memoria(monkeypatch):
+    requerida = memoria.memoria_requerida(10, 4)
+    monkeypatch.setattr(memoria, 'memoria_disponible', lambda: requerida)
+    assert memoria.comprobar_memoria(10, 4) == requerida
+    with pytest.raises(MemoryError, match="5 imagen"):
+        memoria.comprobar_memoria(10, 5)
+    # Sin información de la RAM libre no se rechaza nada
+    monkeypatch.setattr(memoria, 'memoria_disponible', lambda: None)
+    assert memoria.comprobar_memoria(40) == memoria.memoria_requerida(40)
+
+def test_memoria_disponible_real():
+    disponible = memoria.memoria_disponible()
+    assert disponible is None or disponible > 0
+
+def test_trabajos_rechazados_antes_de_simular(tmp_path, monkeypatch):
+    monkeypatch.setattr(memoria, 'memoria_disponible', lambda: 1024)
+    with pytest.raises(MemoryError):
+        backends.procesar_lote(np.ones((2, 8, 8), np.float32), 'numpy')
+    with pytest.raises(MemoryError):
+        next(pipeline.ejecutar_pipeline(str(tmp_path), str(tmp_path / "salida"), 8, 'numpy', procesos=1))
+    assert not (tmp_path / "salida").exists()
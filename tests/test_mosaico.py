@@ -0,0 +1,65 @@
+"""Pruebas del procesado por teselas: los tres motores frente a Statevector de Qiskit"""
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+
+import mosaico
+
+# Imagen que no es múltiplo de la tesela, con una tesela completamente negra
+ALTO, ANCHO = 19, 13
+
+
+def _imagen(semilla=0):
+    img_arr = np.random.default_rng(semilla).random((ALTO, ANCHO), dtype=np.float32)
+    img_arr[:8, :8] = 0
+    return img_arr
+
+def _referencia(img_arr, operaciones):
+    """Cada tesela evolucionada con Statevector y recompuesta"""
+    teselas, forma = mosaico.dividir_en_teselas(img_arr)
+    cq = QuantumCircuit(mosaico.QUBITS_TESELA)
+    for puerta, qubits in operaciones:
+        getattr(cq, puerta)(*qubits)
+    salida = []
+    for tesela in teselas.astype(float):
+        norma = np.linalg.norm(tesela)
+        if norma == 0:
+            salida.append(np.zeros_like(tesela))
+            continue
+        salida.append(np.abs(Statevector(tesela / norma).evolve(cq).data) * norma)
+    return mosaico.unir_teselas(np.array(salida), forma)
+
+
+def test_codificar_teselas():
+    teselas, _ = mosaico.dividir_en_teselas(_imagen())
+    flat, normalizaciones = mosaico.codificar_teselas(teselas)
+    assert flat.shape == teselas.shape and flat.dtype == np.float32
+    np.testing.assert_allclose(normalizaciones, np.linalg.norm(teselas, axis=1), rtol=1e-6)
+    np.testing.assert_allclose(np.linalg.norm(flat, axis=1), 1, rtol=1e-6)
+    assert normalizaciones[0] == 0 and flat[0, 0] == 1
+
+@pytest.mark.parametrize('motor', ['numpy', 'aer', 'pennylane'])
+def test_motores_igual_que_statevector(motor):
+    img_arr = _imagen()
+    resultado = mosaico.procesar_por_teselas(img_arr, motor=motor)
+    assert resultado.shape == (ALTO, ANCHO)
+    np.testing.assert_allclose(resultado, _referencia(img_arr, mosaico.FILTRO_NEGATIVO), atol=1e-5)
+
+@pytest.mark.parametrize('motor', ['aer', 'pennylane'])
+def test_puertas_no_permutacion(motor):
+    operaciones = [('h', [0]), ('cx', [0, 3]), ('swap', [1, 5])]
+    img_arr = _imagen(1)
+    resultado = mosaico.procesar_por_teselas(img_arr, operaciones, motor)
+    np.testing.assert_allclose(resultado, _referencia(img_arr, operaciones), atol=1e-5)
+    with pytest.raises(ValueError):
+        mosaico.procesar_por_teselas(img_arr, operaciones, 'numpy')
+
+def test_qnode_reutilizado_entre_llamadas():
+    mosaico._qnode_teselas.cache_clear()
+    img_arr = _imagen()
+    mosaico.procesar_por_teselas(img_arr, motor='pennylane')
+    mosaico.procesar_por_teselas(img_arr, list(mosaico.FILTRO_NEGATIVO), motor='pennylane')
+    info = mosaico._qnode_teselas.cache_info()
+    assert (info.misses, info.hits) == (1, 1)
@@ -0,0 +1,59 @@
+"""Pruebas del optimizador peephole: el circuito optimizado prepara el mismo estado"""
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+
+import Practica1
+import optimizador
+
+NUM_QUBITS = 4
+
+
+def _estado_aleatorio(semilla):
+    estado = np.random.default_rng(semilla).random(2 ** NUM_QUBITS)
+    return estado / np.linalg.norm(estado)
+
+def _mismo_estado(optimizado, cq):
+    # Aer (Statevector no aplica set_statevector); igualdad salvo fase global
+    estado, = Practica1.simular_statevectors([optimizado])
+    return abs(abs(np.vdot(np.asarray(estado), Statevector(cq).data)) - 1) < 1e-6
+
+
+def test_absorbe_permutaciones_en_la_preparacion():
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(_estado_aleatorio(0))
+    cq.x(0)
+    cq.cx(0, 2)
+    cq.swap(1, 2)
+    cq.h(1)
+    optimizado, informe = optimizador.optimizar_circuito(cq)
+    assert informe['absorbidas'] == 3
+    assert _mismo_estado(optimizado, cq)
+
+def test_fusiona_y_cancela_puertas():
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(_estado_aleatorio(1))
+    cq.h(0)
+    cq.rz(0.3, 0)
+    cq.h(0)
+    cq.cz(1, 2)
+    cq.cz(1, 2)
+    cq.s(2)
+    cq.sdg(2)
+    optimizado, informe = optimizador.optimizar_circuito(cq)
+    assert informe['puertas_despues'] == 2
+    assert _mismo_estado(optimizado, cq)
+
+@pytest.mark.parametrize('estado', [3, '0+1-'])
+def test_initialize_sin_vector_no_se_absorbe(estado):
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(estado)
+    cq.x(0)
+    cq.h(1)
+    optimizado, informe = optimizador.optimizar_circuito(cq)
+    assert informe['absorbidas'] == 0
+    assert _mismo_estado(optimizado, cq)
+    resultado = Practica1.reconstruir_imagenes([cq], [1.0], motor='aer', optimizar=True)
+    np.testing.assert_allclose(resultado[0].ravel(), np.abs(Statevector(cq).data), atol=1e-6)
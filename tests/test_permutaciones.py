@@ -0,0 +1,79 @@
+"""Pruebas del motor de permutaciones frente a Statevector de Qiskit"""
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+
+import Practica1
+import permutaciones
+
+NUM_QUBITS = 4
+
+
+def _estado_aleatorio(semilla):
+    generador = np.random.default_rng(semilla)
+    estado = generador.normal(size=2 ** NUM_QUBITS) + 1j * generador.normal(size=2 ** NUM_QUBITS)
+    return estado / np.linalg.norm(estado)
+
+def _puertas_aleatorias(cq, semilla, num_puertas=12):
+    generador = np.random.default_rng(semilla)
+    for _ in range(num_puertas):
+        puerta = generador.choice(permutaciones.PUERTAS_PERMUTACION)
+        aridad = {'x': 1, 'cx': 2, 'swap': 2, 'ccx': 3, 'cswap': 3}[puerta]
+        getattr(cq, puerta)(*(int(q) for q in generador.choice(NUM_QUBITS, aridad, replace=False)))
+
+
+@pytest.mark.parametrize('semilla', range(5))
+def test_circuito_de_permutaciones_igual_que_statevector(semilla):
+    estado = _estado_aleatorio(semilla)
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(estado)
+    _puertas_aleatorias(cq, semilla)
+    estados, pendientes = permutaciones.ejecutar_qiskit([cq])
+    assert pendientes == []
+    puertas = cq.copy_empty_like()
+    _puertas_aleatorias(puertas, semilla)
+    esperado = Statevector(estado).evolve(puertas).data
+    np.testing.assert_allclose(estados[0], esperado, atol=1e-6)
+
+def test_orden_big_endian_de_pennylane():
+    # El wire w de PennyLane es el qubit n-1-w de Qiskit
+    operaciones = [('cx', [0, 2]), ('swap', [1, 3]), ('ccx', [3, 1, 0])]
+    grande = permutaciones.compilar_permutacion(operaciones, NUM_QUBITS, orden='big')
+    pequeno = permutaciones.compilar_permutacion(
+        [(p, [NUM_QUBITS - 1 - q for q in qubits]) for p, qubits in operaciones], NUM_QUBITS)
+    np.testing.assert_array_equal(grande, pequeno)
+
+def test_puerta_no_permutacion_va_al_simulador():
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(_estado_aleatorio(0))
+    cq.h(0)
+    assert permutaciones.ejecutar_qiskit([cq]) == ([None], [0])
+
+@pytest.mark.parametrize('estado', [3, '01+0'])
+def test_initialize_sin_vector_va_al_simulador(estado):
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.initialize(estado)
+    cq.x(0)
+    assert permutaciones.separar_circuito_qiskit(cq) is None
+    assert permutaciones.ejecutar_qiskit([cq]) == ([None], [0])
+    resultado = Practica1.reconstruir_imagenes([cq], [1.0], motor='auto', optimizar=False)
+    esperado = np.abs(Statevector(cq).data).reshape(4, 4)
+    np.testing.assert_allclose(resultado[0], esperado, atol=1e-6)
+
+def test_permutaciones_en_cache_acotada_y_de_solo_lectura():
+    a = permutaciones.compilar_permutacion([('x', [0]), ('cx', [0, 1])], NUM_QUBITS)
+    b = permutaciones.compilar_permutacion([('x', (0,)), ('cx', (0, 1))], NUM_QUBITS)
+    assert a is b and not a.flags.writeable
+    assert permutaciones._compilar.cache_info().maxsize is not None
+
+@pytest.mark.parametrize('motor', ['permutacion', 'pennylane'])
+def test_negativo_de_practica2_igual_que_statevector(motor):
+    import Practica2
+
+    estados = np.stack([_estado_aleatorio(s) for s in range(3)])
+    cq = QuantumCircuit(NUM_QUBITS)
+    cq.x(range(NUM_QUBITS))
+    esperado = np.stack([Statevector(e).evolve(cq).data for e in estados])
+    np.testing.assert_allclose(Practica2.circuito_negativo(estados, NUM_QUBITS, motor=motor), esperado, atol=1e-6)
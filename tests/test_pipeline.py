@@ -0,0 +1,90 @@
+"""Pruebas del pipeline por lotes: resultado frente al filtro en memoria, almacén y CLI"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+import almacen
+import backends
+import pipeline
+import preprocesado
+
+
+def _imagenes(directorio, n, resolucion=8, color=False, semilla=0):
+    """Escribe n PNG aleatorios en directorio y devuelve sus rutas ordenadas"""
+    from PIL import Image
+    forma = (resolucion, resolucion) + ((3,) if color else ())
+    generador = np.random.default_rng(semilla)
+    rutas = []
+    for i in range(n):
+        ruta = os.path.join(directorio, f"imagen_{i}.png")
+        Image.fromarray(generador.integers(0, 256, forma, dtype=np.uint8)).save(ruta)
+        rutas.append(ruta)
+    return rutas
+
+def _esperado(rutas, resolucion=8, color=False):
+    return backends.procesar_lote(preprocesado.preprocesar_lote(rutas, resolucion, color=color), 'numpy')
+
+
+def test_listar_imagenes(tmp_path):
+    rutas = _imagenes(str(tmp_path), 3)
+    (tmp_path / "notas.txt").write_text("no es una imagen")
+    assert sorted(pipeline.listar_imagenes(str(tmp_path))) == rutas
+    assert sorted(pipeline.listar_imagenes(str(tmp_path / "*"))) == rutas
+
+def test_agrupar_respeta_tam_lote():
+    imagenes = [(f"r{i}", np.full((2, 2), i, np.float32)) for i in range(5)]
+    lotes = list(pipeline.agrupar(imagenes, 2))
+    assert [len(rutas) for rutas, _ in lotes] == [2, 2, 1]
+    assert lotes[-1][1].shape == (1, 2, 2)
+
+def test_en_hilo_propaga_excepciones():
+    def generador():
+        yield 1
+        raise RuntimeError("fallo en la etapa")
+    salida = pipeline.en_hilo(generador(), 1)
+    assert next(salida) == 1
+    with pytest.raises(RuntimeError, match="fallo en la etapa"):
+        next(salida)
+
+@pytest.mark.parametrize('color', [False, True])
+@pytest.mark.parametrize('compartida', [False, True])
+def test_png_igual_que_en_memoria(tmp_path, color, compartida):
+    from PIL import Image
+    entrada, salida = tmp_path / "entrada", tmp_path / "salida"
+    entrada.mkdir()
+    rutas = _imagenes(str(entrada), 5, color=color)
+    escritas = list(pipeline.ejecutar_pipeline(str(entrada), str(salida), 8, 'numpy', procesos=1,
+                                               tam_lote=2, color=color, compartida=compartida))
+    assert sorted(escritas) == [os.path.join(str(salida), os.path.basename(r)) for r in rutas]
+    esperado = np.clip(_esperado(rutas, color=color) * 255.0, 0, 255).astype(np.uint8)
+    for ruta, imagen in zip(rutas, esperado):
+        with Image.open(os.path.join(str(salida), os.path.basename(ruta))) as png:
+            np.testing.assert_array_equal(np.asarray(png), imagen)
+
+def test_almacen_igual_que_en_memoria(tmp_path):
+    entrada, salida = tmp_path / "entrada", tmp_path / "salida"
+    entrada.mkdir()
+    rutas = _imagenes(str(entrada), 5)
+    procesadas = list(pipeline.ejecutar_pipeline(str(entrada), str(salida), 8, 'numpy', procesos=1,
+                                                 tam_lote=2, almacenar=True))
+    assert sorted(procesadas) == rutas
+    resultados = almacen.abrir(str(salida))
+    esperado = dict(zip(rutas, _esperado(rutas)))
+    for ruta in rutas:
+        np.testing.assert_allclose(resultados.imagen(ruta), esperado[ruta], atol=1e-6)
+
+def test_resolucion_no_potencia_de_2(tmp_path):
+    with pytest.raises(ValueError):
+        next(pipeline.ejecutar_pipeline(str(tmp_path), str(tmp_path / "salida"), 6))
+
+def test_main_informa_del_total(tmp_path, monkeypatch, capsys):
+    entrada = tmp_path / "entrada"
+    entrada.mkdir()
+    _imagenes(str(entrada), 3)
+    monkeypatch.setattr(sys, 'argv', ['pipeline.py', str(entrada), str(tmp_path / "salida"),
+                                      '--procesos', '1', '--lote', '2'])
+    pipeline.main()
+    assert "3 imágenes procesadas en" in capsys.readouterr().out
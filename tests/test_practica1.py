@@ -0,0 +1,91 @@
+"""Pruebas de Practica1: plantillas, motores y reconstrucción frente a Statevector de Qiskit"""
+
+import numpy as np
+import pytest
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+
+import Practica1
+
+
+def _imagenes(n=3, resolucion=8, semilla=0):
+    return np.random.default_rng(semilla).random((n, resolucion, resolucion), dtype=np.float32)
+
+def _referencia(img_arr, filtro):
+    """Imagen filtrada calculada con Statevector (sin plantillas ni simulador)"""
+    normalizacion = np.linalg.norm(img_arr)
+    num_qubits = int(np.log2(img_arr.size))
+    cq = QuantumCircuit(num_qubits)
+    filtro(cq, num_qubits)
+    estado = Statevector((img_arr.ravel() / normalizacion).astype(complex)).evolve(cq)
+    return np.abs(estado.data).reshape(img_arr.shape) * normalizacion
+
+
+@pytest.mark.parametrize('motor', ['auto', 'aer'])
+def test_plantilla_con_filtro_no_simetrico(motor):
+    # Un SWAP no se puede quitar del circuito: transpile lo movía al layout final y Aer lo ignoraba
+    def filtro(cq, n):
+        cq.swap(0, n - 1)
+    imagenes = _imagenes()
+    resultado = Practica1.reconstruir_imagenes(imagenes, filtro=filtro, motor=motor)
+    esperado = np.array([_referencia(img, filtro) for img in imagenes])
+    np.testing.assert_allclose(resultado, esperado, atol=1e-5)
+    assert np.abs(resultado - imagenes).max() > 0.1
+
+
+@pytest.mark.parametrize('motor', ['auto', 'aer'])
+def test_negativo_por_plantilla(motor):
+    imagenes = _imagenes()
+    resultado = Practica1.reconstruir_imagenes(imagenes, motor=motor)
+    esperado = np.array([_referencia(img, Practica1.aplicar_quantum_negativo) for img in imagenes])
+    np.testing.assert_allclose(resultado, esperado, atol=1e-5)
+
+@pytest.mark.parametrize('resolucion', [4, 16])
+def test_lote_vacio_conserva_la_forma(resolucion):
+    vacio = np.empty((0, resolucion, resolucion), dtype=np.float32)
+    assert Practica1.reconstruir_imagenes(vacio).shape == (0, resolucion, resolucion)
+    assert Practica1.reconstruir_imagenes(vacio[..., None].repeat(3, -1)).shape == (0, resolucion, resolucion, 3)
+
+def test_lista_vacia_sin_lado_inventado():
+    assert Practica1.reconstruir_imagenes([], []).shape == (0,)
+    imagenes, informe = Practica1.reconstruir_imagenes_por_medidas([], [])
+    assert imagenes.shape == (0,) and informe == []
+
+def _circuitos_negativo(n=3, resolucion=4):
+    imagenes = _imagenes(n, resolucion)
+    circuitos, normalizaciones = [], []
+    for img_arr in imagenes:
+        cq, _, normalizacion = Practica1.codificar_con_plantilla(img_arr)
+        circuitos.append(cq)
+        normalizaciones.append(normalizacion)
+    return imagenes, circuitos, normalizaciones
+
+def test_medidas_respetan_max_shots():
+    _, circuitos, normalizaciones = _circuitos_negativo()
+    _, informe = Practica1.reconstruir_imagenes_por_medidas(circuitos, normalizaciones, error_objetivo=1e-4,
+                                                            shots_iniciales=1000, max_shots=3000, semilla=1)
+    assert [r['shots'] for r in informe] == [3000] * len(circuitos)
+    assert all(r['error'] > 1e-4 for r in informe)
+
+def test_medidas_alcanzan_el_error_objetivo():
+    imagenes, circuitos, normalizaciones = _circuitos_negativo()
+    resultado, informe = Practica1.reconstruir_imagenes_por_medidas(circuitos, normalizaciones,
+                                                                    error_objetivo=0.02, semilla=7)
+    for img_arr, obtenida, r in zip(imagenes, resultado, informe):
+        assert r['error'] <= 0.02 and r['shots'] < Practica1.MAX_SHOTS
+        # Cota del error: normalizacion / (2 * sqrt(shots)). Sin redondeos, los shots
+        # no pasan de lo que pide esa cota (más un margen por el ruido de la estimación)
+        necesarios = (np.linalg.norm(img_arr) / (2 * 0.02)) ** 2
+        assert r['shots'] <= 1.25 * max(necesarios, Practica1.SHOTS_INICIALES)
+        # El negativo (X en todos los qubits) gira la imagen 180°, dentro de 5 errores típicos
+        np.testing.assert_allclose(obtenida, img_arr[::-1, ::-1], atol=5 * r['error'])
+
+def test_preparacion_aproximada_en_color():
+    import codificacion
+
+    img_arr = _imagenes(1, 4)[0][..., None] * np.array([1.0, 0.5, 0.25], dtype=np.float32)
+    cq, num_qubits, normalizaciones, informe = Practica1.codificar_a_qubits(img_arr, fidelidad_minima=0.98)
+    assert num_qubits == 4 and cq.num_qubits == 4 + codificacion.QUBITS_CANAL and normalizaciones.shape == (3,)
+    flat, _ = codificacion.codificar_imagen(img_arr)
+    fidelidad = abs(np.vdot(flat, Statevector(cq).data)) ** 2
+    assert fidelidad >= 0.98 and fidelidad == pytest.approx(informe['fidelidad'], abs=1e-5)
@@ -0,0 +1,100 @@
+"""Pruebas del preprocesado de imágenes y de su caché en disco"""
+
+import os
+
+import numpy as np
+import pytest
+
+import preprocesado
+
+
+def _png(ruta, semilla=0, lado=32, color=False):
+    from PIL import Image
+    forma = (lado, lado) + ((3,) if color else ())
+    pixeles = np.random.default_rng(semilla).integers(0, 256, forma, dtype=np.uint8)
+    Image.fromarray(pixeles).save(ruta)
+    return str(ruta)
+
+@pytest.fixture
+def decodificaciones(monkeypatch):
+    """Rutas que llegan a decodificarse (las servidas por la caché no aparecen)"""
+    rutas = []
+    cargar = preprocesado.cargar
+
+    def contar(ruta, resolucion, color=False):
+        rutas.append(ruta)
+        return cargar(ruta, resolucion, color)
+    monkeypatch.setattr(preprocesado, 'cargar', contar)
+    monkeypatch.delenv(preprocesado.VARIABLE_CACHE, raising=False)
+    return rutas
+
+
+@pytest.mark.parametrize('color', [False, True])
+def test_lote_en_float32_y_rango(tmp_path, color):
+    rutas = [_png(tmp_path / f"{i}.png", i, color=color) for i in range(3)]
+    lote = preprocesado.preprocesar_lote(rutas, 8, color=color)
+    assert lote.dtype == np.float32
+    assert lote.shape == (3, 8, 8) + ((3,) if color else ())
+    assert 0.0 <= lote.min() and lote.max() <= 1.0
+    np.testing.assert_array_equal(lote[1], preprocesado.preprocesar(rutas[1], 8, color=color))
+
+def test_resolucion_invalida(tmp_path):
+    with pytest.raises(ValueError):
+        preprocesado.preprocesar(_png(tmp_path / "a.png"), 6)
+
+def test_cache_acierto_y_fallo(tmp_path, decodificaciones):
+    cache = str(tmp_path / "cache")
+    ruta = _png(tmp_path / "a.png")
+    primera = preprocesado.preprocesar(ruta, 8, cache)
+    assert decodificaciones == [ruta] and len(os.listdir(cache)) == 1
+    segunda = preprocesado.preprocesar(ruta, 8, cache)
+    assert decodificaciones == [ruta]
+    np.testing.assert_array_equal(primera, segunda)
+    np.testing.assert_array_equal(primera, preprocesado.preprocesar(ruta, 8))
+
+def test_cache_por_variable_de_entorno(tmp_path, decodificaciones, monkeypatch):
+    monkeypatch.setenv(preprocesado.VARIABLE_CACHE, str(tmp_path / "cache"))
+    ruta = _png(tmp_path / "a.png")
+    preprocesado.preprocesar(ruta, 8)
+    preprocesado.preprocesar(ruta, 8)
+    assert len(decodificaciones) == 1
+
+def test_cache_repetidas_en_el_lote(tmp_path, decodificaciones):
+    cache = str(tmp_path / "cache")
+    ruta = _png(tmp_path / "a.png")
+    lote = preprocesado.preprocesar_lote([ruta, ruta], 8, cache)
+    np.testing.assert_array_equal(lote[0], lote[1])
+    assert os.listdir(cache) == [preprocesado._clave(ruta, 8, False) + '.npy']
+
+def test_clave_invalidada(tmp_path, decodificaciones, monkeypatch):
+    cache = str(tmp_path / "cache")
+    ruta = _png(tmp_path / "a.png", semilla=0, color=True)
+    preprocesado.preprocesar(ruta, 8, cache)
+    # Otra resolución u otro modo de color: entrada nueva
+    preprocesado.preprocesar(ruta, 4, cache)
+    assert preprocesado.preprocesar(ruta, 8, cache, color=True).shape == (8, 8, 3)
+    assert len(decodificaciones) == 3
+    # La clave es el hash del contenido: otra ruta con los mismos bytes acierta,
+    # y la misma ruta con otro contenido falla
+    copia = tmp_path / "copia.png"
+    copia.write_bytes(open(ruta, 'rb').read())
+    preprocesado.preprocesar(str(copia), 8, cache)
+    assert len(decodificaciones) == 3
+    _png(ruta, semilla=1, color=True)
+    nueva = preprocesado.preprocesar(ruta, 8, cache)
+    assert len(decodificaciones) == 4
+    np.testing.assert_array_equal(nueva, preprocesado.preprocesar(ruta, 8))
+    # Cambiar la versión del formato invalida todas las entradas
+    monkeypatch.setattr(preprocesado, 'VERSION_CACHE', preprocesado.VERSION_CACHE + 1)
+    preprocesado.preprocesar(ruta, 8, cache)
+    assert len(decodificaciones) == 6
+
+def test_cache_corrupta_se_reescribe(tmp_path, decodificaciones):
+    cache = tmp_path / "cache"
+    ruta = _png(tmp_path / "a.png")
+    esperado = preprocesado.preprocesar(ruta, 8, str(cache))
+    (cache / (preprocesado._clave(ruta, 8, False) + '.npy')).write_bytes(b"basura")
+    np.testing.assert_array_equal(preprocesado.preprocesar(ruta, 8, str(cache)), esperado)
+    assert len(decodificaciones) == 2
+    np.testing.assert_array_equal(preprocesado.preprocesar(ruta, 8, str(cache)), esperado)
+    assert len(decodificaciones) == 2
@@ -0,0 +1,405 @@
+"""Pruebas del traductor Qiskit → PennyLane / NumPy frente a Statevector de Qiskit"""
+
+import json
+import textwrap
+
+import numpy as np
+import pytest
+
+import Traductor
+
+CON_AER = textwrap.dedent('''
+    import sys
+    from qiskit import QuantumCircuit
+    from qiskit_aer import AerSimulator
+
+
+    def preparar(n):
+        cq = QuantumCircuit(n)
+        cq.x(0)
+        return cq
+
+    def simular(cq):
+        return AerSimulator().run(cq).result()
+
+    def simular_dos_veces(cq):
+        return simular(cq), simular(cq)
+
+    if __name__ == "__main__":
+        cq = preparar(2)
+        if "--aer" in sys.argv:
+            resultado = simular_dos_veces(cq)
+            print(resultado)
+        else:
+            estado = cq
+''')
+
+
+def _ejecutar_main(codigo):
+    espacio = {'__name__': '__main__'}
+    exec(compile(codigo, '<traducido>', 'exec'), espacio)
+    return espacio
+
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_main_no_llama_a_funciones_omitidas(objetivo, monkeypatch):
+    traducido = Traductor.traducir_codigo_completo(CON_AER, objetivo)
+    assert 'def simular' not in traducido and 'def simular_dos_veces' not in traducido
+    monkeypatch.setattr('sys.argv', ['traducido'])
+    assert _ejecutar_main(traducido)['estado'].shape == (4,)
+    monkeypatch.setattr('sys.argv', ['traducido', '--aer'])
+    with pytest.raises(SystemExit, match='simular_dos_veces .*depende de Qiskit Aer'):
+        _ejecutar_main(traducido)
+    assert 'NotImplementedError' not in traducido
+
+SIN_BACKENDS = textwrap.dedent('''
+    import numpy as np
+    from qiskit_aer import AerSimulator
+
+
+    def reconstruir_imagen(cq, normalizacion):
+        estado = AerSimulator().run(cq).result().get_statevector()
+        return np.abs(estado).reshape(8, 8) * normalizacion
+''')
+
+
+@pytest.mark.parametrize('color', [False, True])
+def test_plantilla_reconstruir_imagen_sin_modulos_del_proyecto(color):
+    import codificacion
+
+    traducido = Traductor.traducir_codigo_completo(SIN_BACKENDS)
+    assert 'backends' not in traducido and 'codificacion' not in traducido
+    espacio = {'__name__': 'traducido'}
+    exec(compile(traducido, '<traducido>', 'exec'), espacio)
+    imagen = np.random.default_rng(0).random((8, 8, 3) if color else (8, 8), dtype=np.float32)
+    estado, normalizacion = codificacion.codificar_imagen(imagen)
+    np.testing.assert_allclose(espacio['reconstruir_imagen'](estado, normalizacion), imagen, atol=1e-6)
+
+CON_PREPARACION = textwrap.dedent('''
+    import preparacion
+    from qiskit import QuantumCircuit
+
+
+    def codificar(flat, fidelidad_minima):
+        cq = QuantumCircuit(4)
+        informe = preparacion.preparar_aproximado(cq, flat, fidelidad_minima)
+        cq.x(0)
+        return cq, informe
+''')
+
+
+def test_funciones_de_estado_solo_con_registro():
+    sin_registro = Traductor.traducir_codigo_completo(CON_PREPARACION)
+    assert 'estado_aproximado' not in sin_registro
+    con_registro = Traductor.traducir_codigo_completo(
+        CON_PREPARACION, funciones_estado={'preparar_aproximado': 'estado_aproximado'})
+    assert 'cq, informe = preparacion.estado_aproximado(flat, fidelidad_minima)' in con_registro
+
+@pytest.mark.parametrize('forma', [(8, 8), (4, 4, 3)])
+def test_preparacion_aproximada_traducida_igual_que_practica1(forma):
+    import Practica1
+    import codigo_pennylane
+    from qiskit.quantum_info import Statevector
+
+    imagen = np.random.default_rng(0).random(forma, dtype=np.float32)
+    cq, _, _, informe = Practica1.codificar_a_qubits(imagen, fidelidad_minima=0.99)
+    estado, _, _, informe_traducido = codigo_pennylane.codificar_a_qubits(imagen, fidelidad_minima=0.99)
+    assert informe == informe_traducido
+    assert abs(np.vdot(Statevector(cq).data, np.asarray(estado))) ** 2 > 1 - 1e-6
+
+ROTACIONES = textwrap.dedent('''
+    from qiskit import QuantumCircuit
+
+
+    def rotar(cq, theta):
+        cq.h(0)
+        cq.rx(theta, 0)
+        cq.cx(0, 2)
+        cq.ry(2 * theta, 1)
+        cq.rz(theta + 0.5, 2)
+        cq.cswap(0, 1, 2)
+        cq.sdg(1)
+        cq.ccx(2, 1, 0)
+
+    def preparar(amplitudes):
+        cq = QuantumCircuit(3)
+        cq.initialize(amplitudes, cq.qubits, normalize=True)
+        cq.swap(0, 2)
+        return cq
+''')
+
+
+def _modulo(codigo):
+    espacio = {'__name__': 'traducido'}
+    exec(compile(codigo, '<traducido>', 'exec'), espacio)
+    return espacio
+
+def _estados(n, semilla=0):
+    generador = np.random.default_rng(semilla)
+    estados = generador.normal(size=(n, 8)) + 1j * generador.normal(size=(n, 8))
+    return estados / np.linalg.norm(estados, axis=1, keepdims=True)
+
+def _referencia(funcion, estado, *argumentos):
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+
+    cq = QuantumCircuit(3)
+    _modulo(ROTACIONES)[funcion](cq, *argumentos)
+    return Statevector(estado).evolve(cq).data
+
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_puertas_traducidas_igual_que_statevector(objetivo):
+    rotar = _modulo(Traductor.traducir_codigo_completo(ROTACIONES, objetivo))['rotar']
+    estados = _estados(4)
+    obtenidos = np.asarray(rotar(estados, 0.7))
+    esperados = np.stack([_referencia('rotar', e, 0.7) for e in estados])
+    np.testing.assert_allclose(obtenidos, esperados, atol=1e-8)
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_angulos_en_lote(objetivo):
+    rotar = _modulo(Traductor.traducir_codigo_completo(ROTACIONES, objetivo))['rotar']
+    estados, angulos = _estados(5), np.linspace(0, np.pi, 5)
+    esperados = np.stack([_referencia('rotar', e, a) for e, a in zip(estados, angulos)])
+    np.testing.assert_allclose(np.asarray(rotar(estados, angulos)), esperados, atol=1e-8)
+    # Un solo estado con un lote de ángulos: un estado de salida por ángulo
+    esperados = np.stack([_referencia('rotar', estados[0], a) for a in angulos])
+    np.testing.assert_allclose(np.asarray(rotar(estados[0], angulos)), esperados, atol=1e-8)
+
+def test_numpy_sin_reserva_muerta_antes_de_preparar():
+    traducido = Traductor.traducir_codigo_completo(ROTACIONES, 'numpy')
+    assert '= _estado_inicial(' not in traducido
+    amplitudes = np.arange(1, 9, dtype=float)
+    obtenido = _modulo(traducido)['preparar'](amplitudes)
+    esperado = amplitudes.reshape(2, 2, 2).transpose(2, 1, 0).ravel() / np.linalg.norm(amplitudes)
+    np.testing.assert_allclose(obtenido, esperado, atol=1e-12)
+
+REGRESIONES = textwrap.dedent('''
+    import numpy as np
+    from qiskit import QuantumCircuit
+    from qiskit_aer import AerSimulator
+
+    import instrumentacion
+
+
+    def duplicar(cq):
+        otro = cq.copy()
+        otro.x(0)
+        otro.h(2)
+        return otro
+
+    def condicional(cq, invertir):
+        if invertir:
+            veces = 2
+            cq.x(1)
+        else:
+            veces = 1
+        for _ in range(veces):
+            cq.h(0)
+            cq.cx(0, 2)
+        return cq
+
+    def orden(cq):
+        theta = 0.3
+        cq.rx(theta, 0)
+        theta = 1.2
+        cq.ry(theta, 0)
+        return cq
+
+    @instrumentacion.medir('reconstruccion')
+    def reconstruir_imagen(cq, normalizacion):
+        estado = AerSimulator().run(cq).result().get_statevector()
+        return np.abs(estado).reshape(8, 8) * normalizacion
+''')
+
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+@pytest.mark.parametrize('funcion, argumentos', [
+    ('duplicar', ()),                       # Circuito obtenido con cq.copy()
+    ('condicional', (True,)),               # Bloques que mezclan código clásico y puertas
+    ('condicional', (False,)),
+    ('orden', ()),                          # Reasignar un ángulo tras usarlo en una puerta
+])
+def test_regresiones_del_traductor(objetivo, funcion, argumentos):
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+
+    traducida = _modulo(Traductor.traducir_codigo_completo(REGRESIONES, objetivo))[funcion]
+    estado = _estados(1, semilla=3)[0]
+    original = _modulo(REGRESIONES)[funcion](QuantumCircuit(3), *argumentos)
+    esperado = Statevector(estado).evolve(original).data
+    np.testing.assert_allclose(np.asarray(traducida(estado, *argumentos)), esperado, atol=1e-8)
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_plantilla_conserva_decoradores(objetivo):
+    traducido = Traductor.traducir_codigo_completo(REGRESIONES, objetivo)
+    assert "@instrumentacion.medir('reconstruccion')\ndef reconstruir_imagen(statevector" in traducido
+    estado = np.full(64, 1 / 8, dtype=complex)
+    np.testing.assert_allclose(_modulo(traducido)['reconstruir_imagen'](estado, 8.0), np.ones((8, 8)))
+
+IMPORTS = textwrap.dedent('''
+    import functools
+    import numpy as np
+    import os, sys
+    from qiskit import QuantumCircuit
+    from qiskit_aer import AerSimulator
+
+    import ajuste_aer
+
+
+    def negativo(cq):
+        cq.x(0)
+        return cq
+
+    @functools.lru_cache(maxsize=None)
+    def simulador():
+        return AerSimulator(**ajuste_aer.opciones(6, 1))
+
+    if __name__ == "__main__":
+        print(sys.argv)
+''')
+
+
+def _importados(codigo):
+    import ast
+    nombres = []
+    for nodo in ast.parse(codigo).body:
+        if isinstance(nodo, (ast.Import, ast.ImportFrom)):
+            nombres += [alias.asname or alias.name for alias in nodo.names]
+    return nombres
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_sin_imports_repetidos_ni_sin_usar(objetivo):
+    traducido = Traductor.traducir_codigo_completo(IMPORTS, objetivo)
+    importados = _importados(traducido)
+    assert len(importados) == len(set(importados))
+    assert 'ajuste_aer' not in importados and 'os' not in importados and 'sys' in importados
+    assert ('functools' in importados) == (objetivo == 'pennylane')      # Solo la caché de QNodes lo usa
+    assert 'np' in importados
+    _modulo(traducido)['negativo'](np.eye(2)[0])
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_salidas_generadas_sin_imports_sobrantes(objetivo):
+    import pathlib
+    ruta = pathlib.Path(Traductor.__file__).with_name(f"codigo_{objetivo}.py")
+    importados = _importados(ruta.read_text(encoding='utf-8'))
+    assert len(importados) == len(set(importados))
+    assert not {'ajuste_aer', 'optimizador', 'permutaciones'} & set(importados)
+
+def test_cli_nombra_el_objetivo(tmp_path, monkeypatch, capsys):
+    origen = tmp_path / "origen"
+    origen.mkdir()
+    (origen / "circuito.py").write_text(IMPORTS, encoding='utf-8')
+    monkeypatch.setattr('sys.argv', ['Traductor.py', str(origen), str(tmp_path / "destino"),
+                                     '--objetivo', 'numpy', '--procesos', '1'])
+    Traductor.main()
+    salida = capsys.readouterr().out
+    assert 'a NumPy' in salida and 'PennyLane' not in salida
+    assert 'import pennylane' not in (tmp_path / "destino" / "circuito.py").read_text(encoding='utf-8')
+
+NUM_QUBITS = textwrap.dedent('''
+    from qiskit import QuantumCircuit
+
+
+    def ultimo(cq):
+        cq.x(cq.num_qubits - 1)
+        for q in range(cq.num_qubits):
+            cq.ry(0.1 * q, q)
+        return cq
+
+    def nuevo(k):
+        cq = QuantumCircuit(k)
+        cq.h(cq.num_qubits - 1)
+        return cq
+
+    def dibujar(cq):
+        cq.x(0)
+        return cq.draw()
+
+    def usa_dibujar(cq):
+        return dibujar(cq)
+''')
+
+
+@pytest.mark.parametrize('objetivo', ['pennylane', 'numpy'])
+def test_num_qubits_es_el_numero_de_wires(objetivo):
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+
+    traducido = _modulo(Traductor.traducir_codigo_completo(NUM_QUBITS, objetivo))
+    original = _modulo(NUM_QUBITS)
+    estado = _estados(1, semilla=5)[0]
+    esperado = Statevector(estado).evolve(original['ultimo'](QuantumCircuit(3))).data
+    np.testing.assert_allclose(np.asarray(traducido['ultimo'](estado)), esperado, atol=1e-8)
+    np.testing.assert_allclose(np.asarray(traducido['nuevo'](2)), Statevector(original['nuevo'](2)).data, atol=1e-8)
+
+def test_motivo_real_de_cada_omision():
+    traducido = Traductor.traducir_codigo_completo(NUM_QUBITS)
+    assert '# dibujar: omitida, usa cq.draw, que el traductor no admite' in traducido
+    assert '# usa_dibujar: omitida, llama a dibujar (usa cq.draw' in traducido
+    assert 'Aer' not in traducido
+
+
+# Modo por lotes: el manifiesto decide qué archivos se regeneran
+FUENTE_LOTE = textwrap.dedent('''
+    from qiskit import QuantumCircuit
+
+
+    def preparar(n):
+        cq = QuantumCircuit(n)
+        cq.h(0)
+        return cq
+''')
+
+
+def _arbol(origen):
+    (origen / "sub").mkdir(parents=True)
+    (origen / "a.py").write_text(FUENTE_LOTE, encoding='utf-8')
+    (origen / "sub" / "b.py").write_text(FUENTE_LOTE.replace('cq.h(0)', 'cq.x(0)'), encoding='utf-8')
+    (origen / "utilidades.py").write_text("VALOR = 1\n", encoding='utf-8')
+
+def _lote(origen, destino, **opciones):
+    return Traductor.traducir_directorio(str(origen), str(destino), procesos=1, **opciones)
+
+def test_directorio_solo_regenera_lo_cambiado(tmp_path):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    _arbol(origen)
+    resumen = _lote(origen, destino)
+    assert (resumen['traducidos'], resumen['sin_cambios'], resumen['errores']) == (3, 0, {})
+    assert 'qiskit' not in (destino / "sub" / "b.py").read_text(encoding='utf-8')
+    assert (destino / "utilidades.py").read_text(encoding='utf-8') == "VALOR = 1\n"
+
+    assert _lote(origen, destino)['sin_cambios'] == 3
+    (origen / "a.py").write_text(FUENTE_LOTE.replace('cq.h(0)', 'cq.z(0)'), encoding='utf-8')
+    (origen / "utilidades.py").unlink()
+    resumen = _lote(origen, destino)
+    assert (resumen['traducidos'], resumen['sin_cambios'], resumen['eliminados']) == (1, 1, 1)
+    assert not (destino / "utilidades.py").exists()
+    # Una salida borrada a mano se regenera aunque el origen no cambie
+    (destino / "sub" / "b.py").unlink()
+    assert _lote(origen, destino)['traducidos'] == 1
+    assert _lote(origen, destino, forzar=True)['traducidos'] == 2
+
+def test_directorio_reintenta_los_errores(tmp_path):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    _arbol(origen)
+    (origen / "roto.py").write_text("import qiskit\ndef (:\n", encoding='utf-8')
+    resumen = _lote(origen, destino)
+    assert list(resumen['errores']) == ['roto.py'] and resumen['traducidos'] == 3
+    manifiesto = json.loads((destino / Traductor.NOMBRE_MANIFIESTO).read_text(encoding='utf-8'))
+    assert 'roto.py' not in manifiesto['archivos']
+    # Sin arreglarlo se vuelve a intentar; arreglado, se traduce
+    resumen = _lote(origen, destino)
+    assert list(resumen['errores']) == ['roto.py'] and resumen['sin_cambios'] == 3
+    (origen / "roto.py").write_text(FUENTE_LOTE, encoding='utf-8')
+    resumen = _lote(origen, destino)
+    assert (resumen['traducidos'], resumen['errores']) == (1, {})
+
+def test_directorio_regenera_si_cambia_la_version(tmp_path, monkeypatch):
+    origen, destino = tmp_path / "origen", tmp_path / "destino"
+    _arbol(origen)
+    _lote(origen, destino)
+    assert _lote(origen, destino, objetivo='numpy')['traducidos'] == 3
+    monkeypatch.setattr(Traductor, '_version_traductor', lambda: 'otra versión')
+    assert _lote(origen, destino, objetivo='numpy')['traducidos'] == 3
+    assert _lote(origen, destino, objetivo='numpy')['sin_cambios'] == 3
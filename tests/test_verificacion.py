@@ -0,0 +1,90 @@
+"""Pruebas del verificador diferencial Qiskit → PennyLane"""
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+import pytest
+
+import Traductor
+import verificacion
+
+CONSTRUCTORAS = textwrap.dedent('''
+    import numpy as np
+    from qiskit import QuantumCircuit
+
+
+    def bell(num_qubits):
+        cq = QuantumCircuit(num_qubits)
+        cq.h(0)
+        for q in range(1, num_qubits):
+            cq.cx(0, q)
+        return cq
+
+    def codificar(img_arr):
+        flat = img_arr.flatten() / np.linalg.norm(img_arr)
+        cq = QuantumCircuit(int(np.log2(len(flat))))
+        cq.initialize(flat, cq.qubits)
+        return cq, float(np.linalg.norm(img_arr))
+
+    def girar(cq, num_qubits):
+        cq.swap(0, num_qubits - 1)
+
+    def escalar(x):
+        return 2 * x
+''')
+
+
+def _escribir(directorio, nombre, codigo):
+    ruta = os.path.join(directorio, nombre)
+    with open(ruta, 'w', encoding='utf-8') as f:
+        f.write(codigo)
+    return ruta
+
+
+def test_verifica_funciones_que_construyen_circuitos(tmp_path):
+    ruta = _escribir(tmp_path, 'constructoras.py', CONSTRUCTORAS)
+    informe = verificacion.verificar_archivo(ruta, tam_lote=4)
+    assert {r['funcion']: r['correcta'] for r in informe['funciones']} == {
+        'bell': True, 'codificar': True, 'girar': True}
+    assert informe['saltadas'] == {'escalar': "no recibe ni devuelve un circuito"}
+
+def test_detecta_una_traduccion_incorrecta(tmp_path):
+    ruta = _escribir(tmp_path, 'constructoras.py', CONSTRUCTORAS)
+    traducido = Traductor.traducir_codigo_completo(CONSTRUCTORAS)
+    assert traducido.count('qml.Hadamard') == 1
+    ruta_traducida = _escribir(tmp_path, 'traducido.py', traducido.replace('qml.Hadamard', 'qml.PauliY'))
+    informe = verificacion.verificar_archivo(ruta, ruta_traducida, tam_lote=4)
+    assert {r['funcion']: r['correcta'] for r in informe['funciones']}['bell'] is False
+
+def test_practica1_coincide_con_su_traduccion():
+    raiz = os.path.dirname(os.path.abspath(verificacion.__file__))
+    informe = verificacion.verificar_archivo(os.path.join(raiz, 'Practica1.py'),
+                                            os.path.join(raiz, 'codigo_pennylane.py'), tam_lote=4)
+    correctas = {r['funcion'] for r in informe['funciones'] if r['correcta']}
+    assert {'codificar_a_qubits', 'aplicar_quantum_negativo'} <= correctas
+    assert all(r['correcta'] for r in informe['funciones'])
+
+def test_sin_funciones_verificadas_falla(tmp_path):
+    ruta = _escribir(tmp_path, 'clasico.py', "def suma(a, b):\n    return a + b\n")
+    proceso = subprocess.run([sys.executable, verificacion.__file__, ruta], capture_output=True, text=True)
+    assert proceso.returncode == 1
+    assert 'suma' in proceso.stdout
+
+def test_el_paso_a_estado_a_estado_se_informa():
+    def solo_un_estado(cq):
+        if np.ndim(cq) != 1:
+            raise ValueError("sin lotes")
+        return cq
+    estados = verificacion.estados_aleatorios(2, 3)
+    salida, aviso = verificacion.ejecutar_pennylane(solo_un_estado, 'cq', estados)
+    np.testing.assert_array_equal(salida, estados)
+    assert 'ValueError' in aviso
+
+def test_otros_errores_no_se_ocultan():
+    def rota(cq):
+        raise RuntimeError("fallo real")
+    with pytest.raises(RuntimeError):
+        verificacion.ejecutar_pennylane(rota, 'cq', verificacion.estados_aleatorios(2, 3))
@@ -0,0 +1,375 @@
+"""
+Verificación diferencial de la traducción Qiskit → PennyLane
+Para cada función de un fichero de Qiskit que recibe un circuito (p. ej.
+aplicar_quantum_negativo), aplica la original y la traducida a un mismo lote de
+estados aleatorios normalizados: en Qiskit, un único trabajo multi-experimento
+de Aer; en PennyLane, una sola llamada con el lote entero (broadcasting). Las
+funciones que construyen y devuelven un circuito (p. ej. codificar_a_qubits)
+se llaman con el mismo lote de entradas aleatorias (imágenes) en las dos
+versiones. Los statevectors se comparan con la fidelidad |<a|b>|^2 de todo el
+lote a la vez, y se informa de las funciones que no coinciden, de las que no se
+han verificado y del tiempo por fichero. Si no se verifica ninguna función, el
+resultado es un fallo (código de salida 1), no un aprobado vacío.
+
+    python verificacion.py Practica1.py
+    python verificacion.py origen/ --traducidos destino/ --lote 64
+"""
+
+import argparse
+import ast
+import functools
+import glob
+import inspect
+import os
+import sys
+import time
+import types
+
+import numpy as np
+
+import Traductor
+
+# =============================================================================
+# CONFIGURACIÓN
+# =============================================================================
+NUM_QUBITS = 6
+TAM_LOTE = 32
+TOLERANCIA = 1e-6          # 1 - fidelidad máxima admitida
+
+# Valor de los argumentos sin valor por defecto, según su nombre (n = qubits del estado)
+VALORES_ARGUMENTOS = {
+    'num_qubits': lambda n: n,
+    'n_qubits': lambda n: n,
+}
+
+# Entradas aleatorias de las funciones que construyen un circuito, según el nombre del
+# argumento: (qubits, generador) → valor. Una imagen de n qubits es de 2**(n/2) de lado
+ENTRADAS_ALEATORIAS = {
+    'img_arr': lambda n, generador: _imagen_aleatoria(n, generador),
+    'imagen': lambda n, generador: _imagen_aleatoria(n, generador),
+}
+
+# Errores con los que una función traducida rechaza un lote (se reintenta estado a estado)
+ERRORES_LOTE = (ValueError, TypeError, IndexError)
+
+class NoVerificable(Exception):
+    """La función no se puede ejecutar con un estado de entrada (argumentos desconocidos, etc.)"""
+
+# =============================================================================
+# CARGA DE MÓDULOS
+# =============================================================================
+
+def _modulo_desde_codigo(nombre, codigo, ruta):
+    """Ejecuta el código como módulo (sin el main: __name__ no es '__main__')"""
+    directorio = os.path.dirname(os.path.abspath(ruta))
+    if directorio not in sys.path:
+        sys.path.insert(0, directorio)              # Imports de módulos vecinos (backends, memoria...)
+    modulo = types.ModuleType(nombre)
+    modulo.__file__ = os.path.abspath(ruta)
+    exec(compile(codigo, ruta, 'exec'), modulo.__dict__)
+    return modulo
+
+def _parametros_circuito(nodo):
+    """Parámetros que la función usa como circuito (puertas o cq.copy())"""
+    info = Traductor._analizar_funcion(nodo)
+    copiados = {n.func.value.id for n in ast.walk(nodo)
+                if isinstance(n, ast.Call) and isinstance(n.func, ast.Attribute) and n.func.attr == 'copy'
+                and isinstance(n.func.value, ast.Name)}
+    return [p for p in info['parametros'] if p in info['parametros_circuito'] or p in copiados]
+
+def _devuelve_circuito(nodo, circuitos):
+    """True si algún return devuelve un circuito creado en la función (solo o en una tupla)"""
+    for n in ast.walk(nodo):
+        if isinstance(n, ast.Return) and n.value is not None:
+            valores = n.value.elts if isinstance(n.value, ast.Tuple) else [n.value]
+            if any(isinstance(v, ast.Name) and v.id in circuitos for v in valores):
+                return True
+    return False
+
+def funciones_verificables(codigo):
+    """
+    (verificables, saltadas): verificables = {nombre: parámetro circuito, o None si la
+    función construye y devuelve el circuito}; saltadas = {nombre: motivo} del resto
+    """
+    arbol = ast.parse(codigo)
+    nodos = {n.name: n for n in arbol.body if isinstance(n, ast.FunctionDef)}
+    analisis = {nombre: Traductor._analizar_funcion(n) for nombre, n in nodos.items()}
+    omitidas = Traductor._propagar_omitidas(analisis)
+    verificables, saltadas = {}, {}
+    for nombre, nodo in nodos.items():
+        if nombre in omitidas:
+            saltadas[nombre] = f"omitida en la traducción, {omitidas[nombre]}"
+        elif nombre in Traductor.FUNCIONES_PLANTILLA:
+            saltadas[nombre] = "sustituida por una plantilla del traductor"
+        elif parametros := _parametros_circuito(nodo):
+            verificables[nombre] = parametros[0]
+        elif _devuelve_circuito(nodo, analisis[nombre]['circuitos']):
+            verificables[nombre] = None
+        else:
+            saltadas[nombre] = "no recibe ni devuelve un circuito"
+    return verificables, saltadas
+
+# =============================================================================
+# EJECUCIÓN EN QISKIT (Aer) Y EN PENNYLANE
+# =============================================================================
+
+def estados_aleatorios(num_qubits, tam_lote, semilla=0):
+    """Lote (tam_lote, 2**num_qubits) de estados complejos normalizados"""
+    generador = np.random.default_rng(semilla)
+    estados = generador.normal(size=(tam_lote, 2 ** num_qubits)) + 1j * generador.normal(size=(tam_lote, 2 ** num_qubits))
+    estados /= np.linalg.norm(estados, axis=1, keepdims=True)
+    return estados
+
+def _imagen_aleatoria(num_qubits, generador):
+    if num_qubits % 2:
+        raise NoVerificable(f"no hay imágenes cuadradas de {num_qubits} qubits")
+    lado = 2 ** (num_qubits // 2)
+    return generador.random((lado, lado))
+
+def _argumentos(funcion, parametro, entrada, num_qubits, generador=None):
+    """
+    Argumentos posicionales con la entrada en el parámetro del circuito. Con generador,
+    los argumentos de ENTRADAS_ALEATORIAS reciben un valor aleatorio.
+    """
+    argumentos = []
+    for p in inspect.signature(funcion).parameters.values():
+        if p.name == parametro:
+            argumentos.append(entrada)
+        elif p.name in VALORES_ARGUMENTOS:
+            argumentos.append(VALORES_ARGUMENTOS[p.name](num_qubits))
+        elif generador is not None and p.name in ENTRADAS_ALEATORIAS:
+            argumentos.append(ENTRADAS_ALEATORIAS[p.name](num_qubits, generador))
+        elif p.default is not inspect.Parameter.empty:
+            break                                   # El resto, con sus valores por defecto
+        else:
+            raise NoVerificable(f"sin valor para el argumento '{p.name}'")
+    return argumentos
+
+@functools.lru_cache(maxsize=None)
+def _simulador():
+    from qiskit_aer import AerSimulator
+    return AerSimulator(method='statevector')
+
+def _simular_qiskit(circuitos):
+    """Statevectors (N, 2**n) de los circuitos en un solo trabajo de Aer"""
+    from qiskit import transpile
+    import qiskit_aer  # noqa: F401  (registra set_statevector y save_statevector)
+
+    preparados = []
+    for cq in circuitos:
+        # La traducción ignora las medidas: se comparan los estados antes de medir
+        cq = cq.remove_final_measurements(inplace=False)
+        cq.save_statevector()
+        preparados.append(cq)
+    simulador = _simulador()
+    result = simulador.run(transpile(preparados, simulador, optimization_level=0)).result()
+    return np.stack([np.asarray(result.get_statevector(i)) for i in range(len(preparados))])
+
+def ejecutar_qiskit(funcion, parametro, estados):
+    """Statevectors (N, 2**n) de la función original: un circuito por estado, un solo trabajo de Aer"""
+    from qiskit import QuantumCircuit
+    import qiskit_aer  # noqa: F401  (registra set_statevector)
+
+    num_qubits = int(np.log2(estados.shape[1]))
+    circuitos = []
+    for estado in estados:
+        cq = QuantumCircuit(num_qubits)
+        cq.set_statevector(estado)
+        devuelto = funcion(*_argumentos(funcion, parametro, cq, num_qubits))
+        circuitos.append(devuelto if isinstance(devuelto, QuantumCircuit) else cq)
+    return _simular_qiskit(circuitos)
+
+def ejecutar_pennylane(funcion, parametro, estados):
+    """
+    (statevectors (N, 2**n), aviso) de la función traducida: una llamada con el lote o,
+    si no admite lotes, una por estado; aviso explica entonces por qué (si no, None)
+    """
+    num_qubits = int(np.log2(estados.shape[1]))
+    try:
+        salida = np.asarray(funcion(*_argumentos(funcion, parametro, estados, num_qubits)))
+        if salida.shape == estados.shape:
+            return salida, None
+        aviso = f"el lote devuelve la forma {salida.shape}"
+    except ERRORES_LOTE as error:
+        aviso = f"{type(error).__name__}: {error}"
+    salida = np.stack([np.asarray(funcion(*_argumentos(funcion, parametro, estado, num_qubits))).reshape(-1)
+                       for estado in estados])
+    return salida, f"sin lotes, estado a estado ({aviso})"
+
+def _entradas(funcion, num_qubits, tam_lote, semilla):
+    """Argumentos aleatorios (reproducibles con la semilla) de tam_lote llamadas a una función constructora"""
+    generador = np.random.default_rng(semilla)
+    return [_argumentos(funcion, None, None, num_qubits, generador) for _ in range(tam_lote)]
+
+def _posicion_circuito(devuelto):
+    """Posición del circuito en lo devuelto: None si se devuelve solo, su índice si es una tupla"""
+    from qiskit import QuantumCircuit
+
+    if isinstance(devuelto, QuantumCircuit):
+        return None
+    if isinstance(devuelto, tuple):
+        for i, valor in enumerate(devuelto):
+            if isinstance(valor, QuantumCircuit):
+                return i
+    raise NoVerificable("no devuelve un circuito con estas entradas")
+
+def construir_qiskit(funcion, entradas):
+    """(statevectors (N, 2**n), posición del circuito en lo devuelto) de una función constructora"""
+    circuitos, posicion = [], None
+    for argumentos in entradas:
+        devuelto = funcion(*argumentos)
+        posicion = _posicion_circuito(devuelto)
+        circuitos.append(devuelto if posicion is None else devuelto[posicion])
+    return _simular_qiskit(circuitos), posicion
+
+def construir_pennylane(funcion, entradas, posicion):
+    """Statevectors (N, 2**n) de la traducción de una función constructora (en la misma posición)"""
+    estados = []
+    for argumentos in entradas:
+        devuelto = funcion(*argumentos)
+        estados.append(np.asarray(devuelto if posicion is None else devuelto[posicion]).reshape(-1))
+    return np.stack(estados)
+
+def fidelidades(a, b):
+    """|<a_i|b_i>|^2 por fila (independiente de la fase global)"""
+    return np.abs(np.einsum('ij,ij->i', np.conj(a), b)) ** 2
+
+# =============================================================================
+# VERIFICACIÓN
+# =============================================================================
+
+def verificar_archivo(ruta_qiskit, ruta_pennylane=None, num_qubits=NUM_QUBITS, tam_lote=TAM_LOTE,
+                      semilla=0, tolerancia=TOLERANCIA):
+    """
+    Compara las funciones de ruta_qiskit con su traducción (ruta_pennylane o,
+    sin ella, la traducción en memoria). Devuelve {'archivo', 'segundos',
+    'funciones': [{'funcion', 'fidelidad_minima', 'correcta', 'motivo', 'aviso'}],
+    'saltadas': {nombre: motivo}}.
+    """
+    t_inicio = time.perf_counter()
+    with open(ruta_qiskit, 'r', encoding='utf-8') as f:
+        codigo = f.read()
+    if ruta_pennylane is None:
+        traducido = Traductor.traducir_codigo_completo(codigo)
+    else:
+        with open(ruta_pennylane, 'r', encoding='utf-8') as f:
+            traducido = f.read()
+
+    base = os.path.splitext(os.path.basename(ruta_qiskit))[0]
+    original = _modulo_desde_codigo(f"_verificacion_qiskit_{base}", codigo, ruta_qiskit)
+    pennylane = _modulo_desde_codigo(f"_verificacion_pennylane_{base}", traducido, ruta_pennylane or ruta_qiskit)
+    estados = estados_aleatorios(num_qubits, tam_lote, semilla)
+
+    verificables, saltadas = funciones_verificables(codigo)
+    resultados = []
+    for nombre, parametro in verificables.items():
+        resultado = {'funcion': nombre, 'fidelidad_minima': None, 'correcta': False, 'motivo': None, 'aviso': None}
+        try:
+            if not hasattr(pennylane, nombre):
+                raise NoVerificable("no está en el código traducido")
+            if parametro is None:
+                # Las dos versiones reciben las mismas entradas (se generan dos veces con la misma semilla)
+                esperados, posicion = construir_qiskit(
+                    getattr(original, nombre), _entradas(getattr(original, nombre), num_qubits, tam_lote, semilla))
+                obtenidos = construir_pennylane(
+                    getattr(pennylane, nombre), _entradas(getattr(original, nombre), num_qubits, tam_lote, semilla),
+                    posicion)
+            else:
+                esperados = ejecutar_qiskit(getattr(original, nombre), parametro, estados)
+                obtenidos, resultado['aviso'] = ejecutar_pennylane(getattr(pennylane, nombre), parametro, estados)
+            if obtenidos.shape != esperados.shape:
+                resultado['motivo'] = f"forma {obtenidos.shape}, se esperaba {esperados.shape}"
+            else:
+                f = fidelidades(esperados, obtenidos)
+                resultado['fidelidad_minima'] = float(f.min())
+                resultado['correcta'] = bool(f.min() >= 1 - tolerancia)
+                if not resultado['correcta']:
+                    resultado['motivo'] = f"{int((f < 1 - tolerancia).sum())} de {len(f)} estados distintos"
+        except NoVerificable as error:
+            resultado['correcta'] = None
+            resultado['motivo'] = str(error)
+        except Exception as error:
+            resultado['motivo'] = f"{type(error).__name__}: {error}"
+        resultados.append(resultado)
+    return {'archivo': ruta_qiskit, 'segundos': time.perf_counter() - t_inicio, 'funciones': resultados,
+            'saltadas': saltadas}
+
+def _pares(rutas, traducidos=None):
+    """(fichero Qiskit, fichero traducido o None) de ficheros y directorios; traducidos es un directorio o un fichero"""
+    if traducidos and os.path.isfile(traducidos):
+        # Un fichero traducido (p. ej. codigo_pennylane.py) para un único fichero de Qiskit
+        if len(rutas) != 1 or os.path.isdir(rutas[0]):
+            raise ValueError("Con un fichero traducido solo se puede verificar un fichero de Qiskit.")
+        yield rutas[0], traducidos
+        return
+    for ruta in rutas:
+        if os.path.isdir(ruta):
+            ficheros = sorted(glob.glob(os.path.join(ruta, '**', '*.py'), recursive=True))
+            for fichero in ficheros:
+                relativa = os.path.relpath(fichero, ruta)
+                yield fichero, os.path.join(traducidos, relativa) if traducidos else None
+        else:
+            yield ruta, os.path.join(traducidos, os.path.basename(ruta)) if traducidos else None
+
+def verificar(rutas, traducidos=None, num_qubits=NUM_QUBITS, tam_lote=TAM_LOTE, semilla=0,
+              tolerancia=TOLERANCIA, informar=print):
+    """Verifica cada fichero; devuelve los informes de verificar_archivo"""
+    informes = []
+    for ruta_qiskit, ruta_pennylane in _pares(rutas, traducidos):
+        try:
+            informe = verificar_archivo(ruta_qiskit, ruta_pennylane, num_qubits, tam_lote, semilla, tolerancia)
+        except Exception as error:
+            informe = {'archivo': ruta_qiskit, 'segundos': 0.0, 'error': f"{type(error).__name__}: {error}",
+                       'funciones': [], 'saltadas': {}}
+        informes.append(informe)
+        if informar:
+            _informar(informe, informar)
+    return informes
+
+def _informar(informe, informar):
+    if 'error' in informe:
+        informar(f"❌ {informe['archivo']}: {informe['error']}")
+        return
+    discrepancias = sum(r['correcta'] is False for r in informe['funciones'])
+    verificadas = sum(r['correcta'] is True for r in informe['funciones'])
+    icono = '❌' if discrepancias else '✅' if verificadas else '⚠️ '
+    informar(f"{icono} {informe['archivo']}: {verificadas} funciones verificadas, {discrepancias} discrepancias, "
+             f"{len(informe['saltadas'])} saltadas ({informe['segundos']:.2f} s)")
+    for r in informe['funciones']:
+        if r['correcta'] is None:
+            informar(f"    ⚠️  {r['funcion']}: no verificada ({r['motivo']})")
+        elif r['correcta']:
+            aviso = f" [{r['aviso']}]" if r['aviso'] else ""
+            informar(f"    ✅ {r['funcion']}: fidelidad mínima {r['fidelidad_minima']:.9f}{aviso}")
+        else:
+            informar(f"    ❌ {r['funcion']}: {r['motivo']}")
+    for nombre, motivo in informe['saltadas'].items():
+        informar(f"    ⏭️  {nombre}: saltada ({motivo})")
+
+# =============================================================================
+# EJECUCIÓN
+# =============================================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara funciones de Qiskit con su traducción a PennyLane")
+    parser.add_argument('rutas', nargs='+', help="Ficheros o directorios de código Qiskit")
+    parser.add_argument('--traducidos', default=None,
+                        help="Directorio (o fichero) con las traducciones (por defecto se traduce en memoria)")
+    parser.add_argument('--qubits', type=int, default=NUM_QUBITS, help="Qubits de los estados de prueba")
+    parser.add_argument('--lote', type=int, default=TAM_LOTE, help="Estados aleatorios por función")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA, help="1 - fidelidad máxima admitida")
+    args = parser.parse_args()
+
+    t_inicio = time.perf_counter()
+    informes = verificar(args.rutas, args.traducidos, args.qubits, args.lote, args.semilla, args.tolerancia)
+    fallidos = sum('error' in i or any(r['correcta'] is False for r in i['funciones']) for i in informes)
+    verificadas = sum(r['correcta'] is True for i in informes for r in i['funciones'])
+    print(f"{len(informes)} ficheros, {fallidos} con discrepancias, {verificadas} funciones verificadas, "
+          f"{time.perf_counter() - t_inicio:.2f} s")
+    if not verificadas:
+        print("Ninguna función verificada: no hay nada que dé por buena la traducción.")
+    sys.exit(1 if fallidos or not verificadas else 0)
+
+if __name__ == "__main__":
+    main()